@@ -1,23 +1,38 @@
 # agent.py
+import threading
 from .models import ActorModel, EvaluatorModel, ReflectionModel, ThoughtPath
 from .memory import MemorySystem
-from .llm import llm
+from .llm import get_llm
+from .profiles import SHORT_LIST
+from .profiling import profiler
+
+NAMES = SHORT_LIST.derive(name="names", temperature=0.3, cacheable=True)
 
 class SocialAgent:    
-    def __init__(self, name, traits, location=None):         
+    def __init__(self, name, traits, location=None, llm=None, events=None, search=None, reflections=None):         
         self.name = name
         self.traits = traits
         self.location = location
         
-        # Initialize all models
-        self.actor = ActorModel()
-        self.evaluator = EvaluatorModel()
-        self.reflection = ReflectionModel()
+        # Share one LLM (or scheduler) across all models
+        self.llm = llm if llm is not None else get_llm()
         
-        # Initialize memory systems
-        self.memory = MemorySystem()
+        # Initialize all models
+        self.actor = ActorModel(llm=self.llm)
+        self.evaluator = EvaluatorModel(llm=self.llm)
+        self.reflection = ReflectionModel(llm=self.llm)
+        # Optional reasoning.tot.TreeOfThoughts: search for one path under a
+        # budget instead of building and evaluating k complete ones
+        self.search = search
+        
+        # Initialize memory systems; agents given one EventStore share what they witness
+        self.memory = MemorySystem(llm=self.llm, events=events)
         self.short_term = []
         self.long_term = []
+        # Optional reasoning.reflection.ReflectionScheduler: store experiences and
+        # reflect in the background instead of after every step
+        self.reflections = reflections
+        self.memory_lock = threading.Lock()
         
         # Current state
         self.current_activity = None
@@ -25,22 +40,29 @@ class SocialAgent:
         
     def think_and_act(self, situation, k=3):
         """Main decision loop combining ToT and Reflexion approaches"""
+        # LLM calls made for this agent are attributed to it when profiling
+        with profiler.scope(agent=self.name):
+            return self._think_and_act(situation, k)
+
+    def _think_and_act(self, situation, k):
         # Get memory context
         memory_context = self._get_combined_context(situation)
         
-        # Generate k thought paths using ActorModel's ToT
-        thoughts = []
-        for _ in range(k):
-            thought = self.actor.generate(
+        if self.search is not None:
+            best_path = self.search.search(self.actor, situation, memory_context, self.traits, self.location)
+        else:
+            # Generate k thought paths using ActorModel's ToT; each stage is one
+            # batch across all k paths, so this costs about as long as one path
+            thoughts = self.actor.generate_paths(
                 situation=situation,
                 context=memory_context,
                 traits=self.traits,
-                location=self.location
+                location=self.location,
+                k=k
             )
-            thoughts.append(thought)
-        
-        # Evaluate and select best path
-        best_path = self._select_best_path(thoughts, situation)
+
+            # Evaluate and select best path
+            best_path = self._select_best_path(thoughts, situation)
         
         # Execute chosen path
         result = self.actor.execute(best_path)
@@ -56,11 +78,12 @@ class SocialAgent:
 
     def _get_combined_context(self, situation):
         """Combine recent context with relevant memories"""
-        relevant_memories = self.memory.get_relevant_memories(
-            situation=situation,
-            k=3,
-            current_location=self.location
-        )
+        with self.memory_lock:
+            relevant_memories = self.memory.get_relevant_memories(
+                situation=situation,
+                k=3,
+                current_location=self.location
+            )
         
         # Get recent context
         recent_context = self.short_term[-3:] if self.short_term else []
@@ -68,15 +91,12 @@ class SocialAgent:
         return self.memory.summarize_memories(relevant_memories) + "\n\nRecent events: " + str(recent_context)
 
     def _select_best_path(self, thoughts, situation):
-        """Select best path using EvaluatorModel"""
-        evaluations = [
-            self.evaluator.evaluate_thought_path(
-                thought_path=thought,
-                situation=situation,
-                agent_traits=self.traits
-            )
-            for thought in thoughts
-        ]
+        """Select best path using EvaluatorModel, evaluating all paths in one batch"""
+        evaluations = self.evaluator.evaluate_thought_paths(
+            thought_paths=thoughts,
+            situation=situation,
+            agent_traits=self.traits
+        )
         
         best_idx = max(range(len(evaluations)), 
                       key=lambda i: evaluations[i]["score"])
@@ -98,18 +118,25 @@ class SocialAgent:
         if len(self.short_term) > 10:
             self.short_term = self.short_term[-10:]
         
+        score = self.evaluator.evaluate(result)
+        if self.reflections is not None:
+            self.reflections.record(self, situation, thought_path, result, score)
+            return
+
         # Generate reflection
         reflection = self.reflection.generate(
             situation=situation,
             action=thought_path,
             result=result,
-            score=self.evaluator.evaluate(result),
+            score=score,
             traits=self.traits,
             location=self.location
         )
         
-        # Store in long-term memory
+        # Store in long-term memory; older reflections live on in the memory system
         self.long_term.append(reflection)
+        if len(self.long_term) > 50:
+            self.long_term = self.long_term[-50:]
         
         # Add to structured memory
         self.memory.add_memory(
@@ -126,16 +153,26 @@ class SocialAgent:
         return None
 
     def _extract_people_from_situation(self, situation):
-        prompt = f"""Who are the people mentioned in this situation?
+        return self._extract_people([situation])[0]
+
+    def _extract_people(self, situations):
+        """Names mentioned in each situation (one batch)"""
+        responses = self.llm.generate_batch(
+            [self._people_prompt(situation) for situation in situations],
+            profiles=NAMES
+        )
+        people = []
+        for i, response in enumerate(responses):
+            names = [name.strip() for name in response.split('\n') if name.strip()]
+            profiler.note_parse(bool(names), row=i)
+            people.append(names)
+        return people
+
+    def _people_prompt(self, situation):
+        return f"""Who are the people mentioned in this situation?
         Return ONLY names, one per line:
         
         {situation}"""
-        
-        response = self.llm.generate(
-            prompt=prompt,
-            temperature=0.3
-        )
-        return [name.strip() for name in response.split('\n') if name.strip()]
 
     def move_to(self, new_location):
         self.location = new_location
\ No newline at end of file
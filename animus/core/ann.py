@@ -0,0 +1,272 @@
+# ann.py
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+__all__ = ['IVFPQIndex', 'exact_search', 'recall_benchmark']
+
+class IVFPQIndex:
+    """Inverted-file index with product-quantized residuals, in NumPy.
+
+    Vectors are assigned to the nearest of `n_lists` coarse centroids and
+    stored as `n_subquantizers` one-byte codes of their residual, so a
+    vector costs `n_subquantizers` bytes instead of `4 * dim`. A search
+    scores the `n_probe` lists whose centroids are closest to the query with
+    per-subspace lookup tables (inner product, so use unit vectors for
+    cosine similarity). Raise `n_probe` for recall, lower it for latency.
+
+    Until `train_size` vectors have been added the index keeps them raw and
+    searches exactly; it then trains itself on them and switches to codes.
+    Deletes are tombstones, so an id must not be reused before the next
+    rebuild. `needs_rebuild` turns true once many vectors were deleted or the
+    store has grown well past the training set; the owner then calls
+    `rebuild` with the live vectors.
+
+    Codes lose some precision: for good recall, search for a few times more
+    candidates than needed and re-score those exactly.
+    """
+    def __init__(self,
+                 dim: int,
+                 n_lists: int = 64,
+                 n_subquantizers: int = 8,
+                 n_probe: int = 8,
+                 train_size: Optional[int] = None,
+                 rebuild_deleted: float = 0.25,
+                 rebuild_growth: float = 4.0,
+                 seed: int = 0):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_subquantizers = n_subquantizers
+        self.n_probe = n_probe
+        self.train_size = train_size or 39 * n_lists
+        self.rebuild_deleted = rebuild_deleted
+        self.rebuild_growth = rebuild_growth
+        self._rng = np.random.default_rng(seed)
+        self._sub_dim = -(-dim // n_subquantizers)
+        self._reset()
+
+    def _reset(self):
+        self.centroids: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None
+        self.trained_on = 0
+        self._buffer_ids: List[int] = []
+        self._buffer: List[np.ndarray] = []
+        self._list_ids: List[np.ndarray] = []
+        self._list_codes: List[np.ndarray] = []
+        self._list_sizes = np.zeros(self.n_lists, dtype=np.int64)
+        self._deleted: set = set()
+        self._deleted_array = np.zeros(0, dtype=np.int64)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        stored = int(self._list_sizes.sum()) if self.trained else len(self._buffer_ids)
+        return stored - len(self._deleted)
+
+    @property
+    def needs_rebuild(self) -> bool:
+        if not self.trained:
+            return False
+        stored = int(self._list_sizes.sum())
+        return (len(self._deleted) > self.rebuild_deleted * stored
+                or stored > self.rebuild_growth * self.trained_on)
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        if not self.trained:
+            self._buffer_ids.extend(ids.tolist())
+            self._buffer.extend(vectors)
+            if len(self._buffer_ids) >= self.train_size:
+                self.rebuild(np.asarray(self._buffer_ids), np.stack(self._buffer))
+            return
+        lists = _nearest(vectors, self.centroids)
+        codes = self._encode(vectors - self.centroids[lists])
+        for l in np.unique(lists):
+            rows = lists == l
+            self._append(l, ids[rows], codes[rows])
+
+    def remove(self, ids: Sequence[int]):
+        ids = set(int(i) for i in ids)
+        if not self.trained:
+            keep = [i for i, id_ in enumerate(self._buffer_ids) if id_ not in ids]
+            self._buffer_ids = [self._buffer_ids[i] for i in keep]
+            self._buffer = [self._buffer[i] for i in keep]
+            return
+        self._deleted |= ids
+        self._deleted_array = np.fromiter(self._deleted, dtype=np.int64)
+
+    def rebuild(self, ids: Sequence[int], vectors: np.ndarray):
+        """Retrain on (and re-add) the given live vectors, dropping tombstones"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        self._reset()
+        if len(ids) < self.n_lists:
+            self._buffer_ids = ids.tolist()
+            self._buffer = list(vectors)
+            return
+        sample = vectors
+        if len(vectors) > 256 * self.n_lists:
+            sample = vectors[self._rng.choice(len(vectors), 256 * self.n_lists, replace=False)]
+        self.centroids = _kmeans(sample, self.n_lists, self._rng)
+        residuals = _pad(sample - self.centroids[_nearest(sample, self.centroids)], self._sub_dim * self.n_subquantizers)
+        n_codes = min(256, len(sample))
+        self.codebooks = np.stack([
+            _kmeans(residuals[:, m * self._sub_dim:(m + 1) * self._sub_dim], n_codes, self._rng)
+            for m in range(self.n_subquantizers)
+        ])
+        self.trained_on = len(ids)
+        self._list_ids = [np.zeros(0, dtype=np.int64) for _ in range(self.n_lists)]
+        self._list_codes = [np.zeros((0, self.n_subquantizers), dtype=np.uint8) for _ in range(self.n_lists)]
+        self.add(ids, vectors)
+
+    def search(self, query: np.ndarray, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and approximate inner products of (up to) the k best matches, best first"""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        if not self.trained:
+            if not self._buffer_ids:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            return exact_search(np.stack(self._buffer), query, k, ids=np.asarray(self._buffer_ids))
+
+        coarse = self.centroids @ query
+        probe = _top_k(coarse, min(n_probe or self.n_probe, self.n_lists))
+        # Inner product of each query subvector with every codeword
+        subvectors = _pad(query, self._sub_dim * self.n_subquantizers).reshape(self.n_subquantizers, -1)
+        table = np.einsum("md,mkd->mk", subvectors, self.codebooks)
+        columns = np.arange(self.n_subquantizers)
+
+        ids, scores = [], []
+        for l in probe:
+            size = self._list_sizes[l]
+            if size == 0:
+                continue
+            codes = self._list_codes[l][:size]
+            ids.append(self._list_ids[l][:size])
+            scores.append(coarse[l] + table[columns, codes].sum(1))
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        if len(self._deleted_array):
+            live = ~np.isin(ids, self._deleted_array)
+            ids, scores = ids[live], scores[live]
+        top = _top_k(scores, k)
+        return ids[top], scores[top]
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        residuals = _pad(residuals, self._sub_dim * self.n_subquantizers)
+        codes = np.empty((len(residuals), self.n_subquantizers), dtype=np.uint8)
+        for m in range(self.n_subquantizers):
+            codes[:, m] = _nearest(residuals[:, m * self._sub_dim:(m + 1) * self._sub_dim], self.codebooks[m])
+        return codes
+
+    def _append(self, l: int, ids: np.ndarray, codes: np.ndarray):
+        size = self._list_sizes[l]
+        if size + len(ids) > len(self._list_ids[l]):
+            capacity = max(16, 2 * (size + len(ids)))
+            self._list_ids[l] = _grown(self._list_ids[l], capacity)
+            self._list_codes[l] = _grown(self._list_codes[l], capacity)
+        self._list_ids[l][size:size + len(ids)] = ids
+        self._list_codes[l][size:size + len(ids)] = codes
+        self._list_sizes[l] = size + len(ids)
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int, ids: Optional[np.ndarray] = None):
+    """Flat inner-product search; the reference the index is measured against"""
+    scores = vectors @ query
+    top = _top_k(scores, k)
+    return (top if ids is None else ids[top]), scores[top]
+
+def recall_benchmark(n: int = 100_000,
+                     dim: int = 64,
+                     n_queries: int = 200,
+                     k: int = 10,
+                     n_probes: Sequence[int] = (1, 4, 8, 16, 32),
+                     n_lists: int = 256,
+                     n_subquantizers: int = 16,
+                     refine: int = 4,
+                     seed: int = 0) -> List[Dict]:
+    """Recall@k and per-query latency of the index against exact search.
+
+    `recall` uses the index's approximate scores alone; `refined_recall`
+    re-scores the best `refine * k` candidates exactly, as `MemorySystem`
+    does with its own vectors. Uses clustered unit vectors (a mixture of
+    Gaussians), which is closer to sentence embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 500, 8), dim))
+    vectors = centers[rng.integers(len(centers), size=n)] + 0.6 * rng.normal(size=(n, dim))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    queries = vectors[rng.choice(n, n_queries, replace=False)] + 0.1 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    truth = [set(exact_search(vectors, q, k)[0].tolist()) for q in queries]
+    exact_latency = (time.perf_counter() - start) / n_queries
+
+    start = time.perf_counter()
+    index = IVFPQIndex(dim, n_lists=n_lists, n_subquantizers=n_subquantizers, seed=seed)
+    index.rebuild(np.arange(n), vectors)
+    build_seconds = time.perf_counter() - start
+
+    rows = []
+    for n_probe in n_probes:
+        found = [set(index.search(q, k, n_probe=n_probe)[0].tolist()) for q in queries]
+        start = time.perf_counter()
+        refined = []
+        for q in queries:
+            candidates = index.search(q, refine * k, n_probe=n_probe)[0]
+            refined.append(set(exact_search(vectors[candidates], q, k, ids=candidates)[0].tolist()))
+        latency = (time.perf_counter() - start) / n_queries
+        rows.append({
+            "n_probe": n_probe,
+            "recall": sum(len(f & t) for f, t in zip(found, truth)) / (k * n_queries),
+            "refined_recall": sum(len(f & t) for f, t in zip(refined, truth)) / (k * n_queries),
+            "latency_ms": 1000 * latency,
+            "exact_latency_ms": 1000 * exact_latency,
+            "build_seconds": build_seconds
+        })
+    return rows
+
+def _kmeans(x: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 10) -> np.ndarray:
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(x, centroids)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Re-seed empty clusters from random points
+        centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+def _nearest(x: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    """Index of the closest centroid (L2) for every row, in bounded-memory chunks"""
+    half_norms = 0.5 * (centroids ** 2).sum(1)
+    return np.concatenate([
+        np.argmax(x[i:i + chunk] @ centroids.T - half_norms, axis=1)
+        for i in range(0, len(x), chunk)
+    ]) if len(x) else np.zeros(0, dtype=np.int64)
+
+def _pad(x: np.ndarray, width: int) -> np.ndarray:
+    if x.shape[-1] == width:
+        return x
+    padding = [(0, 0)] * (x.ndim - 1) + [(0, width - x.shape[-1])]
+    return np.pad(x, padding)
+
+def _grown(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+if __name__ == "__main__":
+    for row in recall_benchmark():
+        print(row)
@@ -0,0 +1,187 @@
+# backends.py
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+__all__ = ['register_backend', 'create_backend', 'available_backends', 'default_model', 'StubBackend']
+
+_BACKENDS: Dict[str, Callable] = {}
+_DEFAULT_MODELS: Dict[str, str] = {}
+
+def register_backend(name: str, default_model: str = ""):
+    """Register a backend factory under `name`.
+
+    Factories are called with `model_name` plus any backend options and must
+    return an object with `count_tokens(prompts)` and
+    `generate(prompts, temperatures, max_new_tokens, seed, stops)` methods,
+    where `stops` holds an optional per-row stop condition (see `profiles.py`)
+    the backend may use to finish rows early. Backends that support
+    `LLM.score` also provide `score(prompts, options)`, returning the
+    log-likelihood of each option as the answer to each prompt, and those
+    supporting `LLM.embed` provide `embed(texts)`, returning unit vectors. The HF
+    backends also take an `inference` option (see `inference.py`). Heavy
+    imports belong inside the factory so that registering stays free.
+    """
+    def decorator(factory):
+        _BACKENDS[name] = factory
+        _DEFAULT_MODELS[name] = default_model
+        return factory
+    return decorator
+
+def available_backends() -> List[str]:
+    return sorted(_BACKENDS)
+
+def default_model(name: str) -> str:
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {available_backends()}")
+    return _DEFAULT_MODELS[name]
+
+def create_backend(name: str, model_name: Optional[str] = None, workers: Optional[int] = None,
+                   trace: Optional[str] = None, **options):
+    """Create a backend.
+
+    With `workers` (or ANIMUS_LLM_WORKERS) above 1 it is served by a process
+    pool. With `trace` (or ANIMUS_LLM_TRACE) every row it serves is recorded
+    to that file, which the "replay" backend serves back (see `trace.py`).
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {available_backends()}")
+    trace = trace or os.environ.get("ANIMUS_LLM_TRACE") or None
+    if name == "replay":
+        return _BACKENDS[name](model_name=model_name or _DEFAULT_MODELS[name], trace=trace, **options)
+    backend = _BACKENDS[name](model_name=model_name or _DEFAULT_MODELS[name], **options)
+    workers = workers if workers is not None else int(os.environ.get("ANIMUS_LLM_WORKERS", "0"))
+    if workers > 1:
+        from .pool import PoolBackend
+        backend = PoolBackend(backend, workers)
+    if trace:
+        from .trace import RecordingBackend
+        backend = RecordingBackend(backend, trace)
+    return backend
+
+@register_backend("hf-seq2seq", default_model="google/flan-t5-xl")
+def _hf_seq2seq(model_name, **options):
+    from .hf import HFSeq2SeqBackend
+    return HFSeq2SeqBackend(model_name, **options)
+
+@register_backend("hf-causal", default_model="gpt2")
+def _hf_causal(model_name, **options):
+    from .hf import HFCausalBackend
+    return HFCausalBackend(model_name, **options)
+
+@register_backend("replay", default_model="replay")
+def _replay(model_name, trace=None, **options):
+    from .trace import ReplayBackend
+    if not trace:
+        raise ValueError("The replay backend needs a trace file (trace=... or ANIMUS_LLM_TRACE)")
+    return ReplayBackend(trace, model_name=model_name, **options)
+
+@register_backend("stub", default_model="stub")
+def _stub(model_name, **options):
+    return StubBackend(model_name, **options)
+
+class StubBackend:
+    """Deterministic in-process backend for tests and offline runs.
+
+    Responses are derived from a hash of the prompt and shaped after the
+    format the prompt asks for (a bare number, SUCCESS/FAILURE, prefixed
+    lines, PERSON: SCORE pairs, tagged sections), so the parsing paths see
+    realistic input.
+    """
+    def __init__(self, model_name: str = "stub", inference=None):
+        # `inference` is accepted for parity with the HF backends; there are no weights to convert
+        self.model_name = model_name
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return [len(prompt.split()) for prompt in prompts]
+
+    def generate(self,
+                 prompts: List[str],
+                 temperatures: List[float],
+                 max_new_tokens: List[int],
+                 seed: Optional[int] = None,
+                 stops: Optional[List] = None) -> List[str]:
+        return [
+            self._truncate(self.respond(prompt, seed), budget)
+            for prompt, budget in zip(prompts, max_new_tokens)
+        ]
+
+    def score(self, prompts: List[str], options: List[str]) -> List[List[float]]:
+        # Peak the likelihoods around a prompt-dependent option
+        scores = []
+        for prompt in prompts:
+            fraction, _ = self._hash(prompt, None)
+            scores.append([
+                -20.0 * (i / max(len(options) - 1, 1) - fraction) ** 2
+                for i in range(len(options))
+            ])
+        return scores
+
+    def embed(self, texts: List[str], dim: int = 256) -> List[List[float]]:
+        # Hashed bag of words: texts sharing words get similar vectors
+        vectors = []
+        for text in texts:
+            vector = [0.0] * dim
+            for word in re.findall(r"[a-z0-9']+", text.lower()):
+                digest = hashlib.sha256(word.encode("utf-8")).digest()
+                vector[int.from_bytes(digest[:4], "big") % dim] += 1.0 if digest[4] & 1 else -1.0
+            norm = sum(v * v for v in vector) ** 0.5 or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+    def respond(self, prompt: str, seed: Optional[int] = None) -> str:
+        fraction, tag = self._hash(prompt, seed)
+
+        if "Respond with these sections" in prompt:
+            return self._sections(prompt, fraction, tag)
+        if "'SUCCESS' or 'FAILURE'" in prompt:
+            return "SUCCESS" if fraction >= 0.3 else "FAILURE"
+        if "FEELINGS:" in prompt:
+            return (f"FEELINGS: calm, curious\n"
+                    f"CONFIDENCE: {fraction * 2 - 1:.2f}\n"
+                    f"RELATIONSHIP: unchanged\n"
+                    f"EFFECTS: stub effect {tag}")
+        if "PERSON: SCORE" in prompt:
+            return f"Observer: {fraction * 2 - 1:.2f}"
+        if "ONLY a number" in prompt or "ONLY a confidence score" in prompt:
+            if "-1 to 1" in prompt:
+                return f"{fraction * 2 - 1:.2f}"
+            return f"{fraction:.2f}"
+        if "ONLY names" in prompt:
+            return "Alex\nSam"
+
+        prefix = re.search(r"'([A-Z]+): '", prompt)
+        if prefix:
+            label = prefix.group(1)
+            if label == "OUTCOME":
+                return f"OUTCOME: stub outcome {tag}"
+            return "\n".join(f"{label}: stub {label.lower()} {i} {tag}" for i in range(1, 4))
+        if "one step per line" in prompt:
+            return "\n".join(f"Step {i}: stub step {tag}" for i in range(1, 4))
+        return f"Stub response {tag}."
+
+    def _sections(self, prompt: str, fraction: float, tag: str) -> str:
+        sections = dict(re.findall(r"^\s*([A-Z_]+): <(.*)>$", prompt, re.M))
+        lines = []
+        for name, instruction in sections.items():
+            if re.search(r"PERSON: [A-Z]+", instruction):
+                body = f"\nObserver: {fraction * 2 - 1:.2f}"
+            elif "number between -1" in instruction:
+                body = f" {fraction * 2 - 1:.2f}"
+            elif "number" in instruction:
+                body = f" {fraction:.2f}"
+            elif "one per line" in instruction:
+                body = "".join(f"\n- stub {name.lower()} {i} {tag}" for i in range(1, 4))
+            else:
+                body = f" Stub {name.lower()} {tag}."
+            lines.append(f"{name}:{body}")
+        return "\n".join(lines) + "\n"
+
+    def _hash(self, prompt: str, seed: Optional[int]):
+        digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") / 0xFFFFFFFF, digest[4:8].hex()
+
+    def _truncate(self, text: str, budget: int) -> str:
+        words = text.split(" ")
+        return text if len(words) <= budget else " ".join(words[:budget])
@@ -0,0 +1,113 @@
+# cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+__all__ = ['ResponseCache']
+
+class ResponseCache:
+    """Two-tier prompt/response cache for LLM calls.
+
+    The memory tier is an LRU bounded by `max_bytes` of stored keys and
+    responses. When `path` is given, every entry is also written to a SQLite
+    file so cached responses survive restarts; memory misses fall through to
+    disk and are promoted back into the LRU.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_length: int, seed_policy: str) -> str:
+        payload = json.dumps([model, prompt, float(temperature), int(max_length), seed_policy])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._insert(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._insert(key, response)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                    (key, response)
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop the memory tier; the disk tier is left untouched"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _insert(self, key: str, response: str) -> None:
+        if key in self._entries:
+            self._bytes -= _entry_size(key, self._entries.pop(key))
+        size = _entry_size(key, response)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = response
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_response = self._entries.popitem(last=False)
+            self._bytes -= _entry_size(old_key, old_response)
+            self.evictions += 1
+
+def _entry_size(key: str, response: str) -> int:
+    return len(key) + len(response.encode("utf-8"))
@@ -0,0 +1,52 @@
+# consolidation.py
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+import numpy as np
+from .ann import _kmeans, _nearest
+
+__all__ = ['ConsolidationPolicy', 'retention_score', 'retention_scores', 'plan_clusters']
+
+@dataclass(frozen=True)
+class ConsolidationPolicy:
+    """When and how a MemorySystem compacts itself.
+
+    Once the store holds more than `budget * (1 + slack)` memories, the
+    least valuable memories older than `min_age_hours` are clustered by
+    embedding and each cluster is replaced by one summary memory, until the
+    store is back at `target * budget`. If that is not enough, the lowest
+    scoring memories are evicted outright.
+    """
+    budget: int = 1000
+    slack: float = 0.1
+    target: float = 0.8
+    min_age_hours: float = 24.0
+    cluster_size: int = 8
+    seed: int = 0
+
+def retention_score(memory, now: datetime) -> float:
+    """Importance x recency x access frequency; the lowest scores go first"""
+    hours_old = (now - memory.timestamp).total_seconds() / 3600
+    recency = 1.0 / (1.0 + hours_old / 24)
+    frequency = 1.0 + math.log1p(memory.access_count)
+    return memory.importance * recency * frequency
+
+def retention_scores(importance: np.ndarray, timestamps: np.ndarray, access_counts: np.ndarray, now: float) -> np.ndarray:
+    """`retention_score` over columns (timestamps in seconds)"""
+    hours_old = (now - timestamps) / 3600
+    return importance * (1.0 / (1.0 + hours_old / 24)) * (1.0 + np.log1p(access_counts))
+
+def plan_clusters(vectors: np.ndarray, cluster_size: int, seed: int = 0) -> List[List[int]]:
+    """Group rows of `vectors` into similar clusters of at most `cluster_size`"""
+    n = len(vectors)
+    if n <= cluster_size:
+        return [list(range(n))]
+    n_clusters = math.ceil(n / cluster_size)
+    centroids = _kmeans(vectors, n_clusters, np.random.default_rng(seed))
+    assign = _nearest(vectors, centroids)
+    clusters = []
+    for c in range(n_clusters):
+        members = np.flatnonzero(assign == c).tolist()
+        clusters.extend(members[i:i + cluster_size] for i in range(0, len(members), cluster_size))
+    return [cluster for cluster in clusters if cluster]
@@ -0,0 +1,97 @@
+# events.py
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from .ann import _grown
+from .llm import get_llm
+
+__all__ = ['EventStore']
+
+class EventStore:
+    """World-level store of witnessed events, shared by every agent's memory.
+
+    An event is kept once per distinct content, however many agents
+    witness it: its text, its embedding (computed once, in a batch with the
+    other new events) and a base importance score (rated once). An agent's
+    `MemorySystem` given the store holds only the event id plus its own
+    fields: perceived importance, emotional impact, location, timestamps and
+    access counts.
+
+    Each event counts the memories referencing it; when the last one is
+    released (e.g. consolidated away) its id is freed for reuse.
+    """
+    def __init__(self, llm=None):
+        self.llm = llm if llm is not None else get_llm()
+        self.contents: List[Optional[str]] = []
+        self.vectors: Optional[np.ndarray] = None
+        self.importance = np.zeros(0, dtype=np.float32)   # NaN until rated
+        self.references = np.zeros(0, dtype=np.int32)
+        self.stats = {"recorded": 0, "embedded": 0, "scored": 0}
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def record(self, contents: Sequence[str], vectors: Optional[np.ndarray] = None) -> np.ndarray:
+        """Event ids for `contents`, adding a reference to each.
+
+        Only contents not seen before are embedded, in one batch; pass
+        `vectors` (one row per content) to reuse known embeddings instead.
+        """
+        with self._lock:
+            new = list(dict.fromkeys(c for c in contents if c not in self._ids))
+        if new and vectors is None:
+            embedded = dict(zip(new, self.llm.embed(new)))
+            self.stats["embedded"] += len(new)
+        elif new:
+            embedded = dict(zip(contents, np.asarray(vectors, dtype=np.float32)))
+
+        with self._lock:
+            for content in new:
+                # Another agent may have added it meanwhile
+                if content not in self._ids:
+                    self._add(content, embedded[content])
+            ids = np.array([self._ids[c] for c in contents], dtype=np.int64)
+            np.add.at(self.references, ids, 1)
+            self.stats["recorded"] += len(ids)
+            return ids
+
+    def release(self, ids: Sequence[int]):
+        """Drop one reference to each event; unreferenced events are forgotten"""
+        with self._lock:
+            for id_ in np.asarray(ids, dtype=np.int64).tolist():
+                self.references[id_] -= 1
+                if self.references[id_] == 0:
+                    del self._ids[self.contents[id_]]
+                    self.contents[id_] = None
+                    self._free.append(id_)
+
+    def scored(self, ids: Sequence[int]) -> np.ndarray:
+        """Whether each event already has a base importance"""
+        return ~np.isnan(self.importance[np.asarray(ids, dtype=np.int64)])
+
+    def set_importance(self, ids: Sequence[int], scores: Sequence[float]):
+        with self._lock:
+            self.importance[np.asarray(ids, dtype=np.int64)] = scores
+            self.stats["scored"] += len(scores)
+
+    def _add(self, content: str, vector: np.ndarray):
+        if self._free:
+            id_ = self._free.pop()
+            self.contents[id_] = content
+        else:
+            id_ = len(self.contents)
+            self.contents.append(content)
+            if self.vectors is None:
+                self.vectors = np.zeros((0, vector.shape[0]), dtype=np.float32)
+            if id_ == len(self.vectors):
+                capacity = max(8, 2 * id_)
+                self.vectors = _grown(self.vectors, capacity)
+                self.importance = _grown(self.importance, capacity)
+                self.references = _grown(self.references, capacity)
+        self._ids[content] = id_
+        self.vectors[id_] = vector
+        self.importance[id_] = np.nan
+        self.references[id_] = 0
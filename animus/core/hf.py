@@ -0,0 +1,444 @@
+# hf.py
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Union
+import torch
+from transformers import (
+    AutoTokenizer,
+    AutoModelForSeq2SeqLM,
+    AutoModelForCausalLM,
+    LogitsProcessor,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList
+)
+from transformers.modeling_outputs import BaseModelOutput
+from .inference import InferenceMode, get_inference_mode
+
+__all__ = ['HFSeq2SeqBackend', 'HFCausalBackend', 'PerRowTemperature', 'PerRowStop']
+
+class PerRowTemperature(LogitsProcessor):
+    """Applies a separate sampling temperature to every row of a batch.
+
+    Rows with a temperature of 0 (or below) decode greedily.
+    """
+    def __init__(self, temperatures: torch.Tensor):
+        self.temperatures = temperatures
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        greedy = self.temperatures <= 0
+        scaled = scores / self.temperatures.clamp(min=1e-5).unsqueeze(1).to(scores.dtype)
+        if greedy.any():
+            best = scores.argmax(dim=-1, keepdim=True)
+            one_hot = torch.full_like(scores, float("-inf")).scatter(1, best, 0.0)
+            scaled = torch.where(greedy.unsqueeze(1), one_hot, scaled)
+        return scaled
+
+class PerRowStop(StoppingCriteria):
+    """Finishes each row once its own stop condition sees a complete answer"""
+    def __init__(self, tokenizer, stops, offset: int):
+        self.tokenizer = tokenizer
+        self.stops = stops
+        self.offset = offset
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        done = [
+            stop is not None and stop(
+                self.tokenizer.decode(row[self.offset:], skip_special_tokens=True), False
+            ) is not None
+            for row, stop in zip(input_ids, self.stops)
+        ]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+def _set_threads(mode: InferenceMode):
+    if mode.intra_op_threads:
+        torch.set_num_threads(mode.intra_op_threads)
+    if mode.inter_op_threads:
+        try:
+            torch.set_num_interop_threads(mode.inter_op_threads)
+        except RuntimeError as e:
+            # Only settable once, before any inter-op parallel work has started
+            print(f"Could not set inter-op threads: {str(e)}")
+
+def _prepare_model(model, mode: InferenceMode, device: torch.device):
+    """Convert a loaded fp32 model according to `mode`"""
+    if mode.dtype == "int8":
+        if device.type != "cpu":
+            print(f"Dynamic int8 quantization needs a CPU device, keeping fp32 on {device.type}")
+        else:
+            # Only nn.Linear layers are quantized (GPT-2's Conv1D projections stay fp32)
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif mode.dtype == "bf16":
+        if _bf16_supported(device):
+            model = model.to(torch.bfloat16)
+        else:
+            print(f"bf16 is not supported on this {device.type} device, keeping fp32")
+    elif mode.dtype != "fp32":
+        raise ValueError(f"Unknown inference dtype '{mode.dtype}'")
+    if mode.compile:
+        model.forward = torch.compile(model.forward, dynamic=True)
+    return model
+
+def _mean_pool(hidden, mask) -> List[List[float]]:
+    weights = mask.unsqueeze(-1).to(hidden.dtype)
+    pooled = (hidden * weights).sum(1) / weights.sum(1).clamp(min=1)
+    return torch.nn.functional.normalize(pooled.float(), dim=-1).cpu().tolist()
+
+def _call_seed(seed: Optional[int], texts: List[str]) -> Optional[int]:
+    """`seed` mixed with the rows of a call, so separately seeded calls do not draw alike"""
+    if seed is None:
+        return None
+    digest = hashlib.sha256("\n".join([str(seed)] + list(texts)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def _bf16_supported(device: torch.device) -> bool:
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+
+class HFSeq2SeqBackend:
+    """Encoder-decoder checkpoint (the flan-t5 family) loaded through transformers"""
+    model_class = AutoModelForSeq2SeqLM
+
+    def __init__(self,
+                 model_name: str,
+                 device: Optional[str] = None,
+                 prefix_cache_size: int = 32,
+                 inference: Union[None, str, InferenceMode] = None):
+        self.model_name = model_name
+        self.inference = get_inference_mode(inference)
+        _set_threads(self.inference)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = self.model_class.from_pretrained(model_name)
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        self.model.to(self.device)
+        self.model.eval()
+        self.model = _prepare_model(self.model, self.inference, self.device)
+        self.prefix_cache_size = prefix_cache_size
+        # Shared calls arrive from several threads (agents, scheduler, background workers)
+        self._prefixes: "OrderedDict[str, object]" = OrderedDict()
+        self._prefix_lock = threading.Lock()
+
+    def model_bytes(self) -> int:
+        """Serialized size of the weights, quantized or not"""
+        buffer = io.BytesIO()
+        torch.save(self.model.state_dict(), buffer)
+        return buffer.tell()
+
+    def share_memory(self):
+        """Move the weights to shared memory so worker processes map one copy (see `pool.py`)"""
+        import torch.multiprocessing  # registers the tensor reductions used when spawning
+        self.model.share_memory()
+
+    def __getstate__(self):
+        # Pool workers start with an empty prefix LRU and a lock of their own
+        state = dict(self.__dict__)
+        state["_prefixes"] = OrderedDict()
+        del state["_prefix_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._prefix_lock = threading.Lock()
+
+    def set_threads(self, intra_op_threads: int):
+        torch.set_num_threads(intra_op_threads)
+
+    def _no_grad(self):
+        return torch.inference_mode() if self.inference.inference_mode else torch.no_grad()
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return [len(ids) for ids in self.tokenizer(prompts)["input_ids"]]
+
+    def generate(self,
+                 prompts: List[str],
+                 temperatures: List[float],
+                 max_new_tokens: List[int],
+                 seed: Optional[int] = None,
+                 stops: Optional[List] = None) -> List[str]:
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+        return self._sample(
+            dict(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]),
+            self._output_offset(inputs),
+            temperatures, max_new_tokens, _call_seed(seed, prompts), stops
+        )
+
+    def generate_shared(self,
+                        contexts: List[str],
+                        prompts: List[str],
+                        temperatures: List[float],
+                        max_new_tokens: List[int],
+                        seed: Optional[int] = None,
+                        stops: Optional[List] = None) -> List[str]:
+        """Generate for (context, question) rows, encoding each distinct context once.
+
+        The encoder states of a context are computed once (and kept in a small
+        LRU across calls) and concatenated with the separately encoded question,
+        in the style of fusion-in-decoder: the decoder cross-attends to both, but
+        the context and question are not encoded jointly.
+        """
+        hidden, mask = self._join_encoded(contexts, prompts)
+        return self._sample(
+            dict(encoder_outputs=BaseModelOutput(last_hidden_state=hidden), attention_mask=mask),
+            1, temperatures, max_new_tokens, _call_seed(seed, contexts + prompts), stops
+        )
+
+    def _sample(self, model_inputs, offset, temperatures, max_new_tokens, seed, stops):
+        temps = torch.tensor(temperatures, dtype=torch.float32, device=self.device)
+        stopping = StoppingCriteriaList()
+        if stops and any(stop is not None for stop in stops):
+            stopping.append(PerRowStop(self.tokenizer, stops, offset))
+        if seed is not None:
+            torch.manual_seed(seed)
+        with self._no_grad():
+            outputs = self.model.generate(
+                **model_inputs,
+                max_new_tokens=max(max_new_tokens),
+                do_sample=True,
+                temperature=1.0,
+                pad_token_id=self.tokenizer.pad_token_id,
+                logits_processor=LogitsProcessorList([PerRowTemperature(temps)]),
+                stopping_criteria=stopping
+            )
+        # Rows share the longest budget in the bucket; trim each to its own.
+        return [
+            self.tokenizer.decode(row[offset:offset + budget], skip_special_tokens=True)
+            for row, budget in zip(outputs, max_new_tokens)
+        ]
+
+    def _output_offset(self, inputs) -> int:
+        # Generated sequences start with the decoder start token
+        return 1
+
+    def score(self, prompts: List[str], options: List[str]) -> List[List[float]]:
+        """Log-likelihood of every option as the complete answer to every prompt.
+
+        Each prompt is encoded once; the decoder then scores all prompt/option
+        pairs in a single teacher-forced forward pass.
+        """
+        hidden, mask = self._encode(prompts)
+        return self._score_encoded(hidden, mask, options)
+
+    def score_shared(self, contexts: List[str], prompts: List[str], options: List[str]) -> List[List[float]]:
+        hidden, mask = self._join_encoded(contexts, prompts)
+        return self._score_encoded(hidden, mask, options)
+
+    def _score_encoded(self, hidden, mask, options):
+        targets = self.tokenizer(list(options), return_tensors="pt", padding=True).to(self.device)
+        n_prompts, n_options = hidden.shape[0], len(options)
+        labels = targets["input_ids"].masked_fill(targets["attention_mask"] == 0, -100)
+        labels = labels.repeat(n_prompts, 1)
+
+        with self._no_grad():
+            logits = self.model(
+                encoder_outputs=BaseModelOutput(last_hidden_state=hidden.repeat_interleave(n_options, dim=0)),
+                attention_mask=mask.repeat_interleave(n_options, dim=0),
+                labels=labels
+            ).logits
+
+        token_logprobs = logits.float().log_softmax(-1).gather(-1, labels.clamp(min=0).unsqueeze(-1)).squeeze(-1)
+        totals = token_logprobs.masked_fill(labels == -100, 0.0).sum(-1)
+        return totals.view(n_prompts, n_options).tolist()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Unit-length mean of the encoder states of each text"""
+        hidden, mask = self._encode(texts)
+        return _mean_pool(hidden, mask)
+
+    def _encode(self, texts: List[str]):
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        with self._no_grad():
+            hidden = self.model.get_encoder()(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"]
+            ).last_hidden_state
+        return hidden, inputs["attention_mask"]
+
+    def _prefix_states(self, contexts: List[str]):
+        """Encoder states (unpadded) for each distinct context, served from the LRU when possible"""
+        states = {}
+        for context in dict.fromkeys(contexts):
+            state = self._recall(context)
+            if state is not None:
+                states[context] = state
+        missing = [c for c in dict.fromkeys(contexts) if c not in states]
+        if missing:
+            hidden, mask = self._encode(missing)
+            for context, row, row_mask in zip(missing, hidden, mask):
+                states[context] = row[:int(row_mask.sum())]
+                self._remember(context, states[context])
+        return states
+
+    def _recall(self, context):
+        with self._prefix_lock:
+            state = self._prefixes.get(context)
+            if state is not None:
+                self._prefixes.move_to_end(context)
+            return state
+
+    def _remember(self, context, value):
+        with self._prefix_lock:
+            self._prefixes[context] = value
+            self._prefixes.move_to_end(context)
+            while len(self._prefixes) > self.prefix_cache_size:
+                self._prefixes.popitem(last=False)
+
+    def _join_encoded(self, contexts: List[str], prompts: List[str]):
+        prefixes = self._prefix_states(contexts)
+        hidden, mask = self._encode(prompts)
+        rows = [
+            torch.cat([prefixes[context], states[:int(row_mask.sum())]])
+            for context, states, row_mask in zip(contexts, hidden, mask)
+        ]
+        width = max(row.shape[0] for row in rows)
+        joined = hidden.new_zeros((len(rows), width, hidden.shape[-1]))
+        joined_mask = mask.new_zeros((len(rows), width))
+        for i, row in enumerate(rows):
+            joined[i, :row.shape[0]] = row
+            joined_mask[i, :row.shape[0]] = 1
+        return joined, joined_mask
+
+class HFCausalBackend(HFSeq2SeqBackend):
+    """Decoder-only checkpoint; prompts are left-padded and echoed tokens stripped"""
+    model_class = AutoModelForCausalLM
+
+    def __init__(self,
+                 model_name: str,
+                 device: Optional[str] = None,
+                 prefix_cache_size: int = 32,
+                 inference: Union[None, str, InferenceMode] = None):
+        super().__init__(model_name, device, prefix_cache_size, inference)
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+    def _output_offset(self, inputs) -> int:
+        # Generated sequences echo the (left-padded) prompt
+        return inputs["input_ids"].shape[1]
+
+    def generate_shared(self,
+                        contexts: List[str],
+                        prompts: List[str],
+                        temperatures: List[float],
+                        max_new_tokens: List[int],
+                        seed: Optional[int] = None,
+                        stops: Optional[List] = None) -> List[str]:
+        """Generate for (context, question) rows, reusing the context's KV cache.
+
+        The context is run through the model once and its key/value cache is
+        copied for every question, so only the question and answer tokens are
+        computed per row. Rows are decoded one at a time.
+        """
+        stops = stops or [None] * len(prompts)
+        # Seeded once: the rows then draw one after another instead of repeating the same samples
+        if seed is not None:
+            torch.manual_seed(_call_seed(seed, contexts + prompts))
+        responses = []
+        for context, prompt, temperature, budget, stop in zip(contexts, prompts, temperatures, max_new_tokens, stops):
+            prefix_ids, past = self._prefix_state(context)
+            question_ids = self.tokenizer(prompt, add_special_tokens=False)["input_ids"]
+            input_ids = torch.tensor([prefix_ids + question_ids], device=self.device)
+            responses.extend(self._sample(
+                dict(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=copy.deepcopy(past)
+                ),
+                input_ids.shape[1], [temperature], [budget], None, [stop]
+            ))
+        return responses
+
+    def score(self, prompts: List[str], options: List[str]) -> List[List[float]]:
+        """Log-likelihood of every option continuing every prompt, in one forward pass"""
+        prompt_ids = self.tokenizer(prompts)["input_ids"]
+        option_ids = self._option_ids(options)
+        rows = [prompt + option for prompt in prompt_ids for option in option_ids]
+        width = max(len(row) for row in rows)
+
+        pad = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([[pad] * (width - len(row)) + row for row in rows], device=self.device)
+        attention_mask = torch.tensor(
+            [[0] * (width - len(row)) + [1] * len(row) for row in rows], device=self.device
+        )
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+
+        with self._no_grad():
+            logits = self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=position_ids
+            ).logits
+
+        token_logprobs = logits[:, :-1].float().log_softmax(-1).gather(-1, input_ids[:, 1:].unsqueeze(-1)).squeeze(-1)
+        lengths = [len(option) for option in option_ids] * len(prompts)
+        totals = [row[-length:].sum().item() for row, length in zip(token_logprobs, lengths)]
+        return [totals[i:i + len(options)] for i in range(0, len(totals), len(options))]
+
+    def score_shared(self, contexts: List[str], prompts: List[str], options: List[str]) -> List[List[float]]:
+        """Like `score`, but every question is appended to its context's cached KV state"""
+        option_ids = self._option_ids(options)
+        pad = self.tokenizer.pad_token_id
+        scores = []
+        for context, prompt in zip(contexts, prompts):
+            prefix_ids, past = self._prefix_state(context)
+            question_ids = self.tokenizer(prompt, add_special_tokens=False)["input_ids"]
+            rows = [question_ids + option for option in option_ids]
+            width = max(len(row) for row in rows)
+            # Right padding is safe here: real tokens never attend to later positions
+            input_ids = torch.tensor([row + [pad] * (width - len(row)) for row in rows], device=self.device)
+            attention_mask = torch.tensor(
+                [[1] * len(prefix_ids) + [1] * len(row) + [0] * (width - len(row)) for row in rows],
+                device=self.device
+            )
+            position_ids = torch.arange(len(prefix_ids), len(prefix_ids) + width, device=self.device)
+            cache = copy.deepcopy(past)
+            cache.batch_repeat_interleave(len(options))
+
+            with self._no_grad():
+                logits = self.model(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    position_ids=position_ids.unsqueeze(0).expand(len(options), -1),
+                    past_key_values=cache
+                ).logits
+
+            token_logprobs = logits[:, :-1].float().log_softmax(-1).gather(-1, input_ids[:, 1:].unsqueeze(-1)).squeeze(-1)
+            start = len(question_ids) - 1
+            scores.append([
+                row[start:start + len(option)].sum().item()
+                for row, option in zip(token_logprobs, option_ids)
+            ])
+        return scores
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Unit-length mean of the last hidden states of each text"""
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        with self._no_grad():
+            # The base model returns its last states directly; hidden_states is
+            # not filled in by a model unpickled in a pool worker
+            hidden = self.model.base_model(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                position_ids=(inputs["attention_mask"].cumsum(-1) - 1).clamp(min=0)
+            ).last_hidden_state
+        return _mean_pool(hidden, inputs["attention_mask"])
+
+    def _option_ids(self, options):
+        return [self.tokenizer(" " + option, add_special_tokens=False)["input_ids"] for option in options]
+
+    def _prefix_state(self, context: str):
+        """Token ids and KV cache of a context, computed once and kept in the LRU"""
+        state = self._recall(context)
+        if state is None:
+            prefix_ids = self.tokenizer(context)["input_ids"]
+            with self._no_grad():
+                past = self.model(
+                    input_ids=torch.tensor([prefix_ids], device=self.device),
+                    use_cache=True
+                ).past_key_values
+            state = (prefix_ids, past)
+            self._remember(context, state)
+        return state
@@ -0,0 +1,105 @@
+# inference.py
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Union
+
+from .scoring import ScoreScale, UNIT_SCALE
+
+__all__ = [
+    'InferenceMode', 'INFERENCE_MODES', 'get_inference_mode', 'check_accuracy',
+    'SANITY_PROMPTS', 'FP32', 'BF16', 'INT8'
+]
+
+@dataclass(frozen=True)
+class InferenceMode:
+    """How an HF backend prepares its model for inference.
+
+    `dtype` is one of "fp32", "bf16" (falls back to fp32 on hardware without
+    bf16 support) or "int8" (dynamic quantization of the Linear layers, CPU
+    only). `inference_mode` runs forward passes under `torch.inference_mode`
+    instead of `torch.no_grad`, `compile` wraps the forward pass in
+    `torch.compile`, and the thread counts are handed to
+    `torch.set_num_threads` / `torch.set_num_interop_threads` when set.
+    """
+    name: str
+    dtype: str = "fp32"
+    inference_mode: bool = False
+    compile: bool = False
+    intra_op_threads: Optional[int] = None
+    inter_op_threads: Optional[int] = None
+
+    def derive(self, **changes) -> "InferenceMode":
+        return replace(self, **changes)
+
+FP32 = InferenceMode("fp32")
+BF16 = InferenceMode("bf16", dtype="bf16", inference_mode=True)
+INT8 = InferenceMode("int8", dtype="int8", inference_mode=True)
+
+INFERENCE_MODES: Dict[str, InferenceMode] = {mode.name: mode for mode in (FP32, BF16, INT8)}
+
+def get_inference_mode(mode: Union[None, str, InferenceMode] = None) -> InferenceMode:
+    """Resolve a mode by name, defaulting to ANIMUS_LLM_INFERENCE and then fp32"""
+    if isinstance(mode, InferenceMode):
+        return mode
+    name = mode or os.environ.get("ANIMUS_LLM_INFERENCE", FP32.name)
+    if name not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{name}'. Available: {sorted(INFERENCE_MODES)}")
+    return INFERENCE_MODES[name]
+
+# Fixed prompts in the shapes the agents actually send: numeric judgments,
+# labels and short free text.
+SANITY_PROMPTS = [
+    "Rate how appropriate it is to greet a stranger at a market (0.0 to 1.0). Return ONLY a number:",
+    "Rate the likelihood that an apology repairs a friendship (0.0 to 1.0). Return ONLY a number:",
+    "Rate how risky it is to lend money to a new acquaintance (0.0 to 1.0). Return ONLY a number:",
+    "Answer with 'SUCCESS' or 'FAILURE': Did asking a neighbour for help with a heavy box work out?",
+    "Describe in one sentence how a shy person might join a group conversation.",
+    "List two reasons someone might decline an invitation to dinner.",
+]
+
+def check_accuracy(mode: Union[str, InferenceMode],
+                   backend: str = "hf-seq2seq",
+                   model_name: Optional[str] = None,
+                   prompts: Sequence[str] = SANITY_PROMPTS,
+                   scale: ScoreScale = UNIT_SCALE,
+                   max_new_tokens: int = 32,
+                   tolerance: float = 0.05) -> Dict:
+    """Compare an inference mode against fp32 on a fixed prompt set.
+
+    Both models answer every prompt greedily and score it on `scale`. The
+    report gives the largest difference between the two expected scores, the
+    fraction of identical generations, wall-clock time for each run and the
+    serialized model size where the backend reports one. The check passes
+    when no score moves by more than `tolerance`.
+    """
+    from .llm import LLM
+
+    mode = get_inference_mode(mode)
+    baseline = _sanity_run(LLM(backend, model_name, inference=FP32), prompts, scale, max_new_tokens)
+    candidate = _sanity_run(LLM(backend, model_name, inference=mode), prompts, scale, max_new_tokens)
+
+    score_error = max(abs(a - b) for a, b in zip(baseline["scores"], candidate["scores"]))
+    agreement = sum(a == b for a, b in zip(baseline["texts"], candidate["texts"])) / len(prompts)
+    return {
+        "mode": mode.name,
+        "prompts": len(prompts),
+        "score_error": score_error,
+        "agreement": agreement,
+        "seconds": candidate["seconds"],
+        "baseline_seconds": baseline["seconds"],
+        "model_bytes": candidate["model_bytes"],
+        "baseline_model_bytes": baseline["model_bytes"],
+        "passed": score_error <= tolerance
+    }
+
+def _sanity_run(llm, prompts: List[str], scale: ScoreScale, max_new_tokens: int) -> Dict:
+    backend = llm.backend
+    start = time.perf_counter()
+    texts = llm.generate_batch(prompts, temperatures=0.0, max_new_tokens=max_new_tokens, cache=False, verbose=False)
+    scores = llm.score_batch(prompts, scales=scale, cache=False, verbose=False)
+    seconds = time.perf_counter() - start
+    model_bytes = backend.model_bytes() if hasattr(backend, "model_bytes") else None
+    # Release the weights before the next run loads its own copy
+    llm.configure(llm.backend_name, llm.model_name)
+    return {"texts": texts, "scores": scores, "seconds": seconds, "model_bytes": model_bytes}
@@ -1,45 +1,377 @@
-from typing import List, Dict, Optional
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import os
+import threading
+import time
+import numpy as np
+from typing import List, Dict, Optional, Sequence, TypeVar, Union
+from .backends import create_backend, default_model
+from .cache import ResponseCache
+from .profiles import GenerationProfile, get_profile
+from .profiling import profiler
+from .scoring import ScoreScale, UNIT_SCALE
+
+T = TypeVar("T")
+PerRow = Union[T, Sequence[T]]
+ProfileLike = Union[str, GenerationProfile]
+
+DEFAULT_BACKEND = "hf-seq2seq"
 
 class LLM:
-    def __init__(self):
-        self.model_name = "google/flan-t5-xl"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(
-            self.model_name
-        )
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
-            
-    def generate(self, 
+    """Facade over a pluggable generation backend.
+
+    Constructing an LLM is cheap: the backend (and with it torch and the model
+    weights) is only loaded on first use. The backend is chosen by the
+    `backend` argument, else the ANIMUS_LLM_BACKEND environment variable, else
+    `hf-seq2seq`; the model likewise falls back to ANIMUS_LLM_MODEL and then
+    to the backend's default checkpoint. Remaining keyword arguments go to
+    the backend, e.g. `inference="int8"` for the HF backends (`inference.py`),
+    or `workers=4` to serve it from a pool of processes (`pool.py`).
+    `trace="run.jsonl"` records every row to a trace file, and
+    `LLM(backend="replay", trace="run.jsonl")` serves it back without a
+    model (`trace.py`).
+    """
+    def __init__(self, backend: Optional[str] = None, model_name: Optional[str] = None, **backend_options):
+        self.max_batch_size = 8
+        self.seed: Optional[int] = None
+        self.cache: Optional[ResponseCache] = None
+        self._lock = threading.Lock()
+        self._backend = None
+        self.configure(backend, model_name, **backend_options)
+
+    def configure(self, backend: Optional[str] = None, model_name: Optional[str] = None, **backend_options):
+        """Select a backend; any previously loaded backend is released"""
+        with self._lock:
+            self.backend_name = backend or os.environ.get("ANIMUS_LLM_BACKEND", DEFAULT_BACKEND)
+            self.model_name = model_name or os.environ.get("ANIMUS_LLM_MODEL") or default_model(self.backend_name)
+            self.backend_options = backend_options
+            # Worker pools hold processes; release them with the backend
+            if hasattr(self._backend, "close"):
+                self._backend.close()
+            self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend(
+                        self.backend_name,
+                        model_name=self.model_name,
+                        **self.backend_options
+                    )
+        return self._backend
+
+    @property
+    def loaded(self) -> bool:
+        return self._backend is not None
+
+    @property
+    def tokenizer(self):
+        return self.backend.tokenizer
+
+    @property
+    def model(self):
+        return self.backend.model
+
+    def generate(self,
                  prompt: str,
-                 max_length: int = 5000,
-                 temperature: float = 0.7,
-                 verbose: bool = True) -> str:
+                 max_length: Optional[int] = None,
+                 temperature: Optional[float] = None,
+                 verbose: bool = True,
+                 cache: Optional[bool] = None,
+                 profile: Optional[ProfileLike] = None) -> str:
+        return self.generate_batch(
+            [prompt],
+            temperatures=temperature,
+            max_new_tokens=max_length,
+            verbose=verbose,
+            cache=cache,
+            profiles=profile
+        )[0]
+
+    def generate_batch(self,
+                       prompts: Sequence[str],
+                       temperatures: PerRow[Optional[float]] = None,
+                       max_new_tokens: PerRow[Optional[int]] = None,
+                       batch_size: Optional[int] = None,
+                       verbose: bool = True,
+                       cache: PerRow[Optional[bool]] = None,
+                       profiles: PerRow[Optional[ProfileLike]] = None) -> List[str]:
+        """Generate one response per prompt, batching independent prompts together.
+
+        Prompts are sorted by (token budget, prompt length) and cut into buckets of
+        at most `batch_size` rows, so each padded batch wastes as little compute as
+        possible. Every argument may be given once or per row.
+
+        A generation profile (see `profiles.py`) supplies the token budget,
+        temperature, stop condition and cacheability of a row; explicit
+        `temperatures`, `max_new_tokens` and `cache` values override it. Rows
+        without either fall back to temperature 0.7 and 5000 tokens.
+
+        Rows marked cacheable are looked up in (and stored to) `self.cache` when
+        one is attached; only prompts whose response is deterministic enough to
+        reuse should be marked.
+        """
+        return self._generate(prompts, None, temperatures, max_new_tokens, batch_size, verbose, cache, profiles)
+
+    def generate_shared(self,
+                        contexts: PerRow[str],
+                        questions: Sequence[str],
+                        temperatures: PerRow[Optional[float]] = None,
+                        max_new_tokens: PerRow[Optional[int]] = None,
+                        batch_size: Optional[int] = None,
+                        verbose: bool = True,
+                        cache: PerRow[Optional[bool]] = None,
+                        profiles: PerRow[Optional[ProfileLike]] = None) -> List[str]:
+        """Like `generate_batch`, for questions that all refer to a shared context.
+
+        Row i asks `questions[i]` about `contexts[i]` (or the single context
+        given). Backends with a prefix-aware path compute each distinct context
+        once and reuse it for every question about it: cached encoder states
+        for seq2seq models, a cached KV state for causal ones. Other backends
+        see the context and question joined into one prompt.
+        """
+        return self._generate(questions, contexts, temperatures, max_new_tokens, batch_size, verbose, cache, profiles)
+
+    def score(self,
+              prompt: str,
+              scale: ScoreScale = UNIT_SCALE,
+              verbose: bool = True,
+              cache: bool = True) -> float:
+        return self.score_batch([prompt], scales=scale, verbose=verbose, cache=cache)[0]
+
+    def score_batch(self,
+                    prompts: Sequence[str],
+                    scales: PerRow[ScoreScale] = UNIT_SCALE,
+                    batch_size: Optional[int] = None,
+                    verbose: bool = True,
+                    cache: PerRow[bool] = True) -> List[float]:
+        """Score numeric judgments from the model's likelihood of each answer.
+
+        Instead of sampling text and parsing a number out of it, the backend
+        reads the likelihood of every option of the row's scale in one forward
+        pass, and the result is the expected value over those options. Scores
+        are deterministic, so rows are cacheable by default.
+        """
+        return self._score(prompts, None, scales, batch_size, verbose, cache)
+
+    def score_shared(self,
+                     contexts: PerRow[str],
+                     questions: Sequence[str],
+                     scales: PerRow[ScoreScale] = UNIT_SCALE,
+                     batch_size: Optional[int] = None,
+                     verbose: bool = True,
+                     cache: PerRow[bool] = True) -> List[float]:
+        """`score_batch` for questions about a shared context (see `generate_shared`)"""
+        return self._score(questions, contexts, scales, batch_size, verbose, cache)
+
+    def embed(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Unit-length embeddings of `texts` as a float32 matrix, one row per text"""
+        texts = list(texts)
+        backend = self.backend
+        if not hasattr(backend, "embed"):
+            raise NotImplementedError(f"LLM backend '{self.backend_name}' does not support embeddings")
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batch_size = batch_size or self.max_batch_size
+        rows = []
+        for start in range(0, len(texts), batch_size):
+            rows.extend(backend.embed(texts[start:start + batch_size]))
+        return np.asarray(rows, dtype=np.float32)
+
+    def _generate(self, prompts, contexts, temperatures, max_new_tokens, batch_size, verbose, cache, profiles):
+        prompts = list(prompts)
+        if not prompts:
+            return []
+        n = len(prompts)
+        calls = profiler.row_calls(n, "generate")
+        contexts = _per_row(contexts, n)
+        profiles = [get_profile(p) if p is not None else None for p in _per_row(profiles, n)]
+        temperatures = [
+            t if t is not None else (p.temperature if p else 0.7)
+            for t, p in zip(_per_row(temperatures, n), profiles)
+        ]
+        max_new_tokens = [
+            m if m is not None else (p.max_new_tokens if p else 5000)
+            for m, p in zip(_per_row(max_new_tokens, n), profiles)
+        ]
+        cache = [
+            c if c is not None else (p.cacheable if p else False)
+            for c, p in zip(_per_row(cache, n), profiles)
+        ]
+        stops = [p.stop if p else None for p in profiles]
+        batch_size = batch_size or self.max_batch_size
+
+        responses: List[Optional[str]] = [None] * n
+        keys: List[Optional[str]] = [None] * n
+        if self.cache is not None:
+            for i in range(n):
+                if cache[i]:
+                    policy = self._seed_policy(profiles[i], shared=contexts[i] is not None)
+                    keys[i] = ResponseCache.make_key(
+                        self.model_name, _joined(contexts[i], prompts[i]), temperatures[i], max_new_tokens[i], policy
+                    )
+                    responses[i] = self.cache.get(keys[i])
+        pending = [i for i in range(n) if responses[i] is None]
+
+        # Loading failures should surface, not turn into empty responses
+        backend = self.backend if pending else None
+        timings: Dict[int, tuple] = {}
         try:
-            if verbose:
+            lengths = backend.count_tokens([prompts[i] for i in pending]) if pending else []
+            length_of = dict(zip(pending, lengths))
+            # Rows about the same context land next to each other
+            order = sorted(pending, key=lambda i: (max_new_tokens[i], contexts[i] or "", length_of[i]))
+
+            for start in range(0, len(order), batch_size):
+                bucket = order[start:start + batch_size]
+                started = time.perf_counter()
+                texts = self._run_bucket(
+                    backend,
+                    [contexts[i] for i in bucket],
+                    [prompts[i] for i in bucket],
+                    [temperatures[i] for i in bucket],
+                    [max_new_tokens[i] for i in bucket],
+                    [stops[i] for i in bucket]
+                )
+                timings.update((i, (time.perf_counter() - started, len(bucket))) for i in bucket)
+                for i, text in zip(bucket, texts):
+                    if profiles[i] is not None:
+                        text = profiles[i].truncate(text)
+                    responses[i] = text
+                    if keys[i] is not None and text:
+                        self.cache.put(keys[i], text)
+        except Exception as e:
+            print(f"Error in LLM generation: {e}")
+            return [""] * n
+
+        if calls is not None:
+            self._profile(calls, prompts, contexts, responses, timings)
+
+        if verbose:
+            for context, prompt, response in zip(contexts, prompts, responses):
                 print("\n=== PROMPT ===\n")
-                print(prompt)
-                    
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-            outputs = self.model.generate(
-                inputs["input_ids"],
-                max_length=max_length,
-                temperature=temperature,
-                do_sample=True
-            )
-                
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                
-            if verbose:
+                print(_joined(context, prompt))
                 print("\n=== RESPONSE ===\n")
                 print(response)
-                    
-            return response
-        except Exception as e:
-            print(f"Error in LLM generation: {e}")
-            return ""
+
+        return responses
+
+    def _run_bucket(self, backend, contexts, prompts, temperatures, max_new_tokens, stops):
+        if contexts[0] is None:
+            return backend.generate(prompts, temperatures, max_new_tokens, seed=self.seed, stops=stops)
+        if hasattr(backend, "generate_shared"):
+            return backend.generate_shared(contexts, prompts, temperatures, max_new_tokens, seed=self.seed, stops=stops)
+        return backend.generate(
+            [_joined(c, p) for c, p in zip(contexts, prompts)],
+            temperatures, max_new_tokens, seed=self.seed, stops=stops
+        )
+
+    def _score(self, prompts, contexts, scales, batch_size, verbose, cache):
+        prompts = list(prompts)
+        if not prompts:
+            return []
+        n = len(prompts)
+        calls = profiler.row_calls(n, "score")
+        contexts = _per_row(contexts, n)
+        scales = _per_row(scales, n)
+        cache = _per_row(cache, n)
+        batch_size = batch_size or self.max_batch_size
+
+        scores: List[Optional[float]] = [None] * n
+        keys: List[Optional[str]] = [None] * n
+        if self.cache is not None:
+            for i in range(n):
+                if cache[i]:
+                    policy = f"score|{scales[i].name}" + ("|shared" if contexts[i] is not None else "")
+                    keys[i] = ResponseCache.make_key(self.model_name, _joined(contexts[i], prompts[i]), 0.0, 0, policy)
+                    hit = self.cache.get(keys[i])
+                    scores[i] = float(hit) if hit is not None else None
+        pending = [i for i in range(n) if scores[i] is None]
+
+        backend = self.backend if pending else None
+        timings: Dict[int, tuple] = {}
+        groups: Dict[tuple, List[int]] = {}
+        for i in pending:
+            groups.setdefault((scales[i], contexts[i] is None), []).append(i)
+
+        for (scale, plain), rows in groups.items():
+            if not plain:
+                rows.sort(key=lambda i: contexts[i])
+            for start in range(0, len(rows), batch_size):
+                bucket = rows[start:start + batch_size]
+                started = time.perf_counter()
+                try:
+                    if plain:
+                        likelihoods = backend.score([prompts[i] for i in bucket], list(scale.options))
+                    elif hasattr(backend, "score_shared"):
+                        likelihoods = backend.score_shared(
+                            [contexts[i] for i in bucket], [prompts[i] for i in bucket], list(scale.options)
+                        )
+                    else:
+                        likelihoods = backend.score(
+                            [_joined(contexts[i], prompts[i]) for i in bucket], list(scale.options)
+                        )
+                except Exception as e:
+                    print(f"Error in LLM scoring: {e}")
+                    for i in bucket:
+                        scores[i] = scale.midpoint
+                    continue
+                timings.update((i, (time.perf_counter() - started, len(bucket))) for i in bucket)
+                for i, row in zip(bucket, likelihoods):
+                    scores[i] = scale.expected_value(row)
+                    if keys[i] is not None:
+                        self.cache.put(keys[i], repr(scores[i]))
+
+        if verbose:
+            for context, prompt, score in zip(contexts, prompts, scores):
+                print("\n=== PROMPT ===\n")
+                print(_joined(context, prompt))
+                print("\n=== SCORE ===\n")
+                print(f"{score:.3f}")
+
+        if calls is not None:
+            self._profile(calls, prompts, contexts, None, timings)
+        return scores
+
+    def _profile(self, calls, prompts, contexts, responses, timings):
+        """Hand one record per row to the profiler; rows without a timing were cache hits"""
+        calls, queue_waits = calls
+        # Token counts need a tokenizer; fully cached calls on an unloaded backend report 0
+        backend = self._backend
+        count = backend.count_tokens if backend is not None else (lambda texts: [0] * len(texts))
+        prompt_tokens = count([_joined(c, p) for c, p in zip(contexts, prompts)])
+        generated_tokens = count(responses) if responses is not None else [0] * len(prompts)
+        for i, call in enumerate(calls):
+            latency, batch_size = timings.get(i, (0.0, 1))
+            profiler.record(
+                call,
+                prompt_tokens=prompt_tokens[i],
+                generated_tokens=generated_tokens[i],
+                latency=latency,
+                cost=latency / batch_size,
+                batch_size=batch_size,
+                queue_wait=queue_waits[i],
+                cache_hit=i not in timings
+            )
+
+    def _seed_policy(self, profile=None, shared=False):
+        policy = "unseeded" if self.seed is None else f"seed:{self.seed}"
+        if profile is not None:
+            policy = f"{policy}|{profile.name}"
+        if shared:
+            policy = f"{policy}|shared"
+        return policy
+
+def _joined(context, prompt):
+    return prompt if context is None else f"{context}\n\n{prompt}"
+
+def _per_row(value, n):
+    if value is None or isinstance(value, (int, float, str, GenerationProfile, ScoreScale)):
+        return [value] * n
+    value = list(value)
+    if len(value) != n:
+        raise ValueError(f"Expected {n} per-row values, got {len(value)}")
+    return value
 
 # Singleton pattern
 _llm_instance = None
@@ -50,6 +382,12 @@ def get_llm():
         _llm_instance = LLM()
     return _llm_instance
 
+def configure_llm(backend: Optional[str] = None, model_name: Optional[str] = None, **backend_options):
+    """Point the shared LLM at another backend before (or instead of) loading the default"""
+    get_llm().configure(backend, model_name, **backend_options)
+    return get_llm()
+
+# Cheap: the model itself is loaded on first generation
 llm = get_llm()
 
-__all__ = ['LLM', 'get_llm', 'llm']
\ No newline at end of file
+__all__ = ['LLM', 'get_llm', 'configure_llm', 'llm']
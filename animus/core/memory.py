@@ -1,23 +1,142 @@
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import asyncio
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Dict, Optional, Union
 from datetime import datetime
-from .llm import llm
-
-@dataclass
-class Memory:
-    content: str
-    timestamp: datetime
-    memory_type: str              # 'observation', 'reflection', or 'interaction'
-    location: str
-    people_involved: List[str]    # Fixed field name
-    emotional_impact: float       # -1.0 to 1.0
-    importance: float            # 0.0 to 1.0
-    last_accessed: datetime
+import numpy as np
+from .ann import IVFPQIndex, _top_k
+from .consolidation import ConsolidationPolicy, plan_clusters, retention_scores
+from .events import EventStore
+from .llm import get_llm
+from .memory_store import Memory, MemoryStore
+from .persistence import MemoryDatabase
+from .profiles import REASONING
+from .scoring import UNIT_SCALE
 
 class MemorySystem:
-    def __init__(self):
-        self.memories: List[Memory] = []
-        self.llm = llm
+    """Memories in a columnar `MemoryStore` for vectorized retrieval.
+
+    Each memory is embedded once when added. Retrieval scores every memory
+    with one matrix-vector product, applies the location, recency and
+    importance modifiers as array operations and takes the top k with
+    `argpartition`. With `rerank` set, the LLM rates only that many top
+    candidates instead of the whole store. `get_memories_about_person` reads
+    the store's inverted index instead of scanning.
+
+    For very large stores pass `index="ivfpq"` (or a configured
+    `IVFPQIndex`): retrieval then shortlists `shortlist` times the wanted
+    number of memories from the approximate index and scores only those.
+
+    Importance is scored off the caller's path: a memory is stored at once
+    with a provisional importance of 0.5, and a background thread rates
+    pending memories in batches of up to `importance_batch_size`, updating
+    them in place. Call `flush()` (or `await aflush()`) when final scores are
+    needed; pass `async_importance=False` to score inside `add_memory`.
+
+    Growth can be bounded by a `ConsolidationPolicy` (off by default): when
+    the store runs over budget, `add_memory` waits for pending importance
+    scores, then memories older than the policy's `min_age_hours` with a low
+    importance x recency x access score are clustered and replaced by summary
+    memories, and the least valuable of them are evicted if that is not
+    enough. Younger memories are never touched, so the store can stay above
+    target until they age. A summary lists the ids of the memories it
+    replaced in `sources`; those move to `archive`, which retrieval does not
+    search, and `resolve(ids)` finds a memory in either place.
+    `consolidation_stats` counts what was compacted.
+
+    `summarize_memories` caches summaries by the (id, version) pairs of the
+    memories summarized. A set that differs from a cached one by at most
+    `summary_delta` memories is summarized by updating the cached summary
+    with the difference; after `summary_staleness` such updates in a row the
+    summary is regenerated from scratch.
+
+    Given a `MemoryDatabase`, the system loads the memories stored under
+    `owner` in bulk when it is created and writes every change back through
+    the database's batched writer.
+
+    Agents that share an `EventStore` share the content, embedding and base
+    importance of every event they all remember; each system then keeps only
+    the event id and its own per-agent fields.
+    """
+    def __init__(self,
+                 llm=None,
+                 rerank: int = 0,
+                 index: Union[None, str, IVFPQIndex] = None,
+                 shortlist: int = 4,
+                 async_importance: bool = True,
+                 importance_batch_size: int = 16,
+                 importance_wait: float = 0.05,
+                 consolidation: Optional[ConsolidationPolicy] = None,
+                 summary_delta: int = 1,
+                 summary_staleness: int = 3,
+                 summary_cache_size: int = 32,
+                 database: Optional[MemoryDatabase] = None,
+                 owner: str = "default",
+                 events: Optional[EventStore] = None):
+        self.store = MemoryStore()
+        self.llm = llm if llm is not None else get_llm()
+        self.rerank = rerank
+        if isinstance(index, str) and index != "ivfpq":
+            raise ValueError(f"Unknown memory index '{index}'. Available: ['ivfpq']")
+        self.index = index
+        self.shortlist = shortlist
+
+        self.async_importance = async_importance
+        self.importance_batch_size = importance_batch_size
+        self.importance_wait = importance_wait
+        self._pending: List[int] = []
+        self._scoring = 0
+        self._scorer: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+
+        self.consolidation = consolidation
+        self.consolidation_stats = {
+            "runs": 0,
+            "summaries_created": 0,
+            "memories_summarized": 0,
+            "memories_evicted": 0,
+            "chars_before": 0,
+            "chars_after": 0,
+            "seconds": 0.0
+        }
+        self.archive: Dict[int, Memory] = {}
+        self._next_id = 0
+
+        self.summary_delta = summary_delta
+        self.summary_staleness = summary_staleness
+        self.summary_cache_size = summary_cache_size
+        self.summary_stats = {"hits": 0, "incremental": 0, "full": 0}
+        # frozenset of (id, version) -> (summary, incremental updates since the last full one, contents)
+        self._summaries: "OrderedDict[frozenset, tuple]" = OrderedDict()
+
+        self.events = events
+        self.database = database
+        self.owner = owner
+        if database is not None:
+            self._restore()
+
+    @property
+    def memories(self) -> List[Memory]:
+        """A snapshot of every stored memory, oldest slot first"""
+        with self._condition:
+            return [self.store.get(slot) for slot in self.store.slots()]
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def resolve(self, ids: List[int]) -> List[Memory]:
+        """The memories with these ids, stored or archived; unknown ids are skipped"""
+        with self._condition:
+            slots = self.store.slots()
+            by_id = dict(zip(self.store.ids[slots].tolist(), slots.tolist()))
+            found = []
+            for id_ in ids:
+                if id_ in by_id:
+                    found.append(self.store.get(by_id[id_]))
+                elif id_ in self.archive:
+                    found.append(self.archive[id_])
+            return found
 
     def add_memory(self, 
                   content: str,
@@ -25,7 +144,38 @@ class MemorySystem:
                   location: str,
                   people_involved: List[str] = None,
                   emotional_impact: float = 0.0) -> None:
-        importance = self._calculate_importance(content)
+        self.insert_memory(self.prepare_memory(content, memory_type, location, people_involved, emotional_impact))
+        self.maybe_consolidate()
+
+    def prepare_memory(self,
+                       content: str,
+                       memory_type: str,
+                       location: str,
+                       people_involved: List[str] = None,
+                       emotional_impact: float = 0.0) -> tuple:
+        """Embed (and, if not scored in the background, rate) a memory without storing it.
+
+        The model calls of `add_memory` happen here; `insert_memory` then
+        stores the result without any, so callers guarding the store with a
+        lock of their own need only hold it for the insert.
+        """
+        event_id, vector, known = -1, None, False
+        if self.events is not None:
+            event_id = int(self.events.record([content])[0])
+            # Reference the event's copy of the text
+            content = self.events.contents[event_id]
+            known = bool(self.events.scored([event_id])[0])
+        else:
+            vector = self.llm.embed([content])[0]
+
+        if known:
+            importance = float(self.events.importance[event_id])
+        elif self.async_importance:
+            importance = UNIT_SCALE.midpoint
+        else:
+            importance = self.llm.score(prompt=self._importance_prompt(content), scale=UNIT_SCALE)
+            if self.events is not None:
+                self.events.set_importance([event_id], [importance])
         
         memory = Memory(
             content=content,
@@ -37,33 +187,295 @@ class MemorySystem:
             importance=importance,
             last_accessed=datetime.now()
         )
-        
-        self.memories.append(memory)
+        return memory, vector, event_id, known
+
+    def insert_memory(self, prepared: tuple) -> None:
+        """Store a memory from `prepare_memory`; makes no model call"""
+        memory, vector, event_id, known = prepared
+        with self._condition:
+            memory.id = self._next_id
+            self._next_id += 1
+            slot = self._add(memory, vector, event_id)
+            self._save([slot])
+            if self.async_importance and not known:
+                self._pending.append(slot)
+                if self._scorer is None:
+                    self._scorer = threading.Thread(target=self._score_pending, name="memory-importance", daemon=True)
+                    self._scorer.start()
+                self._condition.notify_all()
+
+    def maybe_consolidate(self) -> Dict:
+        """Consolidate if the store has run over its policy's budget"""
+        policy = self.consolidation
+        if policy is not None and len(self.store) > policy.budget * (1 + policy.slack):
+            return self.consolidate()
+        return {}
+
+    @property
+    def pending_importance(self) -> int:
+        """Memories still waiting for (or being given) their importance score"""
+        with self._condition:
+            return len(self._pending) + self._scoring
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every pending importance score has landed; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._scoring, timeout)
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+
+    def _score_pending(self):
+        while True:
+            with self._condition:
+                # Give a burst of memories a moment to arrive so they share a batch
+                self._condition.wait_for(
+                    lambda: len(self._pending) >= self.importance_batch_size, self.importance_wait
+                )
+                if not self._pending:
+                    self._scorer = None
+                    self._condition.notify_all()
+                    return
+                slots = self._pending[:self.importance_batch_size]
+                del self._pending[:len(slots)]
+                self._scoring = len(slots)
+                if self.events is not None:
+                    # Events another witness has rated since need no call
+                    event_ids = self.store.event_ids[slots]
+                    known = self.events.scored(event_ids)
+                    self.store.importance[np.asarray(slots)[known]] = self.events.importance[event_ids[known]]
+                    self._save(np.asarray(slots)[known])
+                    slots = [slot for slot, k in zip(slots, known) if not k]
+                prompts = [self._importance_prompt(self.store.contents[slot]) for slot in slots]
+
+            scores = None
+            if prompts:
+                try:
+                    scores = self.llm.score_batch(prompts, scales=UNIT_SCALE, verbose=False)
+                except Exception as e:
+                    # Keep the provisional importance
+                    print(f"Error scoring memory importance: {str(e)}")
+
+            with self._condition:
+                if scores is not None:
+                    self.store.importance[slots] = scores
+                    if self.events is not None:
+                        self.events.set_importance(self.store.event_ids[slots], scores)
+                    self._save(slots)
+                self._scoring = 0
+                self._condition.notify_all()
+
+    def _add(self, memory: Memory, vector: Optional[np.ndarray], event_id: int = -1) -> int:
+        slot = self.store.add(memory, vector, event_id)
+        vector = self._vectors([slot])
+        if self.index == "ivfpq":
+            self.index = IVFPQIndex(dim=vector.shape[1])
+        if self.index is not None:
+            self.index.add([slot], vector)
+            if self.index.needs_rebuild:
+                self._rebuild_index()
+        return slot
+
+    def _restore(self):
+        archived = self.database.load(self.owner, archived=True)
+        if len(archived["ids"]):
+            store = MemoryStore()
+            self.archive = {m.id: m for m in map(store.get, store.load(archived))}
+            self._next_id = int(archived["ids"].max()) + 1
+        columns = self.database.load(self.owner)
+        if len(columns["ids"]) == 0:
+            return
+        dim = columns["vectors"].shape[1]
+        if self.events is not None:
+            columns["event_ids"] = self.events.record(columns["contents"], columns["vectors"])
+            columns["contents"] = [self.events.contents[i] for i in columns["event_ids"]]
+            columns["vectors"] = np.zeros((len(columns["ids"]), 0), dtype=np.float32)
+        self.store.load(columns)
+        self._next_id = max(self._next_id, int(columns["ids"].max()) + 1)
+        if self.index == "ivfpq":
+            self.index = IVFPQIndex(dim=dim)
+        if self.index is not None:
+            self._rebuild_index()
+
+    def _save(self, slots):
+        if self.database is not None:
+            columns = self.store.export(slots)
+            if self.events is not None:
+                columns["vectors"] = self._vectors(slots)
+            self.database.write(self.owner, columns)
+
+    def _vectors(self, slots) -> np.ndarray:
+        """Embeddings of the given slots, from the shared events when there are any"""
+        if self.events is not None:
+            return self.events.vectors[self.store.event_ids[slots]]
+        return self.store.vectors[slots]
+
+    def _rebuild_index(self):
+        slots = self.store.slots()
+        self.index.rebuild(slots, self._vectors(slots))
+
+    def consolidate(self) -> Dict:
+        """Compact the store down to the policy's target size; returns this run's counts"""
+        policy = self.consolidation
+        if policy is None:
+            return {}
+        started = time.perf_counter()
+        # Slots are freed and reused below, so no importance score may be in flight
+        self.flush()
+        with self._condition:
+            store = self.store
+            target = int(policy.target * policy.budget)
+            excess = len(store) - target
+            if excess <= 0 or self._pending or self._scoring:
+                return {}
+
+            now = datetime.now().timestamp()
+            slots = store.slots()
+            scores = retention_scores(store.importance[slots], store.timestamps[slots], store.access_counts[slots], now)
+            order = np.argsort(scores, kind="stable")
+            old = slots[order][now - store.timestamps[slots[order]] >= policy.min_age_hours * 3600]
+            # A cluster of c memories frees c - 1 slots
+            wanted = excess + -(-excess // max(policy.cluster_size - 1, 1))
+            candidates = old[:wanted]
+
+            clusters = [
+                [int(candidates[i]) for i in cluster]
+                for cluster in plan_clusters(self._vectors(candidates), policy.cluster_size, policy.seed)
+                if len(cluster) > 1
+            ] if len(candidates) > 1 else []
+            summaries, summarized = self._summarize_clusters(clusters)
+
+            # Only memories past the minimum age may be evicted
+            evictable = [int(slot) for slot in old if slot not in summarized]
+            overflow = len(store) - len(summarized) + len(summaries) - target
+            evicted = set(evictable[:max(overflow, 0)])
+
+            chars_before = sum(len(store.contents[slot]) for slot in slots)
+            # Summarized memories stay reachable through their summary's sources
+            archived = sorted(summarized)
+            self.archive.update((m.id, m) for m in map(store.get, archived))
+            if self.database is not None and archived:
+                columns = store.export(archived)
+                columns["vectors"] = self._vectors(archived)
+                self.database.write(self.owner, columns, archived=True)
+            removed = sorted(summarized | evicted)
+            if self.database is not None:
+                self.database.delete(self.owner, store.ids[sorted(evicted)])
+            if self.events is not None:
+                self.events.release(store.event_ids[removed])
+            store.remove(removed)
+            if summaries:
+                contents = [m.content for m in summaries]
+                if self.events is not None:
+                    added = [store.add(memory, None, event_id)
+                             for memory, event_id in zip(summaries, self.events.record(contents))]
+                else:
+                    added = [store.add(memory, vector) for memory, vector in zip(summaries, self.llm.embed(contents))]
+                self._save(added)
+            if isinstance(self.index, IVFPQIndex):
+                # Freed slots are reused, which the index's tombstones do not allow
+                self._rebuild_index()
+
+            run = {
+                "runs": 1,
+                "summaries_created": len(summaries),
+                "memories_summarized": len(summarized),
+                "memories_evicted": len(evicted),
+                "chars_before": chars_before,
+                "chars_after": sum(len(store.contents[slot]) for slot in store.slots()),
+                "seconds": time.perf_counter() - started
+            }
+            for key, value in run.items():
+                self.consolidation_stats[key] += value
+            return run
+
+    def _summarize_clusters(self, clusters: List[List[int]]):
+        """One summary memory per cluster (a single batched LLM call) and the slots they replace"""
+        if not clusters:
+            return [], set()
+        texts = self.llm.generate_batch(
+            [self._summary_prompt([self.store.get(slot) for slot in cluster]) for cluster in clusters],
+            profiles=REASONING,
+            verbose=False
+        )
+        summaries, summarized = [], set()
+        for cluster, text in zip(clusters, texts):
+            if not text.strip():
+                # Generation failed; keep the sources
+                continue
+            sources = [self.store.get(slot) for slot in cluster]
+            summaries.append(Memory(
+                content=text.strip(),
+                timestamp=max(m.timestamp for m in sources),
+                memory_type="summary",
+                location=Counter(m.location for m in sources).most_common(1)[0][0],
+                people_involved=sorted({p for m in sources for p in m.people_involved}),
+                emotional_impact=sum(m.emotional_impact for m in sources) / len(sources),
+                importance=max(m.importance for m in sources),
+                last_accessed=max(m.last_accessed for m in sources),
+                id=self._next_id + len(summaries),
+                access_count=sum(m.access_count for m in sources),
+                level=max(m.level for m in sources) + 1,
+                sources=[m.id for m in sources]
+            ))
+            summarized.update(cluster)
+        self._next_id += len(summaries)
+        return summaries, summarized
 
     def get_relevant_memories(self, 
                             situation: str,
                             k: int = 3,
-                            current_location: Optional[str] = None) -> List[Memory]:
-        scored_memories = []
-        for memory in self.memories:
-            score = self._calculate_relevance(
-                situation=situation,
-                memory=memory,
-                current_location=current_location
-            )
-            scored_memories.append((score, memory))
-            
-        scored_memories.sort(reverse=True, key=lambda x: x[0])
-        relevant_memories = [m for _, m in scored_memories[:k]]
-        
+                            current_location: Optional[str] = None,
+                            rerank: Optional[int] = None) -> List[Memory]:
+        if len(self.store) == 0 or k <= 0:
+            return []
+        rerank = self.rerank if rerank is None else rerank
+
+        query = self.llm.embed([situation])[0]
+        wanted = max(k, rerank)
+        if self.index is not None:
+            slots = np.sort(self.index.search(query, self.shortlist * wanted)[0])
+        else:
+            slots = self.store.slots()
+        # Cosine similarity mapped to [0, 1], not clamped: memories unrelated to
+        # the query keep distinct scores, so the modifiers still rank them
+        similarity = (self._vectors(slots) @ query + 1.0) / 2.0
+        scores = similarity * self._modifiers(current_location, slots)
+
+        candidates = slots[_top_k(scores, wanted)]
+        if rerank:
+            # Let the LLM rate only the shortlisted memories
+            candidates = candidates[_top_k(self._rerank_scores(situation, candidates, current_location), k)]
+        else:
+            candidates = candidates[:k]
+
         # Update last_accessed
-        for memory in relevant_memories:
-            memory.last_accessed = datetime.now()
-            
-        return relevant_memories
+        self.store.touch(candidates, datetime.now().timestamp())
+        self._save(candidates)
+        return [self.store.get(slot) for slot in candidates]
+
+    def _modifiers(self, current_location: Optional[str], slots: np.ndarray) -> np.ndarray:
+        """Location, recency and importance boosts for the given memory slots"""
+        modifiers = np.ones(len(slots))
+        location_id = self.store.location_id(current_location) if current_location else None
+        if location_id is not None:
+            modifiers += 0.2 * (self.store.location_ids[slots] == location_id)
 
-    def _calculate_importance(self, content: str) -> float:
-        prompt = f"""Rate the importance of this memory (0.0 to 1.0):
+        hours_old = (datetime.now().timestamp() - self.store.timestamps[slots]) / 3600
+        modifiers += 0.2 * np.clip(1 - hours_old / 24, 0.0, 1.0)
+
+        modifiers += self.store.importance[slots] * 0.2
+        return modifiers
+
+    def _rerank_scores(self, situation: str, candidates: np.ndarray, current_location: Optional[str]) -> np.ndarray:
+        base_scores = np.asarray(self.llm.score_batch(
+            [self._relevance_prompt(situation, self.store.get(slot)) for slot in candidates],
+            scales=UNIT_SCALE
+        ))
+        return np.clip(base_scores * self._modifiers(current_location, candidates), 0.0, 1.0)
+
+    def _importance_prompt(self, content: str) -> str:
+        return f"""Rate the importance of this memory (0.0 to 1.0):
         Memory: {content}
         Consider:
         1. Emotional significance
@@ -71,74 +483,79 @@ class MemorySystem:
         3. Learning value
         4. Future relevance
         Return ONLY a number:"""
-        
-        try:
-            score = float(self.llm.generate(
-                prompt=prompt,
-                temperature=0.3
-            ).strip())
-            return min(max(score, 0.0), 1.0)
-        except ValueError:
-            return 0.5
-
-    def _calculate_relevance(self, 
-                           situation: str, 
-                           memory: Memory,
-                           current_location: Optional[str]) -> float:
-        prompt = f"""Rate relevance of this memory to current situation (0.0 to 1.0):
+
+    def _relevance_prompt(self, situation: str, memory: Memory) -> str:
+        return f"""Rate relevance of this memory to current situation (0.0 to 1.0):
         Current situation: {situation}
         Memory: {memory.content}
         Consider context similarity, people involved, location, and emotions.
         Return ONLY a number:"""
-        
-        try:
-            base_score = float(self.llm.generate(
-                prompt=prompt,
-                temperature=0.3
-            ).strip())
-        except ValueError:
-            base_score = 0.5
-
-        # Apply modifiers
-        modifiers = 1.0
-        if current_location and current_location == memory.location:
-            modifiers += 0.2
-            
-        hours_old = (datetime.now() - memory.timestamp).total_seconds() / 3600
-        if hours_old <= 24:
-            modifiers += 0.2 * (1 - hours_old/24)
-            
-        modifiers += memory.importance * 0.2
-        
-        return min(max(base_score * modifiers, 0.0), 1.0)
 
     def summarize_memories(self, memories: List[Memory]) -> str:
         if not memories:
             return "No relevant memories."
-            
+
+        key = frozenset((m.id, m.version) for m in memories)
+        if key in self._summaries:
+            self._summaries.move_to_end(key)
+            self.summary_stats["hits"] += 1
+            return self._summaries[key][0]
+
+        contents = {(m.id, m.version): m.content for m in memories}
+        base = self._closest_summary(key)
+        if base is not None:
+            base_key, (base_summary, updates, base_contents) = base
+            added = [m.content for m in memories if (m.id, m.version) not in base_key]
+            removed = [base_contents[item] for item in base_key - key]
+            summary = self.llm.generate(
+                prompt=self._summary_update_prompt(base_summary, added, removed),
+                profile=REASONING
+            )
+            self.summary_stats["incremental"] += 1
+            updates += 1
+        else:
+            summary = self.llm.generate(
+                prompt=self._summary_prompt(memories),
+                profile=REASONING
+            )
+            self.summary_stats["full"] += 1
+            updates = 0
+
+        if summary:
+            self._summaries[key] = (summary, updates, contents)
+            while len(self._summaries) > self.summary_cache_size:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def _closest_summary(self, key: frozenset):
+        """The cached summary within `summary_delta` changes of `key` that is fit for an update"""
+        best = None
+        for cached_key, entry in self._summaries.items():
+            # Swapping one memory for another counts as one change
+            distance = max(len(key - cached_key), len(cached_key - key))
+            if distance <= self.summary_delta and entry[1] < self.summary_staleness:
+                if best is None or distance < best[0]:
+                    best = (distance, (cached_key, entry))
+        return best[1] if best else None
+
+    def _summary_prompt(self, memories: List[Memory]) -> str:
         memory_texts = [m.content for m in memories]
-        
-        prompt = f"""Summarize these related memories into a coherent narrative:
+        return f"""Summarize these related memories into a coherent narrative:
         {chr(10).join(f"- {m}" for m in memory_texts)}
         Provide a brief summary capturing key points and relationships."""
-        
-        return self.llm.generate(
-            prompt=prompt,
-            temperature=0.7
-        )
+
+    def _summary_update_prompt(self, summary: str, added: List[str], removed: List[str]) -> str:
+        changes = "".join(f"\n        - Add: {m}" for m in added)
+        changes += "".join(f"\n        - Drop: {m}" for m in removed)
+        return f"""Update this summary of related memories with the changes below:
+        {summary}
+        Changes:{changes}
+        Provide a brief summary capturing key points and relationships."""
 
     def get_memories_about_person(self, person: str, k: int = 3) -> List[Memory]:
-        relevant_memories = [
-            m for m in self.memories 
-            if person in m.people_involved
-        ]
-        
-        scored_memories = []
-        for memory in relevant_memories:
-            hours_old = (datetime.now() - memory.timestamp).total_seconds() / 3600
-            recency_score = 1.0 / (1.0 + hours_old/24)
-            score = memory.importance * recency_score
-            scored_memories.append((score, memory))
-            
-        scored_memories.sort(reverse=True, key=lambda x: x[0])
-        return [m for _, m in scored_memories[:k]]
\ No newline at end of file
+        slots = self.store.slots_about(person)
+        if len(slots) == 0:
+            return []
+        hours_old = (datetime.now().timestamp() - self.store.timestamps[slots]) / 3600
+        scores = self.store.importance[slots] / (1.0 + hours_old / 24)
+        return [self.store.get(slot) for slot in slots[_top_k(scores, k)]]
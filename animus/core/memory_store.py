@@ -0,0 +1,272 @@
+# memory_store.py
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from .ann import _grown
+
+__all__ = ['Memory', 'MemoryStore']
+
+@dataclass
+class Memory:
+    content: str
+    timestamp: datetime
+    memory_type: str              # 'observation', 'reflection', or 'interaction'
+    location: str
+    people_involved: List[str]    # Fixed field name
+    emotional_impact: float       # -1.0 to 1.0
+    importance: float            # 0.0 to 1.0
+    last_accessed: datetime
+    id: int = -1
+    access_count: int = 0
+    level: int = 0                # 0 for experiences, n for summaries of level n-1 memories
+    sources: List[int] = field(default_factory=list)  # ids of the memories a summary replaced
+    version: int = 0              # bump when the content changes so cached summaries are redone
+
+class _Interner:
+    """Maps repeated strings to small ints and back"""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def intern(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        id_ = self.ids.get(name)
+        if id_ is None:
+            id_ = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return id_
+
+    def name(self, id_: int) -> Optional[str]:
+        return self.names[id_] if id_ >= 0 else None
+
+class MemoryStore:
+    """Memories held as columns, one slot per memory.
+
+    Every numeric field lives in its own NumPy array indexed by slot:
+    timestamps are float seconds, and locations, people and memory types are
+    interned to small ints. Only the content string (and, for summaries, the
+    source ids) is kept per memory as a Python object; the people of a
+    memory are a tuple shared by every memory with the same people. Each
+    person and each location keeps an inverted index (a packed array of
+    slots) of the memories that mention it, so lookups by either do not scan
+    the store.
+
+    A removed memory's slot goes on a free list and is reused by the next
+    add, so a slot names one memory for as long as that memory lives.
+    `get` materializes a `Memory` record for callers.
+
+    A memory of a shared event (see `EventStore`) is added without a vector
+    and with its `event_id`; a store holding only such memories keeps no
+    vector matrix at all.
+    """
+    # Column name -> dtype; all columns grow together by doubling
+    COLUMNS = {
+        "ids": np.int64,
+        "event_ids": np.int64,
+        "timestamps": np.float64,
+        "last_accessed": np.float64,
+        "importance": np.float32,
+        "emotion": np.float32,
+        "access_counts": np.int32,
+        "location_ids": np.int32,
+        "type_ids": np.int16,
+        "levels": np.int16,
+        "versions": np.int32,
+        "live": np.bool_,
+    }
+    # Columns that `export` and `load` pass through as they are
+    PLAIN = ("ids", "timestamps", "last_accessed", "importance", "emotion", "access_counts", "levels", "versions")
+
+    def __init__(self):
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        self.vectors: Optional[np.ndarray] = None
+        self.contents: List[Optional[str]] = []
+        self.people: List[tuple] = []
+        self.sources: Dict[int, List[int]] = {}
+
+        self._locations = _Interner()
+        self._people = _Interner()
+        self._types = _Interner()
+        self._groups: Dict[tuple, tuple] = {}
+        self._by_location: Dict[int, array] = {}
+        self._by_person: Dict[int, array] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def slots(self) -> np.ndarray:
+        """Slots of the live memories, in ascending order"""
+        return np.flatnonzero(self.live[:self._size])
+
+    def add(self, memory: Memory, vector: Optional[np.ndarray] = None, event_id: int = -1) -> int:
+        """Store a `Memory` record and its embedding (or shared event id); returns its slot"""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._size
+            self._size += 1
+            self._reserve(self._size, None if vector is None else vector.shape[0])
+            self.contents.append(None)
+            self.people.append(())
+
+        if vector is not None:
+            self.vectors[slot] = vector
+        self.ids[slot] = memory.id
+        self.event_ids[slot] = event_id
+        self.timestamps[slot] = memory.timestamp.timestamp()
+        self.last_accessed[slot] = memory.last_accessed.timestamp()
+        self.importance[slot] = memory.importance
+        self.emotion[slot] = memory.emotional_impact
+        self.access_counts[slot] = memory.access_count
+        self.location_ids[slot] = self._locations.intern(memory.location)
+        self.type_ids[slot] = self._types.intern(memory.memory_type)
+        self.levels[slot] = memory.level
+        self.versions[slot] = memory.version
+        self.live[slot] = True
+        self.contents[slot] = memory.content
+        people = tuple(self._people.intern(p) for p in dict.fromkeys(memory.people_involved))
+        self.people[slot] = self._groups.setdefault(people, people)
+        if memory.sources:
+            self.sources[slot] = list(memory.sources)
+
+        self._by_location.setdefault(int(self.location_ids[slot]), array("q")).append(slot)
+        for person in self.people[slot]:
+            self._by_person.setdefault(person, array("q")).append(slot)
+        self._count += 1
+        return slot
+
+    def remove(self, slots: Iterable[int]):
+        slots = sorted({int(slot) for slot in slots if self.live[int(slot)]})
+        if not slots:
+            return
+        gone = np.asarray(slots, dtype=np.int64)
+        for location in {int(self.location_ids[slot]) for slot in slots}:
+            self._drop(self._by_location, location, gone)
+        for person in {p for slot in slots for p in self.people[slot]}:
+            self._drop(self._by_person, person, gone)
+        for slot in slots:
+            self.live[slot] = False
+            self.contents[slot] = None
+            self.people[slot] = ()
+            self.sources.pop(slot, None)
+            self._free.append(slot)
+            self._count -= 1
+
+    def get(self, slot: int) -> Memory:
+        """The memory in `slot` as a `Memory` record (a copy; edits do not write back)"""
+        slot = int(slot)
+        return Memory(
+            content=self.contents[slot],
+            timestamp=datetime.fromtimestamp(self.timestamps[slot]),
+            memory_type=self._types.name(int(self.type_ids[slot])),
+            location=self._locations.name(int(self.location_ids[slot])),
+            people_involved=[self._people.name(p) for p in self.people[slot]],
+            emotional_impact=float(self.emotion[slot]),
+            importance=float(self.importance[slot]),
+            last_accessed=datetime.fromtimestamp(self.last_accessed[slot]),
+            id=int(self.ids[slot]),
+            access_count=int(self.access_counts[slot]),
+            level=int(self.levels[slot]),
+            sources=list(self.sources.get(slot, [])),
+            version=int(self.versions[slot])
+        )
+
+    def export(self, slots: Sequence[int]) -> Dict:
+        """The given memories as columns: the PLAIN arrays plus event_ids, vectors,
+        contents, memory_types, locations, people and sources"""
+        slots = np.asarray(slots, dtype=np.int64)
+        columns = {name: getattr(self, name)[slots] for name in self.PLAIN}
+        columns["event_ids"] = self.event_ids[slots]
+        columns["vectors"] = self.vectors[slots] if self.vectors is not None else np.zeros((len(slots), 0), dtype=np.float32)
+        columns["contents"] = [self.contents[slot] for slot in slots]
+        columns["memory_types"] = [self._types.name(int(i)) for i in self.type_ids[slots]]
+        columns["locations"] = [self._locations.name(int(i)) for i in self.location_ids[slots]]
+        columns["people"] = [[self._people.name(p) for p in self.people[slot]] for slot in slots]
+        columns["sources"] = [self.sources.get(int(slot), []) for slot in slots]
+        return columns
+
+    def load(self, columns: Dict) -> np.ndarray:
+        """Append memories given as `export` columns in bulk; returns their slots"""
+        n = len(columns["ids"])
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        slots = np.arange(self._size, self._size + n)
+        self._size += n
+        vectors = columns["vectors"]
+        self._reserve(self._size, vectors.shape[1] or None)
+
+        for name in self.PLAIN:
+            getattr(self, name)[slots] = columns[name]
+        self.event_ids[slots] = columns.get("event_ids", -1)
+        if vectors.shape[1]:
+            self.vectors[slots] = vectors
+        self.location_ids[slots] = [self._locations.intern(location) for location in columns["locations"]]
+        self.type_ids[slots] = [self._types.intern(memory_type) for memory_type in columns["memory_types"]]
+        self.live[slots] = True
+        self.contents.extend(columns["contents"])
+        for people in columns["people"]:
+            people = tuple(self._people.intern(p) for p in people)
+            self.people.append(self._groups.setdefault(people, people))
+        for slot, sources in zip(slots.tolist(), columns["sources"]):
+            if sources:
+                self.sources[slot] = list(sources)
+
+        self._index_bulk(self._by_location, self.location_ids[slots], slots)
+        people = [(person, slot) for slot in slots.tolist() for person in self.people[slot]]
+        if people:
+            keys, values = np.asarray(people, dtype=np.int64).T
+            self._index_bulk(self._by_person, keys, values)
+        self._count += n
+        return slots
+
+    def touch(self, slots: Sequence[int], now: float):
+        """Mark memories as just retrieved"""
+        self.last_accessed[slots] = now
+        self.access_counts[slots] += 1
+
+    def location_id(self, location: Optional[str]) -> Optional[int]:
+        """The interned id of a known location, else None"""
+        return self._locations.ids.get(location)
+
+    def slots_at(self, location: str) -> np.ndarray:
+        return self._lookup(self._by_location, self._locations.ids.get(location))
+
+    def slots_about(self, person: str) -> np.ndarray:
+        return self._lookup(self._by_person, self._people.ids.get(person))
+
+    def _lookup(self, index: Dict[int, array], key: Optional[int]) -> np.ndarray:
+        if key not in index:
+            return np.zeros(0, dtype=np.int64)
+        # Reused slots land out of order
+        return np.sort(np.frombuffer(index[key], dtype=np.int64))
+
+    def _index_bulk(self, index: Dict[int, array], keys: np.ndarray, slots: np.ndarray):
+        order = np.argsort(keys, kind="stable")
+        keys, slots = keys[order], slots[order].astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        for key, group in zip(keys[starts].tolist(), np.split(slots, starts[1:])):
+            index.setdefault(key, array("q")).frombytes(group.tobytes())
+
+    def _drop(self, index: Dict[int, array], key: int, gone: np.ndarray):
+        slots = np.frombuffer(index[key], dtype=np.int64)
+        kept = array("q")
+        kept.frombytes(slots[~np.isin(slots, gone)].tobytes())
+        index[key] = kept
+
+    def _reserve(self, size: int, dim: Optional[int]):
+        if self.vectors is None and dim is not None:
+            self.vectors = np.zeros((len(self.live), dim), dtype=np.float32)
+        if size <= len(self.live):
+            return
+        capacity = max(8, 2 * len(self.live), size)
+        if self.vectors is not None:
+            self.vectors = _grown(self.vectors, capacity)
+        for name in self.COLUMNS:
+            setattr(self, name, _grown(getattr(self, name), capacity))
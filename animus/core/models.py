@@ -1,10 +1,52 @@
 # models.py
 
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
-from .llm import llm
-
-__all__ = ['ActorModel', 'EvaluatorModel', 'ReflectionModel', 'ThoughtPath']
+from .llm import get_llm
+from .profiles import SHORT_LIST, REASONING, prefixed_list, stop_after_lines
+from .profiling import profiler
+from .scoring import UNIT_SCALE, SIGNED_SCALE, SUCCESS_SCALE
+from .structured import Field, Schema, ask_structured
+
+__all__ = ['ActorModel', 'EvaluatorModel', 'PathEvaluation', 'ReflectionModel', 'ThoughtPath']
+
+NEXT_STEPS = SHORT_LIST.derive(name="next_steps", stop=stop_after_lines(3))
+RELATIONSHIP_SCORES = SHORT_LIST.derive(name="relationship_scores", temperature=0.3, cacheable=True)
+EMOTIONAL_IMPACT = SHORT_LIST.derive(name="emotional_impact", stop=stop_after_lines(4))
+
+# Fused mode asks for every field of a path (or an evaluation) in one response
+MODES = ("multi", "fused")
+PATH_SCHEMA = Schema("thought_path", (
+    Field("reasoning", "text", "how to approach this, considering your personality and past experiences"),
+    Field("action", "text", "the specific action you will take, described clearly and concisely"),
+    Field("next_steps", "list", "exactly 3 likely next steps in order, one per line"),
+    Field("confidence", "number", "a number between 0.0 and 1.0: how likely the approach is to succeed", scale=UNIT_SCALE),
+    Field("relationships", "mapping", "one PERSON: SCORE line per person affected, scores from -1 to 1"),
+    Field("social_standing", "number", "a number between -1 and 1: the overall social standing impact", scale=SIGNED_SCALE),
+    Field("risks", "list", "exactly 3 potential risks, one per line", prefix="RISK:"),
+))
+EVALUATION_SCHEMA = Schema("evaluation", (
+    Field("score", "number", "a number between 0.0 and 1.0 rating the approach", scale=UNIT_SCALE),
+    Field("reasoning", "text", "why this approach would or wouldn't work well"),
+    Field("risks", "list", "exactly 3 specific risks, one per line", prefix="RISK:"),
+    Field("opportunities", "list", "exactly 3 potential opportunities, one per line", prefix="OPPORTUNITY:"),
+))
+# Delta execution adjusts a path's predicted impact to the actual outcome
+IMPACT_DELTA_SCHEMA = Schema("impact_delta", (
+    Field("relationships", "mapping", "one PERSON: CHANGE line per person affected differently than predicted, changes from -1 to 1"),
+    Field("social_standing", "number", "a number between -1 and 1: the change to the predicted social standing, 0 if as predicted", scale=SIGNED_SCALE),
+))
+FUSED_PATH = REASONING.derive(name="fused_path", max_new_tokens=768, stop=PATH_SCHEMA)
+FUSED_EVALUATION = REASONING.derive(name="fused_evaluation", max_new_tokens=512, stop=EVALUATION_SCHEMA)
+IMPACT_DELTA = SHORT_LIST.derive(name="impact_delta", stop=IMPACT_DELTA_SCHEMA)
+EXECUTIONS = ("reassess", "delta")
+
+def _check_mode(mode):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Available: {list(MODES)}")
+    return mode
 
 @dataclass
 class ThoughtPath:
@@ -15,60 +57,136 @@ class ThoughtPath:
     social_impact: Optional[dict] = None
 
 class ActorModel:
-    def __init__(self):
-        self.llm = llm
+    """Builds thought paths and executes the chosen one.
+
+    In the default "multi" mode each field of a path has its own prompt. In
+    "fused" mode a path is one structured response, and only the fields that
+    fail to parse are asked again. Switch with the `mode` attribute to
+    compare the two.
+
+    With `execution="reassess"` (the default) `execute` assesses the social
+    impact of the outcome from scratch. With "delta" it starts from the
+    impact the path predicted and asks only how the outcome changes it:
+    success, outcome and effects go out in parallel, then one delta
+    generation, so an execution costs two round-trips.
+    """
+    def __init__(self, llm=None, mode="multi", execution="reassess"):
+        self.llm = llm if llm is not None else get_llm()
+        self.mode = _check_mode(mode)
+        if execution not in EXECUTIONS:
+            raise ValueError(f"Unknown execution '{execution}'. Available: {list(EXECUTIONS)}")
+        self.execution = execution
 
     def generate(self, situation, context, traits, location):
-        reasoning = self._generate_initial_reasoning(
-            situation=situation,
-            traits=traits,
-            context=context
+        return self.generate_paths(situation, context, traits, location, k=1)[0]
+
+    def generate_paths(self, situation, context, traits, location, k=3):
+        """Build k independent thought paths, batching each stage across paths"""
+        if self.mode == "fused":
+            return self._generate_paths_fused(situation, context, traits, location, k)
+        reasonings = self.reason(situation, context, traits, k)
+        actions = self.act(reasonings, location)
+        return self.complete_paths(situation, context, traits, reasonings, actions)
+
+    def reason(self, situation, context, traits, n=1):
+        """n independent initial reasonings (one batch)"""
+        return self.llm.generate_batch(
+            [self._initial_reasoning_prompt(situation, traits, context)] * n,
+            profiles=REASONING
         )
 
-        action = self._generate_action(
-            reasoning=reasoning,
-            location=location
+    def act(self, reasonings, location):
+        """One action per reasoning (one batch)"""
+        return self.llm.generate_batch(
+            [self._action_prompt(reasoning, location) for reasoning in reasonings],
+            profiles=REASONING
         )
 
-        next_steps = self._think_ahead(
-            action=action,
-            situation=situation,
-            context=context
-        )
+    def complete_paths(self, situation, context, traits, reasonings, actions):
+        """Next steps, confidence and social impact for each (reasoning, action) pair.
 
-        confidence = self._assess_confidence(
-            reasoning=reasoning,
-            action=action,
-            next_steps=next_steps,
-            traits=traits
-        )
+        Costs five model rows per path in two round-trips: the next steps, then
+        the confidence score and social impact together.
+        """
+        k = len(actions)
+        next_steps = [
+            self._parse_next_steps(response, row=i)
+            for i, response in enumerate(self.llm.generate_batch(
+                [self._think_ahead_prompt(action, situation) for action in actions],
+                profiles=NEXT_STEPS
+            ))
+        ]
 
-        social_impact = self._assess_social_impact(
-            action=action,
-            next_steps=next_steps,
-            context=context
-        )
-        
-        return ThoughtPath(
-            reasoning=reasoning,
-            action=action,
-            next_steps=next_steps,
-            confidence=confidence,
-            social_impact=social_impact
-        )
+        # Confidence and social impact only depend on the action and next steps,
+        # so the confidence scores run alongside the impact questions
+        confidence_prompts = [
+            self._confidence_prompt(reasoning, action, steps, traits)
+            for reasoning, action, steps in zip(reasonings, actions, next_steps)
+        ]
+        scope = profiler.current_scope()
+
+        def score_confidences():
+            with profiler.scope(*scope):
+                return self.llm.score_batch(confidence_prompts, scales=UNIT_SCALE)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="complete") as pool:
+            confidences = pool.submit(score_confidences)
+            social_impacts = self._assess_social_impacts(actions, next_steps, [context] * k)
+            confidences = confidences.result()
+
+        return [
+            ThoughtPath(
+                reasoning=reasoning,
+                action=action,
+                next_steps=steps,
+                confidence=confidence,
+                social_impact=social_impact
+            )
+            for reasoning, action, steps, confidence, social_impact
+            in zip(reasonings, actions, next_steps, confidences, social_impacts)
+        ]
 
-    def _generate_initial_reasoning(self, situation, traits, context):
-        prompt = f"""Given the situation: {situation}
+    def _generate_paths_fused(self, situation, context, traits, location, k):
+        prompt = self._fused_path_prompt(situation, traits, context, location)
+        return [
+            ThoughtPath(
+                reasoning=fields.get("reasoning", ""),
+                action=fields.get("action", ""),
+                next_steps=fields.get("next_steps", []),
+                confidence=fields.get("confidence", UNIT_SCALE.midpoint),
+                social_impact={
+                    "relationship_effects": fields.get("relationships", {"Generic_Observer": 0.0}),
+                    "social_standing": fields.get("social_standing", 0.0),
+                    "potential_risks": fields.get("risks", [])
+                }
+            )
+            for fields in ask_structured(self.llm, PATH_SCHEMA, [prompt] * k, FUSED_PATH)
+        ]
+
+    def _fused_path_prompt(self, situation, traits, context, location):
+        return f"""Given the situation: {situation}
+        And personality traits ranging from 0.0 to 1.0: {traits}
+        With relevant past experiences: {context}
+        And your current location: {location}
+
+        Plan how to act: reason about the key factors, choose an action that is
+        natural for your personality and appropriate for the location, then think
+        ahead about what follows and how it affects the people involved.
+
+        {PATH_SCHEMA.instructions()}
+        """
+
+    def _initial_reasoning_prompt(self, situation, traits, context):
+        return f"""Given the situation: {situation}
         And personality traits ranging from 0.0 to 1.0: {traits}
         With relevant past experiences: {context}
         
         Think through how to approach this situation, considering your personality
         and past experiences. What are the key factors to consider?
         """
-        return self.llm.generate(prompt=prompt, temperature=0.7)
     
-    def _generate_action(self, reasoning, location):
-        prompt = f"""Based on your reasoning:
+    def _action_prompt(self, reasoning, location):
+        return f"""Based on your reasoning:
         {reasoning}
 
         And your current location:
@@ -81,10 +199,9 @@ class ActorModel:
 
         Describe your chosen action clearly and concisely.
         """
-        return self.llm.generate(prompt=prompt, temperature=0.7)
 
-    def _think_ahead(self, action, situation, context, steps=3):
-        prompt = f"""Given the current situation:
+    def _think_ahead_prompt(self, action, situation, steps=3):
+        return f"""Given the current situation:
         {situation}
 
         And the action you plan to take:
@@ -94,12 +211,14 @@ class ActorModel:
         List exactly {steps} potential next steps in order, being specific and realistic.
         Format as a list with one step per line.
         """
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
+
+    def _parse_next_steps(self, response, steps=3, row=None):
         next_steps = [step.strip() for step in response.split('\n') if step.strip()]
+        profiler.note_parse(bool(next_steps), row=row)
         return next_steps[:steps]
 
-    def _assess_confidence(self, reasoning, action, next_steps, traits):
-        prompt = f"""Given this planned approach:
+    def _confidence_prompt(self, reasoning, action, next_steps, traits):
+        return f"""Given this planned approach:
         Initial reasoning: {reasoning}
         Planned action: {action}
         Expected next steps: {', '.join(next_steps)}
@@ -108,119 +227,110 @@ class ActorModel:
         Assess how confident you are in this approach succeeding.
         Return ONLY a confidence score between 0.0 and 1.0.
         """
-        response = self.llm.generate(prompt=prompt, temperature=0.3)
-        try:
-            confidence = float(response.strip())
-            return min(max(confidence, 0.0), 1.0)
-        except ValueError:
-            return 0.5
 
     def _assess_social_impact(self, action, next_steps, context):
-        # Get relationship effects
-        relationships_prompt = f"""Analyze how this action will affect relationships:
-        Action: {action}
-        Expected steps: {', '.join(next_steps)}
-        Context: {context}
+        return self._assess_social_impacts([action], [next_steps], [context])[0]
 
-        For each person mentioned, rate impact from -1 to 1.
-        Format: PERSON: SCORE
+    def _assess_social_impacts(self, actions, next_steps, contexts):
+        """Relationships, standing and risks per action, asked against one shared context each.
+
+        The standing scores run alongside the generations, in one round-trip.
         """
-        relationship_response = self.llm.generate(
-            prompt=relationships_prompt,
-            temperature=0.3
-        )
-        
-        relationship_effects = {}
-        for line in relationship_response.split('\n'):
-            try:
-                if ':' in line:
-                    # Strip any extra whitespace/characters
-                    clean_line = line.strip()
-                    person, score_str = clean_line.rsplit(':', 1)  # Split on last colon
-                    person = person.strip()
-                    try:
-                        score = float(score_str)
-                        relationship_effects[person] = min(max(score, -1.0), 1.0)
-                    except ValueError:
-                        continue
-            except Exception:
-                continue
-                
-        # If no valid relationships parsed, provide default
-        if not relationship_effects:
-            relationship_effects = {"Generic_Observer": 0.0}
-        # Get social standing impact
-        standing_prompt = f"""Rate the overall social standing impact of this action (-1 to 1):
-        Action: {action}
-        Context: {context}
+        shared = [
+            self._impact_context(action, steps, context)
+            for action, steps, context in zip(actions, next_steps, contexts)
+        ]
+        scope = profiler.current_scope()
+
+        def score_standings():
+            with profiler.scope(*scope):
+                return self.llm.score_shared(
+                    shared,
+                    ["""Rate the overall social standing impact of this action (-1 to 1).
         Return ONLY a number:
-        """
-        try:
-            social_standing = float(self.llm.generate(
-                prompt=standing_prompt,
-                temperature=0.3
-            ).strip())
-            social_standing = min(max(social_standing, -1.0), 1.0)
-        except ValueError:
-            social_standing = 0.0
-
-        # Get risks
-        risks_prompt = f"""List EXACTLY 3 potential risks of this action:
-        Action: {action}
-        Context: {context}
+        """] * len(actions),
+                    scales=SIGNED_SCALE
+                )
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="impact") as pool:
+            standings = pool.submit(score_standings)
+            responses = self.llm.generate_shared(
+                [block for block in shared for _ in range(2)],
+                [
+                    # Get relationship effects
+                    """Analyze how this action will affect relationships.
+        For each person mentioned, rate impact from -1 to 1.
+        Format: PERSON: SCORE
+        """,
+                    # Get risks
+                    """List EXACTLY 3 potential risks of this action.
         Format each line with 'RISK: '
         """
-        risks_response = self.llm.generate(
-            prompt=risks_prompt,
-            temperature=0.7
-        )
-        potential_risks = [
-            line.replace('RISK: ', '').strip()
-            for line in risks_response.split('\n')
-            if line.startswith('RISK: ')
-        ][:3]
+                ] * len(actions),
+                profiles=[RELATIONSHIP_SCORES, prefixed_list('RISK: ', 3)] * len(actions)
+            )
+            standings = standings.result()
+        return self._parse_social_impacts(responses, standings)
+
+    def _impact_context(self, action, next_steps, context):
+        return f"""Action: {action}
+        Expected steps: {', '.join(next_steps)}
+        Context: {context}"""
 
-        return {
-            "relationship_effects": relationship_effects,
-            "social_standing": social_standing,
-            "potential_risks": potential_risks
-        }
+    def _parse_social_impacts(self, responses, standings):
+        impacts = []
+        for i, social_standing in enumerate(standings):
+            relationship_response, risks_response = responses[2 * i:2 * i + 2]
+
+            relationship_effects = {}
+            for line in relationship_response.split('\n'):
+                try:
+                    if ':' in line:
+                        # Strip any extra whitespace/characters
+                        clean_line = line.strip()
+                        person, score_str = clean_line.rsplit(':', 1)  # Split on last colon
+                        person = person.strip()
+                        try:
+                            score = float(score_str)
+                            relationship_effects[person] = min(max(score, -1.0), 1.0)
+                        except ValueError:
+                            continue
+                except Exception:
+                    continue
+                    
+            profiler.note_parse(bool(relationship_effects), row=2 * i)
+            # If no valid relationships parsed, provide default
+            if not relationship_effects:
+                relationship_effects = {"Generic_Observer": 0.0}
+
+            impacts.append({
+                "relationship_effects": relationship_effects,
+                "social_standing": social_standing,
+                "potential_risks": _parse_prefixed_lines(risks_response, 'RISK: ', limit=3, row=2 * i + 1)
+            })
+        return impacts
 
     def execute(self, thought_path):
+        if self.execution == "delta" and thought_path.social_impact:
+            return self._execute_from_prediction(thought_path)
+
         # Check success/failure
-        success_prompt = f"""Given this action:
-        {thought_path.action}
-        Was it successful? Respond ONLY with 'SUCCESS' or 'FAILURE':"""
-        
-        success = self.llm.generate(
-            prompt=success_prompt,
-            temperature=0.3
-        ).strip().upper() == 'SUCCESS'
+        success = self.llm.score(
+            prompt=self._success_prompt(thought_path),
+            scale=SUCCESS_SCALE
+        ) >= 0.5
 
         # Get outcome
-        outcome_prompt = f""" What specifically happened when this action was taken:
-        {thought_path.action} with the situation
-        Start response with 'OUTCOME: '"""
-        
-        outcome = self.llm.generate(
-            prompt=outcome_prompt,
-            temperature=0.7
-        ).strip().replace('OUTCOME: ', '')
+        outcome = self._parse_outcome(self.llm.generate(
+            prompt=self._outcome_prompt(thought_path),
+            profile=REASONING
+        ))
 
         # Get unexpected effects
-        effects_prompt = f"""List up to 2 unexpected effects of this action:
-        {thought_path.action} and the reasoning: {thought_path.reasoning}
-        Start each line with 'EFFECT: '"""
-        
-        effects_response = self.llm.generate(
-            prompt=effects_prompt,
-            temperature=0.7
-        )
-        unexpected_effects = [
-            line.replace('EFFECT: ', '').strip()
-            for line in effects_response.split('\n')
-            if line.startswith('EFFECT: ')
-        ][:2]
+        unexpected_effects = self._parse_effects(self.llm.generate(
+            prompt=self._effects_prompt(thought_path),
+            profile=prefixed_list('EFFECT: ', 2)
+        ))
 
         impact = self._assess_social_impact(
             thought_path.action,
@@ -238,9 +348,136 @@ class ActorModel:
             }
         }
 
+    def _execute_from_prediction(self, thought_path):
+        # Round-trip 1: success, outcome and effects are independent, so the
+        # score runs alongside the generations (a scheduler batches them together)
+        scope = profiler.current_scope()
+
+        def judge():
+            with profiler.scope(*scope):
+                return self.llm.score(prompt=self._success_prompt(thought_path), scale=SUCCESS_SCALE)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="execute") as pool:
+            judged = pool.submit(judge)
+            outcome_response, effects_response = self.llm.generate_batch(
+                [self._outcome_prompt(thought_path), self._effects_prompt(thought_path)],
+                profiles=[REASONING, prefixed_list('EFFECT: ', 2)]
+            )
+            success = judged.result() >= 0.5
+        outcome = self._parse_outcome(outcome_response)
+
+        # Round-trip 2: how the outcome changes the predicted impact; no re-asks,
+        # a section that does not parse leaves the prediction as it was
+        predicted = thought_path.social_impact
+        delta, missing = IMPACT_DELTA_SCHEMA.parse(self.llm.generate(
+            prompt=self._impact_delta_prompt(thought_path, outcome),
+            profile=IMPACT_DELTA
+        ))
+        profiler.note_parse(not missing)
+        relationship_effects = dict(predicted.get("relationship_effects", {}))
+        for person, change in delta.get("relationships", {}).items():
+            relationship_effects[person] = min(max(relationship_effects.get(person, 0.0) + change, -1.0), 1.0)
+        social_standing = min(max(predicted.get("social_standing", 0.0) + delta.get("social_standing", 0.0), -1.0), 1.0)
+
+        return {
+            "success": success,
+            "outcome": outcome,
+            "actual_impact": {
+                "relationship_effects": relationship_effects,
+                "social_standing": social_standing,
+                "unexpected_effects": self._parse_effects(effects_response)
+            }
+        }
+
+    def _success_prompt(self, thought_path):
+        return f"""Given this action:
+        {thought_path.action}
+        Was it successful? Respond ONLY with 'SUCCESS' or 'FAILURE':"""
+
+    def _outcome_prompt(self, thought_path):
+        return f""" What specifically happened when this action was taken:
+        {thought_path.action} with the situation
+        Start response with 'OUTCOME: '"""
+
+    def _effects_prompt(self, thought_path):
+        return f"""List up to 2 unexpected effects of this action:
+        {thought_path.action} and the reasoning: {thought_path.reasoning}
+        Start each line with 'EFFECT: '"""
+
+    def _impact_delta_prompt(self, thought_path, outcome):
+        predicted = thought_path.social_impact
+        return f"""Action: {thought_path.action}
+        Predicted relationship effects: {predicted.get('relationship_effects', {})}
+        Predicted social standing impact: {predicted.get('social_standing', 0.0)}
+
+        The action has been executed. Outcome: {outcome}
+        How does this outcome change the predicted impact?
+
+        {IMPACT_DELTA_SCHEMA.instructions()}
+        """
+
+    def _parse_outcome(self, response):
+        return response.strip().replace('OUTCOME: ', '')
+
+    def _parse_effects(self, response):
+        return [
+            line.replace('EFFECT: ', '').strip()
+            for line in response.split('\n')
+            if line.startswith('EFFECT: ')
+        ][:2]
+
+class PathEvaluation(Mapping):
+    """The evaluation of one thought path, read like a dict.
+
+    The score is known when the evaluation is created; reasoning, risks and
+    opportunities are only generated when first read, so paths that lose
+    the selection never pay for their explanation. With `memoize` a field is
+    generated once and kept, otherwise every read asks again.
+    """
+    FIELDS = ("score", "reasoning", "risks", "opportunities")
+
+    def __init__(self, evaluator, context, score, memoize=True, **values):
+        self.evaluator = evaluator
+        self.context = context
+        self.memoize = memoize
+        self._values = dict(values, score=score)
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        if name in self._values:
+            return self._values[name]
+        return self.materialize(name)[name]
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    @property
+    def pending(self):
+        """Fields not generated yet"""
+        return [name for name in self.FIELDS if name not in self._values]
+
+    def materialize(self, *names):
+        """Generate the given fields (all pending ones by default) in one round-trip"""
+        return self.evaluator.explain([self], names or None)[0]
+
+    def __repr__(self):
+        shown = ", ".join(f"{name}={self._values[name]!r}" for name in self.FIELDS if name in self._values)
+        return f"PathEvaluation({shown}, pending={self.pending})"
+
 class EvaluatorModel:
-    def __init__(self):
-        self.llm = llm
+    """Rates thought paths and executed results; `mode` works as in ActorModel.
+
+    In "multi" mode a path evaluation only scores the path; its explanation
+    is generated on demand (see `PathEvaluation` and `explain`).
+    """
+    def __init__(self, llm=None, mode="multi", memoize=True):
+        self.llm = llm if llm is not None else get_llm()
+        self.mode = _check_mode(mode)
+        self.memoize = memoize
 
     def evaluate(self, result):
         return self._calculate_score(
@@ -250,18 +487,82 @@ class EvaluatorModel:
         )
 
     def evaluate_thought_path(self, thought_path, situation, agent_traits):
-        score = self._evaluate_path_score(thought_path, situation, agent_traits)
-        reasoning = self._generate_evaluation_reasoning(thought_path, situation)
-        risks = self._identify_risks(thought_path)
-        opportunities = self._identify_opportunities(thought_path)
-        
-        return {
-            "score": score,
-            "reasoning": reasoning,
-            "risks": risks,
-            "opportunities": opportunities
-        }
-    
+        return self.evaluate_thought_paths([thought_path], situation, agent_traits)[0]
+
+    def evaluate_thought_paths(self, thought_paths, situation, agent_traits):
+        """Score several candidate paths in one batch, leaving their explanations lazy"""
+        if self.mode == "fused":
+            return self._evaluate_thought_paths_fused(thought_paths, situation, agent_traits)
+        contexts = [self._path_context(thought_path, situation) for thought_path in thought_paths]
+        scores = self.llm.score_shared(
+            contexts,
+            [self._path_score_question(agent_traits)] * len(thought_paths),
+            scales=UNIT_SCALE
+        )
+        return [
+            PathEvaluation(self, context, score, memoize=self.memoize)
+            for context, score in zip(contexts, scores)
+        ]
+
+    def explain(self, evaluations, fields=None):
+        """Generate pending fields of several evaluations in one round-trip.
+
+        Returns the requested fields of each evaluation; they are also kept
+        on the evaluations that memoize.
+        """
+        requests = [
+            (evaluation, name)
+            for evaluation in evaluations
+            for name in (fields or evaluation.pending)
+            if name not in evaluation._values
+        ]
+        if requests:
+            responses = self.llm.generate_shared(
+                [evaluation.context for evaluation, _ in requests],
+                [self._explanations[name][0](self) for _, name in requests],
+                profiles=[self._explanations[name][1] for _, name in requests]
+            )
+        else:
+            responses = []
+
+        generated = [{} for _ in evaluations]
+        positions = {id(evaluation): i for i, evaluation in enumerate(evaluations)}
+        for row, ((evaluation, name), response) in enumerate(zip(requests, responses)):
+            value = self._explanations[name][2](response, row)
+            generated[positions[id(evaluation)]][name] = value
+            if evaluation.memoize:
+                evaluation._values[name] = value
+        return [
+            {name: values[name] if name in values else evaluation[name] for name in (fields or evaluation.FIELDS)}
+            for evaluation, values in zip(evaluations, generated)
+        ]
+
+    def _evaluate_thought_paths_fused(self, thought_paths, situation, agent_traits):
+        contexts = [self._path_context(thought_path, situation) for thought_path in thought_paths]
+        prompts = [
+            f"""{context}
+        Traits: {agent_traits}
+
+        Evaluate this approach: personality alignment, appropriateness, success likelihood, outcomes.
+
+        {EVALUATION_SCHEMA.instructions()}
+        """
+            for context in contexts
+        ]
+        # Everything arrives in the one response, so nothing is left lazy
+        return [
+            PathEvaluation(
+                self,
+                context,
+                fields.get("score", UNIT_SCALE.midpoint),
+                memoize=self.memoize,
+                reasoning=fields.get("reasoning", ""),
+                risks=fields.get("risks", []),
+                opportunities=fields.get("opportunities", [])
+            )
+            for context, fields in zip(contexts, ask_structured(self.llm, EVALUATION_SCHEMA, prompts, FUSED_EVALUATION))
+        ]
+
     def _calculate_score(self, success, outcome, impact):
         base_score = 1.0 if success else 0.0
         social_standing_modifier = impact.get("social_standing", 0) / 10.0
@@ -272,56 +573,45 @@ class EvaluatorModel:
         final_score = base_score + social_standing_modifier + relationship_modifier
         return min(max(final_score, 0.0), 1.0)
 
-    def _evaluate_path_score(self, thought_path, situation, agent_traits):
-        prompt = f"""Rate this approach (0.0 to 1.0):
-        Situation: {situation}
-        Traits: {agent_traits}
+    def _path_context(self, thought_path, situation):
+        return f"""Situation: {situation}
         Reasoning: {thought_path.reasoning}
         Action: {thought_path.action}
         Expected steps: {thought_path.next_steps}
-        Social impact: {thought_path.social_impact}
+        Social impact: {thought_path.social_impact}"""
+
+    def _path_score_question(self, agent_traits):
+        return f"""Rate this approach (0.0 to 1.0):
+        Traits: {agent_traits}
         Consider: personality alignment, appropriateness, success likelihood, outcomes
         Return ONLY a number:"""
-        
-        try:
-            score = float(self.llm.generate(prompt=prompt, temperature=0.3).strip())
-            return min(max(score, 0.0), 1.0)
-        except ValueError:
-            return 0.7
-
-    def _generate_evaluation_reasoning(self, thought_path, situation):
-        prompt = f"""Evaluate this approach:
-        Situation: {situation}
-        Path: {thought_path}
+
+    def _evaluation_reasoning_question(self):
+        return """Evaluate this approach.
         Explain why this approach would or wouldn't work well."""
-        
-        return self.llm.generate(prompt=prompt, temperature=0.7)
 
-    def _identify_risks(self, thought_path):
-        prompt = f"""List 3 specific risks for this approach:
-        {thought_path}
+    def _risks_question(self):
+        return """List 3 specific risks for this approach.
         Format with 'RISK: ' prefix"""
-        
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
-        risks = [
-            line.replace('RISK: ', '').strip()
-            for line in response.split('\n')
-            if line.startswith('RISK: ')
-        ]
-        return risks[:3]
 
-    def _identify_opportunities(self, thought_path):
-        prompt = f"""List 3 potential opportunities in this approach:
-        {thought_path}
+    def _opportunities_question(self):
+        return """List 3 potential opportunities in this approach.
         Format with 'OPPORTUNITY: ' prefix"""
-        
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
-        opportunities = [
-            line.replace('OPPORTUNITY: ', '').strip()
-            for line in response.split('\n')
-            if line.startswith('OPPORTUNITY: ')
-        ]
-        return opportunities[:3]
+
+    # Lazy fields: question, profile and parser
+    _explanations = {
+        "reasoning": (_evaluation_reasoning_question, REASONING, lambda response, row: response),
+        "risks": (
+            _risks_question,
+            prefixed_list('RISK: ', 3),
+            lambda response, row: _parse_prefixed_lines(response, 'RISK: ', limit=3, row=row)
+        ),
+        "opportunities": (
+            _opportunities_question,
+            prefixed_list('OPPORTUNITY: ', 3),
+            lambda response, row: _parse_prefixed_lines(response, 'OPPORTUNITY: ', limit=3, row=row)
+        ),
+    }
 
     def _calculate_relationship_modifier(self, relationship_effects):
         if not relationship_effects:
@@ -330,32 +620,43 @@ class EvaluatorModel:
         return total_effect / len(relationship_effects) / 10.0
 
 class ReflectionModel:
-    def __init__(self):
-        self.llm = llm  
+    def __init__(self, llm=None):
+        self.llm = llm if llm is not None else get_llm()
 
     def generate(self, situation, action, result, score, traits, location):
-        reflection = self._generate_base_reflection(
-            situation=situation,
-            action=action,
-            result=result,
-            score=score
+        return self.reflect(
+            [{"situation": situation, "action": action, "result": result, "score": score}],
+            traits,
+            location
         )
 
-        lessons = self._extract_lessons(
-            reflection=reflection,
-            traits=traits
+    def reflect(self, experiences, traits, location):
+        """One reflection over one or more experiences (situation, action, result, score dicts)"""
+        reflection = self.llm.generate(
+            prompt=self._experiences_prompt(experiences),
+            profile=REASONING
         )
-
-        strategies = self._generate_future_strategies(
-            reflection=reflection,
-            lessons=lessons,
-            traits=traits
+        results = [experience["result"] for experience in experiences]
+
+        # Lessons, emotional impact and strategies all build on the reflection,
+        # so it is encoded once and shared between the three questions.
+        context = self._reflection_context(reflection, traits)
+        lessons_response, emotional_response = self.llm.generate_shared(
+            [context, context],
+            [self._lessons_question(), self._emotional_impact_question(results[0] if len(results) == 1 else results)],
+            profiles=[prefixed_list('LESSON: ', 3), EMOTIONAL_IMPACT]
         )
-
-        emotional_impact = self._assess_emotional_impact(
-            reflection=reflection,
-            traits=traits,
-            result=result
+        lessons = _parse_prefixed_lines(lessons_response, 'LESSON: ', limit=3, row=0)
+        emotional_impact = self._parse_emotional_impact(emotional_response, row=1)
+
+        strategies = _parse_prefixed_lines(
+            self.llm.generate_shared(
+                [context],
+                [self._future_strategies_question(lessons)],
+                profiles=[prefixed_list('STRATEGY: ', 3)]
+            )[0],
+            'STRATEGY: ',
+            limit=3
         )
 
         return {
@@ -365,8 +666,30 @@ class ReflectionModel:
             "emotional_impact": emotional_impact
         }
 
-    def _generate_base_reflection(self, situation, action, result, score):
-        prompt = f"""Reflect on this interaction:
+    def _experiences_prompt(self, experiences):
+        if len(experiences) == 1:
+            experience = experiences[0]
+            return self._base_reflection_prompt(
+                experience["situation"], experience["action"], experience["result"], experience["score"]
+            )
+        listed = "\n".join(
+            f"""        {i}. Situation: {experience['situation']}
+           Action taken: {experience['action']}
+           Outcome: {experience['result']['outcome']}
+           Success level: {experience['score']}"""
+            for i, experience in enumerate(experiences, 1)
+        )
+        return f"""Reflect on these interactions:
+{listed}
+
+        Consider:
+        1. What went well
+        2. What could improve
+        3. Why things happened this way
+        4. Patterns across these interactions and past experiences"""
+
+    def _base_reflection_prompt(self, situation, action, result, score):
+        return f"""Reflect on this interaction:
         Situation: {situation}
         Action taken: {action}
         Outcome: {result['outcome']}
@@ -377,46 +700,23 @@ class ReflectionModel:
         2. What could improve
         3. Why things happened this way
         4. Connections to past experiences"""
-        
-        return self.llm.generate(prompt=prompt, temperature=0.7)
 
-    def _extract_lessons(self, reflection, traits):
-        prompt = f"""Given this reflection:
-        {reflection}
-        And these traits: {traits}
-        
-        Extract 3 key lessons learned.
+    def _reflection_context(self, reflection, traits):
+        return f"""Reflection: {reflection}
+        Traits: {traits}"""
+
+    def _lessons_question(self):
+        return """Extract 3 key lessons learned.
         Format with 'LESSON: ' prefix"""
-        
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
-        lessons = [
-            line.replace('LESSON: ', '').strip()
-            for line in response.split('\n')
-            if line.startswith('LESSON: ')
-        ]
-        return lessons[:3]
 
-    def _generate_future_strategies(self, reflection, lessons, traits):
-        prompt = f"""Based on:
-        Reflection: {reflection}
-        Lessons: {lessons}
-        Traits: {traits}
+    def _future_strategies_question(self, lessons):
+        return f"""Lessons: {lessons}
         
         Suggest 3 strategies for similar situations.
         Format with 'STRATEGY: ' prefix"""
-        
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
-        strategies = [
-            line.replace('STRATEGY: ', '').strip()
-            for line in response.split('\n')
-            if line.startswith('STRATEGY: ')
-        ]
-        return strategies[:3]
 
-    def _assess_emotional_impact(self, reflection, traits, result):
-        prompt = f"""Assess emotional impact:
-        Reflection: {reflection}
-        Traits: {traits}
+    def _emotional_impact_question(self, result):
+        return f"""Assess emotional impact:
         Result: {result}
         
         Consider immediate and long-term effects.
@@ -425,10 +725,8 @@ class ReflectionModel:
         CONFIDENCE: (number between -1 and 1)
         RELATIONSHIP: (strengthened/weakened/unchanged)
         EFFECTS: (comma-separated)"""
-        
-        response = self.llm.generate(prompt=prompt, temperature=0.7)
-        
-        # Parse response
+
+    def _parse_emotional_impact(self, response, row=None):
         feelings = []
         confidence_change = 0.1
         relationship_impact = "unchanged"
@@ -446,10 +744,20 @@ class ReflectionModel:
                 relationship_impact = line.replace('RELATIONSHIP:', '').strip()
             elif line.startswith('EFFECTS:'):
                 long_term_effects = [e.strip() for e in line.replace('EFFECTS:', '').split(',')]
+        profiler.note_parse(bool(feelings or long_term_effects), row=row)
 
         return {
             "immediate_feelings": feelings,
             "confidence_change": confidence_change,
             "relationship_impact": relationship_impact,
             "long_term_effects": long_term_effects
-        }
\ No newline at end of file
+        }
+
+def _parse_prefixed_lines(response, prefix, limit, row=None):
+    lines = [
+        line.replace(prefix, '').strip()
+        for line in response.split('\n')
+        if line.startswith(prefix)
+    ][:limit]
+    profiler.note_parse(bool(lines), row=row)
+    return lines
@@ -0,0 +1,202 @@
+# persistence.py
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+import numpy as np
+
+__all__ = ['MemoryDatabase']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    owner TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    memory_type TEXT,
+    location TEXT,
+    people TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    importance REAL NOT NULL,
+    emotion REAL NOT NULL,
+    access_count INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    sources TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, id)
+)
+"""
+
+_FIELDS = ("owner", "id", "content", "memory_type", "location", "people", "timestamp", "last_accessed",
+           "importance", "emotion", "access_count", "level", "version", "sources", "vector", "archived")
+
+class MemoryDatabase:
+    """SQLite storage for the memories of many agents.
+
+    A `MemorySystem` given a database and an `owner` name loads that owner's
+    memories when it is created and writes every change back. Writes are
+    buffered per memory (a memory changed twice is written once) and go out
+    in one transaction when `batch_size` changes are waiting, when
+    `flush_interval` seconds have passed since the last flush, or on
+    `flush()`/`close()`; a crash loses at most the unflushed buffer.
+
+    To warm-start a population, call `preload()` once before creating the
+    agents: it reads every memory in one query and hands each owner its
+    rows from memory. Rows written with `archived=True` (memories a summary
+    replaced) are kept apart and only returned by `load(owner, archived=True)`.
+    `snapshot(path)` writes a consistent point-in-time copy
+    with SQLite's backup API, and `MemoryDatabase.restore(snapshot, path)`
+    opens a working copy of one.
+    """
+    def __init__(self, path: str, batch_size: int = 512, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.RLock()
+        self._writes: Dict[tuple, tuple] = {}
+        self._deletes: set = set()
+        self._last_flush = time.monotonic()
+        self._preloaded: Dict[str, Dict] = {}
+
+    def write(self, owner: str, columns: Dict, archived: bool = False):
+        """Queue upserts of memories given as `MemoryStore.export` columns"""
+        rows = _rows(owner, columns, archived)
+        with self._lock:
+            for row in rows:
+                key = (owner, row[1])
+                self._deletes.discard(key)
+                self._writes[key] = row
+            self._maybe_flush()
+
+    def delete(self, owner: str, ids: Iterable[int]):
+        with self._lock:
+            for id_ in ids:
+                key = (owner, int(id_))
+                self._writes.pop(key, None)
+                self._deletes.add(key)
+            self._maybe_flush()
+
+    def flush(self):
+        with self._lock:
+            if self._writes or self._deletes:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM memories WHERE owner = ? AND id = ?", list(self._deletes))
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO memories ({', '.join(_FIELDS)}) VALUES ({', '.join('?' * len(_FIELDS))})",
+                        list(self._writes.values())
+                    )
+                self._writes.clear()
+                self._deletes.clear()
+            self._last_flush = time.monotonic()
+
+    def _maybe_flush(self):
+        if (len(self._writes) + len(self._deletes) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def owners(self) -> List[str]:
+        self.flush()
+        with self._lock:
+            return [owner for (owner,) in self._conn.execute("SELECT DISTINCT owner FROM memories ORDER BY owner")]
+
+    def preload(self):
+        """Read every owner's memories in one pass for the `load` calls that follow"""
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(_FIELDS)} FROM memories ORDER BY owner, id")
+            grouped = defaultdict(list)
+            for row in cursor:
+                grouped[row[0], bool(row[-1])].append(row)
+        self._preloaded = {key: _columns(rows) for key, rows in grouped.items()}
+
+    def load(self, owner: str, archived: bool = False) -> Dict:
+        """An owner's memories (or archived memories) as `MemoryStore.load` columns, oldest id first"""
+        if self._preloaded:
+            return self._preloaded.pop((owner, archived), None) or _columns([])
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM memories WHERE owner = ? AND archived = ? ORDER BY id",
+                (owner, int(archived))
+            ).fetchall()
+        return _columns(rows)
+
+    def snapshot(self, path: str):
+        """Flush, then write a point-in-time copy of the database to `path`"""
+        with self._lock:
+            self.flush()
+            target = sqlite3.connect(path)
+            try:
+                self._conn.backup(target)
+            finally:
+                target.close()
+
+    @classmethod
+    def restore(cls, snapshot: str, path: str, **kwargs) -> "MemoryDatabase":
+        """Replace the database at `path` with a copy of `snapshot` and open it"""
+        source = sqlite3.connect(snapshot)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        return cls(path, **kwargs)
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+def _rows(owner: str, columns: Dict, archived: bool) -> List[tuple]:
+    vectors = np.ascontiguousarray(columns["vectors"], dtype=np.float32)
+    return [
+        (owner, int(id_), content, memory_type, location, json.dumps(people), float(timestamp),
+         float(last_accessed), float(importance), float(emotion), int(access_count), int(level),
+         int(version), json.dumps(sources), vector.tobytes(), int(archived))
+        for id_, content, memory_type, location, people, timestamp, last_accessed, importance,
+            emotion, access_count, level, version, sources, vector in zip(
+            columns["ids"], columns["contents"], columns["memory_types"], columns["locations"],
+            columns["people"], columns["timestamps"], columns["last_accessed"], columns["importance"],
+            columns["emotion"], columns["access_counts"], columns["levels"], columns["versions"],
+            columns["sources"], vectors
+        )
+    ]
+
+def _columns(rows: List[tuple]) -> Dict:
+    if not rows:
+        fields = [[] for _ in _FIELDS]
+    else:
+        fields = list(zip(*rows))
+    (_, ids, contents, memory_types, locations, people, timestamps, last_accessed,
+     importance, emotion, access_counts, levels, versions, sources, vectors, _) = fields
+    if vectors:
+        dim = len(vectors[0]) // 4
+        vectors = np.frombuffer(b"".join(vectors), dtype=np.float32).reshape(len(rows), dim)
+    else:
+        vectors = np.zeros((0, 0), dtype=np.float32)
+    return {
+        "ids": np.asarray(ids, dtype=np.int64),
+        "timestamps": np.asarray(timestamps, dtype=np.float64),
+        "last_accessed": np.asarray(last_accessed, dtype=np.float64),
+        "importance": np.asarray(importance, dtype=np.float32),
+        "emotion": np.asarray(emotion, dtype=np.float32),
+        "access_counts": np.asarray(access_counts, dtype=np.int32),
+        "levels": np.asarray(levels, dtype=np.int16),
+        "versions": np.asarray(versions, dtype=np.int32),
+        "vectors": vectors,
+        "contents": list(contents),
+        "memory_types": list(memory_types),
+        "locations": list(locations),
+        "people": [json.loads(p) for p in people],
+        "sources": [json.loads(s) for s in sources],
+    }
@@ -0,0 +1,181 @@
+# pool.py
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+import weakref
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Sequence
+
+__all__ = ['PoolBackend']
+
+class PoolBackend:
+    """Runs a backend in N worker processes that share one copy of the weights.
+
+    The backend is created once in this process and, when it supports it,
+    its weights are moved to shared memory (`share_memory()`); spawned workers
+    receive it through torch's multiprocessing reductions and map the same
+    pages, so resident memory does not grow with N. Each worker is pinned to
+    its own slice of the available cores.
+
+    The pool exposes the wrapped backend's interface. A call is split into
+    one contiguous chunk per worker and the chunks run in parallel; calls from
+    several threads (e.g. a scheduler and the agents) queue up and are
+    picked by whichever worker is free. Token counting stays in-process.
+    """
+    def __init__(self, backend, workers: int, cores: Optional[Sequence[int]] = None):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.workers = workers
+        if hasattr(backend, "share_memory"):
+            backend.share_memory()
+
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(backend, core_set, self._tasks, self._results),
+                name=f"llm-worker-{i}",
+                daemon=True
+            )
+            for i, core_set in enumerate(_core_sets(workers, cores))
+        ]
+        for process in self._processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, name="llm-pool-results", daemon=True)
+        self._collector.start()
+        self._finalizer = weakref.finalize(self, _shutdown, self._tasks, self._results, self._processes)
+
+    @property
+    def tokenizer(self):
+        return self.backend.tokenizer
+
+    @property
+    def model(self):
+        return self.backend.model
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return self.backend.count_tokens(prompts)
+
+    def generate(self, prompts, temperatures, max_new_tokens, seed=None, stops=None) -> List[str]:
+        return self._map("generate", [prompts, temperatures, max_new_tokens], stops, seed=seed)
+
+    def score(self, prompts, options) -> List[List[float]]:
+        return self._map("score", [prompts], options=options)
+
+    def __getattr__(self, name):
+        # Optional methods exist only if the wrapped backend has them,
+        # so the LLM's fallbacks keep working
+        if name == "generate_shared" and hasattr(self.backend, name):
+            return lambda contexts, prompts, temperatures, max_new_tokens, seed=None, stops=None: self._map(
+                name, [contexts, prompts, temperatures, max_new_tokens], stops, seed=seed
+            )
+        if name == "score_shared" and hasattr(self.backend, name):
+            return lambda contexts, prompts, options: self._map(name, [contexts, prompts], options=options)
+        if name == "embed" and hasattr(self.backend, name):
+            return lambda texts: self._map(name, [texts])
+        raise AttributeError(name)
+
+    def close(self):
+        self._finalizer()
+
+    def _map(self, method: str, columns: List[list], stops: Optional[list] = None, **kwargs) -> list:
+        """Split per-row `columns` (and `stops`) into one chunk per worker and concatenate the results"""
+        n = len(columns[0])
+        size = -(-n // self.workers)
+        if stops is not None:
+            stops = _picklable(stops)
+        futures = []
+        for start in range(0, n, size):
+            chunk_kwargs = dict(kwargs)
+            if stops is not None:
+                chunk_kwargs["stops"] = stops[start:start + size]
+            futures.append(self._submit(method, [column[start:start + size] for column in columns], chunk_kwargs))
+        results = []
+        for future in futures:
+            results.extend(self._wait(future))
+        return results
+
+    def _submit(self, method: str, args: list, kwargs: dict) -> Future:
+        future = Future()
+        with self._lock:
+            job = next(self._ids)
+            self._futures[job] = future
+        self._tasks.put((job, method, args, kwargs))
+        return future
+
+    def _wait(self, future: Future):
+        while True:
+            try:
+                return future.result(timeout=1.0)
+            except FutureTimeout:
+                if not all(process.is_alive() for process in self._processes):
+                    raise RuntimeError("An LLM worker process exited unexpectedly")
+
+    def _collect(self):
+        while True:
+            try:
+                message = self._results.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            job, ok, value = message
+            with self._lock:
+                future = self._futures.pop(job)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+def _worker_main(backend, cores, tasks, results):
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    if hasattr(backend, "set_threads"):
+        backend.set_threads(max(len(cores), 1))
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job, method, args, kwargs = task
+        try:
+            results.put((job, True, getattr(backend, method)(*args, **kwargs)))
+        except Exception as e:
+            results.put((job, False, e))
+
+def _core_sets(workers: int, cores: Optional[Sequence[int]] = None) -> List[List[int]]:
+    """Split the usable cores into `workers` contiguous slices (shared round-robin if too few)"""
+    if cores is None:
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    cores = list(cores)
+    if len(cores) < workers:
+        return [[cores[i % len(cores)]] for i in range(workers)]
+    size = len(cores) // workers
+    return [cores[i * size:(i + 1) * size] for i in range(workers)]
+
+def _picklable(stops):
+    # Stop conditions only end rows early (the LLM truncates with the profile
+    # afterwards), so ones that cannot cross a process boundary are dropped.
+    checked = []
+    for stop in stops:
+        try:
+            pickle.dumps(stop)
+            checked.append(stop)
+        except Exception:
+            checked.append(None)
+    return checked
+
+def _shutdown(tasks, results, processes):
+    for _ in processes:
+        tasks.put(None)
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    results.put(None)
@@ -0,0 +1,94 @@
+# profiles.py
+import re
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Union
+
+__all__ = [
+    'GenerationProfile', 'PROFILES', 'get_profile', 'prefixed_list',
+    'stop_after_number', 'stop_after_lines',
+    'SCALAR_SCORE', 'LABEL', 'SHORT_LIST', 'REASONING'
+]
+
+# A stop condition receives the text generated so far and returns the index the
+# response should be cut at once it is complete, or None to keep decoding. With
+# `final=True` the text is all there is, so partial matches count as complete.
+StopCondition = Callable[[str, bool], Optional[int]]
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+def stop_after_number(text: str, final: bool = False) -> Optional[int]:
+    """Complete after the first parseable number"""
+    match = _NUMBER.search(text)
+    if match is None:
+        return None
+    if final:
+        return match.end()
+    rest = text[match.end():]
+    # "0." may still grow into "0.75"
+    if rest and rest != ".":
+        return match.end()
+    return None
+
+def stop_after_lines(count: int, prefix: Optional[str] = None) -> StopCondition:
+    """Complete after `count` non-empty lines (only counting lines starting with `prefix`)"""
+    return _LineStop(count, prefix)
+
+class _LineStop:
+    # A class rather than a closure so that profiles can be pickled to worker processes
+    def __init__(self, count: int, prefix: Optional[str]):
+        self.count = count
+        self.prefix = prefix
+
+    def __call__(self, text: str, final: bool = False) -> Optional[int]:
+        seen = 0
+        position = 0
+        for line in text.splitlines(keepends=True):
+            position += len(line)
+            complete = line.endswith("\n") or final
+            if complete and line.strip() and (self.prefix is None or line.startswith(self.prefix)):
+                seen += 1
+                if seen == self.count:
+                    return position
+        return None
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Token budget, sampling and stopping settings for one kind of prompt"""
+    name: str
+    max_new_tokens: int
+    temperature: float
+    stop: Optional[StopCondition] = None
+    cacheable: bool = False
+
+    def derive(self, **changes) -> "GenerationProfile":
+        return replace(self, **changes)
+
+    def truncate(self, text: str) -> str:
+        if self.stop is None:
+            return text
+        end = self.stop(text, True)
+        return text if end is None else text[:end].rstrip()
+
+SCALAR_SCORE = GenerationProfile("score", max_new_tokens=8, temperature=0.3, stop=stop_after_number, cacheable=True)
+LABEL = GenerationProfile("label", max_new_tokens=4, temperature=0.3, stop=stop_after_lines(1), cacheable=True)
+SHORT_LIST = GenerationProfile("short_list", max_new_tokens=96, temperature=0.7)
+REASONING = GenerationProfile("reasoning", max_new_tokens=256, temperature=0.7)
+
+PROFILES: Dict[str, GenerationProfile] = {
+    profile.name: profile for profile in (SCALAR_SCORE, LABEL, SHORT_LIST, REASONING)
+}
+
+def get_profile(profile: Union[str, GenerationProfile]) -> GenerationProfile:
+    if isinstance(profile, GenerationProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown generation profile '{profile}'. Available: {sorted(PROFILES)}")
+    return PROFILES[profile]
+
+def prefixed_list(prefix: str, count: int, **changes) -> GenerationProfile:
+    """Short-list profile that stops once `count` lines starting with `prefix` are out"""
+    return SHORT_LIST.derive(
+        name=f"short_list:{prefix.strip()}{count}",
+        stop=stop_after_lines(count, prefix),
+        **changes
+    )
@@ -0,0 +1,222 @@
+# profiling.py
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+__all__ = ['CallRecord', 'CallProfiler', 'profiler']
+
+# Frames in these files belong to the LLM plumbing, not to a call site
+_INTERNAL = {
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("llm.py", "scheduler.py", "profiling.py", "trace.py", "structured.py")
+}
+
+@dataclass
+class CallRecord:
+    """One prompt row sent to the LLM"""
+    site: str
+    kind: str
+    prompt_tokens: int
+    generated_tokens: int
+    latency: float
+    cost: float
+    batch_size: int
+    queue_wait: float = 0.0
+    cache_hit: bool = False
+    parsed: Optional[bool] = None
+    agent: Optional[str] = None
+    tick: Optional[int] = None
+    timestamp: float = field(default_factory=time.time)
+
+class _Call:
+    """The rows of one `generate*`/`score*` call, as seen from its call site"""
+    __slots__ = ("site", "kind", "agent", "tick", "records")
+
+    def __init__(self, site, kind, agent, tick):
+        self.site = site
+        self.kind = kind
+        self.agent = agent
+        self.tick = tick
+        self.records: List[CallRecord] = []
+
+class CallProfiler:
+    """Records every LLM row while enabled and aggregates them per call site.
+
+    The call site is the first method up the stack outside the LLM plumbing
+    (`llm.py`, `scheduler.py`), e.g. `ActorModel.generate_paths (models.py:32)`.
+    Rows carry the agent and tick of the enclosing `scope()`, so the simulation
+    can attribute cost by wrapping its work in `with profiler.scope(tick=t)`.
+    Parsers report whether they understood a response with `note_parse`,
+    which applies to a row (or all rows) of the latest generation call made
+    on the same thread.
+
+    While disabled the hooks return immediately, so the LLM pays one
+    attribute check per call.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records: List[CallRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+    @contextmanager
+    def scope(self, agent: Optional[str] = None, tick: Optional[int] = None):
+        """Attribute calls made inside the block to `agent` and/or `tick`"""
+        outer = getattr(self._local, "scope", (None, None))
+        self._local.scope = (agent if agent is not None else outer[0], tick if tick is not None else outer[1])
+        try:
+            yield
+        finally:
+            self._local.scope = outer
+
+    def current_scope(self) -> Tuple[Optional[str], Optional[int]]:
+        """The (agent, tick) of the calling thread, to carry work over to another thread"""
+        return getattr(self._local, "scope", (None, None))
+
+    def begin_call(self, kind: str) -> Optional[_Call]:
+        """Capture the call site and scope of a call on the calling thread"""
+        if not self.enabled:
+            return None
+        agent, tick = getattr(self._local, "scope", (None, None))
+        call = _Call(_call_site(), kind, agent, tick)
+        if kind == "generate":
+            self._local.last_generation = call
+        return call
+
+    @contextmanager
+    def dispatching(self, calls: Sequence[Optional[_Call]], queue_waits: Sequence[float],
+                    sites: Optional[Dict[tuple, str]] = None):
+        """Hand calls captured on other threads (and their queue waits) to the next LLM call.
+
+        `sites` maps each row's (context, prompt) to the call site it was
+        submitted from; it is kept even while disabled, for `row_sites`.
+        """
+        self._local.dispatch = (list(calls), list(queue_waits))
+        self._local.sites = sites
+        try:
+            yield
+        finally:
+            self._local.dispatch = None
+            self._local.sites = None
+
+    def row_sites(self, contexts: Optional[Sequence[Optional[str]]], prompts: Sequence[str]) -> List[str]:
+        """Call site of each row: where a dispatched row was submitted, else this thread's"""
+        sites = getattr(self._local, "sites", None) or {}
+        here = None
+        rows = []
+        for context, prompt in zip(contexts if contexts is not None else [None] * len(prompts), prompts):
+            site = sites.get((context, prompt))
+            if site is None:
+                here = here or _call_site()
+                site = here
+            rows.append(site)
+        return rows
+
+    def row_calls(self, n: int, kind: str) -> Optional[Tuple[List[_Call], List[float]]]:
+        """Calls and queue waits for the `n` rows of an LLM call, or None while disabled"""
+        if not self.enabled:
+            return None
+        dispatch = getattr(self._local, "dispatch", None)
+        if dispatch is not None and len(dispatch[0]) == n and all(c is not None for c in dispatch[0]):
+            return dispatch
+        call = self.begin_call(kind)
+        return [call] * n, [0.0] * n
+
+    def record(self, call: _Call, **values):
+        record = CallRecord(site=call.site, kind=call.kind, agent=call.agent, tick=call.tick, **values)
+        call.records.append(record)
+        with self._lock:
+            self.records.append(record)
+
+    def note_parse(self, success: bool, row: Optional[int] = None):
+        """Mark row `row` of the latest generation call on this thread (every row if None) as (not) understood"""
+        if not self.enabled:
+            return
+        call = getattr(self._local, "last_generation", None)
+        if call is None:
+            return
+        records = call.records if row is None else call.records[row:row + 1]
+        for record in records:
+            record.parsed = success and record.parsed is not False
+
+    def report(self, group_by: Union[str, Sequence[str]] = "site") -> List[Dict]:
+        """Aggregate rows by site (or agent, tick, kind, ...), most expensive first.
+
+        `seconds` splits each batch's latency evenly over its rows, so the
+        column adds up to the wall time spent in the backend.
+        """
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        with self._lock:
+            records = list(self.records)
+
+        groups: Dict[tuple, List[CallRecord]] = {}
+        for record in records:
+            groups.setdefault(tuple(getattr(record, key) for key in keys), []).append(record)
+
+        rows = []
+        for group, members in groups.items():
+            computed = [r for r in members if not r.cache_hit]
+            checked = [r for r in members if r.parsed is not None]
+            row = dict(zip(keys, group))
+            row.update({
+                "rows": len(members),
+                "seconds": sum(r.cost for r in members),
+                "mean_latency": sum(r.latency for r in computed) / len(computed) if computed else 0.0,
+                "mean_queue_wait": sum(r.queue_wait for r in members) / len(members),
+                "prompt_tokens": sum(r.prompt_tokens for r in members),
+                "generated_tokens": sum(r.generated_tokens for r in members),
+                "cache_hits": len(members) - len(computed),
+                "hit_rate": (len(members) - len(computed)) / len(members),
+                "parse_failures": sum(1 for r in checked if not r.parsed),
+                "parse_rate": sum(1 for r in checked if r.parsed) / len(checked) if checked else None
+            })
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def export(self, path: str, group_by: Union[str, Sequence[str]] = "site", raw: bool = False):
+        """Write the report (or the raw records) as JSON or CSV, chosen by extension"""
+        if raw:
+            with self._lock:
+                rows = [asdict(record) for record in self.records]
+            columns = [f.name for f in fields(CallRecord)]
+        else:
+            rows = self.report(group_by)
+            columns = list(rows[0]) if rows else []
+
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump(rows, f, indent=2)
+
+def _call_site() -> str:
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _INTERNAL:
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+# Shared by every LLM and scheduler; set ANIMUS_PROFILE=1 to record from the start
+profiler = CallProfiler(enabled=os.environ.get("ANIMUS_PROFILE", "") not in ("", "0"))
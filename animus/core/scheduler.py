@@ -0,0 +1,309 @@
+# scheduler.py
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+from .llm import get_llm, _joined, _per_row
+from .profiling import profiler, _call_site
+from .scoring import UNIT_SCALE
+
+__all__ = ['LLMScheduler']
+
+@dataclass
+class _Request:
+    prompt: str
+    temperature: Optional[float]
+    max_new_tokens: Optional[int]
+    cache: Optional[bool]
+    profile: Any
+    future: Future
+    scale: Any = None
+    call: Any = None
+    context: Optional[str] = None
+    site: Optional[str] = None
+    submitted: float = field(default_factory=time.perf_counter)
+
+class LLMScheduler:
+    """Micro-batching front end for a shared LLM.
+
+    Callers submit prompts and get futures back; a background loop gathers
+    pending requests into batches of at most `max_batch_size`, waiting at most
+    `max_wait` seconds after the first request for the batch to fill up.
+
+    The scheduler exposes the same `generate`/`generate_batch` methods as `LLM`,
+    so it can be handed to any model or agent in place of the LLM. Agents
+    running in separate threads then share batched forward passes. Shared
+    context rows (`generate_shared`, `score_shared`) are queued the same way;
+    a flush sends them to the LLM's shared path together, so a context
+    several agents ask about is still computed once.
+    """
+    def __init__(self, llm=None, max_batch_size: int = 16, max_wait: float = 0.01):
+        self.llm = llm if llm is not None else get_llm()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._wait_total = 0.0
+        self._max_fill = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="llm-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self,
+               prompt: str,
+               temperature: Optional[float] = None,
+               max_new_tokens: Optional[int] = None,
+               cache: Optional[bool] = None,
+               profile=None) -> Future:
+        """Queue a prompt and return a future resolving to the response text.
+
+        Unset parameters are resolved by the LLM, from `profile` if given.
+        """
+        return self._enqueue(_Request(
+            prompt, temperature, max_new_tokens, cache, profile, Future(), call=profiler.begin_call("generate")
+        ))
+
+    def submit_score(self, prompt: str, scale=None, cache: Optional[bool] = None) -> Future:
+        """Queue a scoring request (see `LLM.score`); resolves to a float"""
+        return self._enqueue(_Request(
+            prompt, None, None, cache, None, Future(), scale=scale or UNIT_SCALE, call=profiler.begin_call("score")
+        ))
+
+    def _enqueue(self, request: _Request) -> Future:
+        # Taken on the caller's thread: the dispatcher's stack says nothing about who asked
+        request.site = _call_site()
+        self.start()
+        self._queue.put(request)
+        return request.future
+
+    def submit_async(self,
+                     prompt: str,
+                     temperature: Optional[float] = None,
+                     max_new_tokens: Optional[int] = None,
+                     cache: Optional[bool] = None,
+                     profile=None) -> "asyncio.Future":
+        """Awaitable variant of `submit` for callers running in an event loop"""
+        return asyncio.wrap_future(self.submit(prompt, temperature, max_new_tokens, cache, profile))
+
+    def generate(self,
+                 prompt: str,
+                 max_length: Optional[int] = None,
+                 temperature: Optional[float] = None,
+                 verbose: bool = False,
+                 cache: Optional[bool] = None,
+                 profile=None) -> str:
+        return self.generate_batch(
+            [prompt], temperature, max_length, verbose=verbose, cache=cache, profiles=profile
+        )[0]
+
+    def generate_batch(self,
+                       prompts: Sequence[str],
+                       temperatures=None,
+                       max_new_tokens=None,
+                       verbose: bool = False,
+                       cache=None,
+                       profiles=None) -> List[str]:
+        return self._queue_generations(prompts, None, temperatures, max_new_tokens, verbose, cache, profiles)
+
+    def generate_shared(self, contexts, questions, temperatures=None, max_new_tokens=None,
+                        verbose: bool = False, cache=None, profiles=None) -> List[str]:
+        return self._queue_generations(questions, contexts, temperatures, max_new_tokens, verbose, cache, profiles)
+
+    def _queue_generations(self, prompts, contexts, temperatures, max_new_tokens, verbose, cache, profiles):
+        prompts = list(prompts)
+        n = len(prompts)
+        # One profiled call for the whole batch, as with LLM.generate_batch
+        call = profiler.begin_call("generate")
+        futures = [
+            self._enqueue(_Request(prompt, temperature, budget, cacheable, profile, Future(), call=call, context=context))
+            for prompt, context, temperature, budget, cacheable, profile in zip(
+                prompts,
+                _per_row(contexts, n),
+                _per_row(temperatures, n),
+                _per_row(max_new_tokens, n),
+                _per_row(cache, n),
+                _per_row(profiles, n)
+            )
+        ]
+        responses = [future.result() for future in futures]
+        if verbose:
+            for context, prompt, response in zip(_per_row(contexts, n), prompts, responses):
+                print("\n=== PROMPT ===\n")
+                print(_joined(context, prompt))
+                print("\n=== RESPONSE ===\n")
+                print(response)
+        return responses
+
+    def score(self, prompt: str, scale=None, verbose: bool = False, cache: Optional[bool] = None) -> float:
+        return self.score_batch([prompt], scales=scale, verbose=verbose, cache=cache)[0]
+
+    def score_batch(self, prompts: Sequence[str], scales=None, verbose: bool = False, cache=None) -> List[float]:
+        return self._queue_scores(prompts, None, scales, cache)
+
+    def score_shared(self, contexts, questions, scales=None, verbose: bool = False, cache=None) -> List[float]:
+        return self._queue_scores(questions, contexts, scales, cache)
+
+    def _queue_scores(self, prompts, contexts, scales, cache):
+        prompts = list(prompts)
+        n = len(prompts)
+        call = profiler.begin_call("score")
+        futures = [
+            self._enqueue(_Request(
+                prompt, None, None, cacheable, None, Future(), scale=scale or UNIT_SCALE, call=call, context=context
+            ))
+            for prompt, context, scale, cacheable in zip(
+                prompts, _per_row(contexts, n), _per_row(scales, n), _per_row(cache, n)
+            )
+        ]
+        return [future.result() for future in futures]
+
+    def embed(self, texts, batch_size: Optional[int] = None):
+        return self.llm.embed(texts, batch_size=batch_size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._batches
+            return {
+                "queue_depth": self._queue.qsize(),
+                "requests": self._requests,
+                "batches": batches,
+                "mean_batch_size": self._requests / batches if batches else 0.0,
+                "mean_batch_fill": self._requests / (batches * self.max_batch_size) if batches else 0.0,
+                "max_batch_size_seen": self._max_fill,
+                "mean_queue_wait": self._wait_total / self._requests if self._requests else 0.0
+            }
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._drain()
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            self._dispatch(batch)
+            if stopping:
+                self._drain()
+                return
+
+    def _drain(self):
+        pending = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                pending.append(request)
+        for start in range(0, len(pending), self.max_batch_size):
+            self._dispatch(pending[start:start + self.max_batch_size])
+
+    def _dispatch(self, batch: List[_Request]):
+        started = time.perf_counter()
+        with self._lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._max_fill = max(self._max_fill, len(batch))
+            self._wait_total += sum(started - request.submitted for request in batch)
+
+        # Plain rows and shared-context rows take separate LLM paths
+        for shared in (False, True):
+            scoring = [r for r in batch if r.scale is not None and (r.context is not None) == shared]
+            if scoring:
+                self._dispatch_scores(scoring, started)
+            generating = [r for r in batch if r.scale is None and (r.context is not None) == shared]
+            if generating:
+                self._dispatch_generations(generating, started)
+
+    def _dispatch_generations(self, batch: List[_Request], started: float):
+        try:
+            with profiler.dispatching(
+                [request.call for request in batch], [started - request.submitted for request in batch], _sites(batch)
+            ):
+                options = dict(
+                    temperatures=[request.temperature for request in batch],
+                    max_new_tokens=[request.max_new_tokens for request in batch],
+                    verbose=False,
+                    cache=[request.cache for request in batch],
+                    profiles=[request.profile for request in batch]
+                )
+                prompts = [request.prompt for request in batch]
+                if batch[0].context is not None:
+                    responses = self.llm.generate_shared([request.context for request in batch], prompts, **options)
+                else:
+                    responses = self.llm.generate_batch(prompts, **options)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, response in zip(batch, responses):
+            request.future.set_result(response)
+
+    def _dispatch_scores(self, batch: List[_Request], started: float):
+        try:
+            with profiler.dispatching(
+                [request.call for request in batch], [started - request.submitted for request in batch], _sites(batch)
+            ):
+                options = dict(
+                    scales=[request.scale for request in batch],
+                    verbose=False,
+                    cache=[True if request.cache is None else request.cache for request in batch]
+                )
+                prompts = [request.prompt for request in batch]
+                if batch[0].context is not None:
+                    scores = self.llm.score_shared([request.context for request in batch], prompts, **options)
+                else:
+                    scores = self.llm.score_batch(prompts, **options)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, score in zip(batch, scores):
+            request.future.set_result(score)
+
+def _sites(batch: List[_Request]) -> dict:
+    """Submitting call site of each row, by the (context, prompt) its backend call will see"""
+    sites = {}
+    for request in batch:
+        sites[request.context, request.prompt] = request.site
+        if request.context is not None:
+            # Backends without shared calls get the context joined to the prompt
+            sites[None, _joined(request.context, request.prompt)] = request.site
+    return sites
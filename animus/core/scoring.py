@@ -0,0 +1,48 @@
+# scoring.py
+import math
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+__all__ = ['ScoreScale', 'UNIT_SCALE', 'SIGNED_SCALE', 'SUCCESS_SCALE']
+
+@dataclass(frozen=True)
+class ScoreScale:
+    """The answers a numeric judgment may take, and the value each one stands for.
+
+    `LLM.score` reads the model's likelihood of every option as the answer to a
+    prompt and returns the probability-weighted mean of their values.
+    """
+    name: str
+    options: Tuple[str, ...]
+    values: Tuple[float, ...]
+
+    @classmethod
+    def linear(cls, low: float, high: float, steps: int = 11) -> "ScoreScale":
+        values = tuple(round(low + (high - low) * i / (steps - 1), 6) for i in range(steps))
+        return cls(
+            name=f"linear:{low}:{high}:{steps}",
+            options=tuple(f"{value:.1f}" for value in values),
+            values=values
+        )
+
+    @classmethod
+    def labels(cls, mapping: Dict[str, float]) -> "ScoreScale":
+        return cls(
+            name="labels:" + ",".join(mapping),
+            options=tuple(mapping),
+            values=tuple(float(value) for value in mapping.values())
+        )
+
+    @property
+    def midpoint(self) -> float:
+        return sum(self.values) / len(self.values)
+
+    def expected_value(self, log_likelihoods: Sequence[float]) -> float:
+        peak = max(log_likelihoods)
+        weights = [math.exp(ll - peak) for ll in log_likelihoods]
+        total = sum(weights)
+        return sum(w * v for w, v in zip(weights, self.values)) / total
+
+UNIT_SCALE = ScoreScale.linear(0.0, 1.0)
+SIGNED_SCALE = ScoreScale.linear(-1.0, 1.0, steps=21)
+SUCCESS_SCALE = ScoreScale.labels({"SUCCESS": 1.0, "FAILURE": 0.0})
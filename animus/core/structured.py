@@ -0,0 +1,205 @@
+# structured.py
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from .profiles import GenerationProfile
+from .profiling import profiler
+from .scoring import ScoreScale
+
+__all__ = ['Field', 'Schema', 'ask_structured']
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_BULLET = re.compile(r"^(?:[-*•]+|\d+[.)])\s*")
+
+@dataclass(frozen=True)
+class Field:
+    """One section of a structured response.
+
+    `kind` is 'text', 'list' (up to `count` items, one per line, bullets and
+    an optional `prefix` such as 'RISK:' stripped), 'number' (clamped to
+    `scale`, which is also used to re-ask it as a score) or 'mapping'
+    (NAME: NUMBER lines).
+    """
+    name: str
+    kind: str
+    instruction: str
+    count: int = 3
+    scale: Optional[ScoreScale] = None
+    prefix: Optional[str] = None
+
+    def parse(self, raw: str):
+        """The value of a section's text, or None if it does not parse"""
+        raw = raw.strip()
+        if self.kind == "number":
+            match = _NUMBER.search(raw)
+            if match is None:
+                return None
+            value = float(match.group())
+            if self.scale is not None:
+                value = min(max(value, min(self.scale.values)), max(self.scale.values))
+            return value
+        lines = [line.strip() for line in raw.splitlines() if line.strip()]
+        if self.kind == "list":
+            items = []
+            for line in lines:
+                line = _BULLET.sub("", line)
+                if self.prefix and line.upper().startswith(self.prefix.upper()):
+                    line = line[len(self.prefix):].strip()
+                if line:
+                    items.append(line)
+            return items[:self.count] or None
+        if self.kind == "mapping":
+            mapping = {}
+            for line in lines:
+                key, _, value = _BULLET.sub("", line).rpartition(":")
+                match = _NUMBER.search(value)
+                if key.strip() and match:
+                    mapping[key.strip()] = min(max(float(match.group()), -1.0), 1.0)
+            return mapping or None
+        return "\n".join(lines) or None
+
+    def complete(self, raw: str) -> bool:
+        """Whether a section still being generated can stop here"""
+        if not raw.endswith("\n"):
+            return False
+        value = self.parse(raw)
+        if value is None:
+            return False
+        return self.kind != "list" or len(value) >= self.count
+
+@dataclass(frozen=True)
+class Schema:
+    """The sections of one fused response, in the order they are asked for.
+
+    A schema also serves as a generation stop condition: decoding ends as
+    soon as every section has a complete value.
+    """
+    name: str
+    fields: Tuple[Field, ...]
+
+    def instructions(self) -> str:
+        lines = "\n".join(f"        {f.name.upper()}: <{f.instruction}>" for f in self.fields)
+        return f"""Respond with these sections, each starting on its own line with its name:
+{lines}"""
+
+    def sections(self, text: str) -> Dict[str, Tuple[str, bool]]:
+        """Raw text of each section found, and whether another section followed it"""
+        names = "|".join(re.escape(f.name.upper()).replace("_", "[ _]") for f in self.fields)
+        header = re.compile(rf"^[ \t>#*-]*\**({names})\**[ \t]*[:=][ \t]*", re.I | re.M)
+        found = list(header.finditer(text))
+        if not found:
+            return self._json_sections(text)
+        sections = {}
+        for i, match in enumerate(found):
+            name = re.sub(r"[ _]", "_", match.group(1)).lower()
+            end = found[i + 1].start() if i + 1 < len(found) else len(text)
+            raw = text[match.end():end]
+            # A repeated header only fills in a section left empty
+            if name not in sections or not sections[name][0].strip():
+                sections[name] = (raw, i + 1 < len(found))
+        return sections
+
+    def _json_sections(self, text: str) -> Dict[str, Tuple[str, bool]]:
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        sections = {}
+        for key, value in data.items():
+            if isinstance(value, list):
+                value = "\n".join(str(item) for item in value)
+            elif isinstance(value, dict):
+                value = "\n".join(f"{k}: {v}" for k, v in value.items())
+            sections[str(key).lower().replace(" ", "_")] = (f"{value}\n", True)
+        return sections
+
+    def completed(self, text: str, final: bool = False) -> Dict[str, object]:
+        """Values of the sections that are complete (all that parse, if `final`)"""
+        values = {}
+        for name, (raw, closed) in self.sections(text).items():
+            field = self.field(name)
+            if field is None:
+                continue
+            if closed or final:
+                value = field.parse(raw)
+            else:
+                value = field.parse(raw) if field.complete(raw) else None
+            if value is not None:
+                values[name] = value
+        return values
+
+    def parse(self, text: str) -> Tuple[Dict[str, object], List[str]]:
+        """Every value that parses, and the names of the fields that did not"""
+        values = self.completed(text, final=True)
+        return values, [f.name for f in self.fields if f.name not in values]
+
+    def field(self, name: str) -> Optional[Field]:
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+    def __call__(self, text: str, final: bool = False) -> Optional[int]:
+        if len(self.completed(text, final)) == len(self.fields):
+            return len(text)
+        return None
+
+def ask_structured(llm, schema: Schema, prompts: Sequence[str], profile: GenerationProfile,
+                   verbose: bool = True) -> List[Dict[str, object]]:
+    """One fused generation per prompt, then targeted re-asks for the fields that failed.
+
+    Failed numeric fields with a scale are re-asked as one batch of scores,
+    the others as one batch of single-section generations. Fields that still
+    fail are left out of the returned dicts.
+    """
+    results = []
+    failed = []
+    for i, response in enumerate(llm.generate_batch(list(prompts), profiles=profile, verbose=verbose)):
+        values, missing = schema.parse(response)
+        profiler.note_parse(not missing, row=i)
+        results.append(values)
+        failed.extend((i, schema.field(name)) for name in missing)
+
+    scored = [(i, field) for i, field in failed if field.kind == "number" and field.scale is not None]
+    asked = [(i, field) for i, field in failed if not (field.kind == "number" and field.scale is not None)]
+    if scored:
+        scores = llm.score_batch(
+            [_reask_prompt(schema, prompts[i], results[i], field) + "\n        Return ONLY a number:" for i, field in scored],
+            scales=[field.scale for _, field in scored],
+            verbose=verbose
+        )
+        for (i, field), score in zip(scored, scores):
+            results[i][field.name] = score
+    if asked:
+        # A single section never satisfies the schema's stop condition
+        reask = profile.derive(name=f"{profile.name}_reask", stop=None, max_new_tokens=256)
+        responses = llm.generate_batch(
+            [_reask_prompt(schema, prompts[i], results[i], field) for i, field in asked],
+            profiles=reask,
+            verbose=verbose
+        )
+        for row, ((i, field), response) in enumerate(zip(asked, responses)):
+            section = schema.sections(response).get(field.name)
+            value = field.parse(section[0] if section else response)
+            profiler.note_parse(value is not None, row=row)
+            if value is not None:
+                results[i][field.name] = value
+    return results
+
+def _reask_prompt(schema: Schema, prompt: str, answered: Dict[str, object], field: Field) -> str:
+    given = "\n".join(
+        f"        {name.upper()}: {value}" for name, value in answered.items()
+    )
+    return f"""{prompt}
+
+        Sections answered so far:
+{given}
+
+        Now answer ONLY the {field.name.upper()} section.
+        {field.name.upper()}: <{field.instruction}>"""
@@ -0,0 +1,209 @@
+# trace.py
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List
+import numpy as np
+from .profiling import profiler
+
+__all__ = ['RecordingBackend', 'ReplayBackend', 'read_trace']
+
+class RecordingBackend:
+    """Wraps a backend and appends every row it serves to a trace file.
+
+    Each row is one JSON line: call site, kind (generate, score or embed),
+    prompt (and shared context), the parameters that shape the response,
+    the response itself and its share of the call's latency. Score rows keep
+    the option log-likelihoods and embeddings are stored as base64 float32.
+    A path ending in `.gz` is gzip-compressed; every call is appended (and
+    flushed) as it completes, so a crashed run keeps what it recorded.
+    """
+    def __init__(self, backend, path: str):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", encoding="utf-8") if path.endswith(".gz") else open(path, "a", encoding="utf-8")
+
+    @property
+    def tokenizer(self):
+        return self.backend.tokenizer
+
+    @property
+    def model(self):
+        return self.backend.model
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return self.backend.count_tokens(prompts)
+
+    def generate(self, prompts, temperatures, max_new_tokens, seed=None, stops=None) -> List[str]:
+        started = time.perf_counter()
+        texts = self.backend.generate(prompts, temperatures, max_new_tokens, seed=seed, stops=stops)
+        self._write("generate", None, prompts, _generation_params(temperatures, max_new_tokens, seed), texts, started)
+        return texts
+
+    def score(self, prompts, options) -> List[List[float]]:
+        started = time.perf_counter()
+        likelihoods = self.backend.score(prompts, options)
+        self._write("score", None, prompts, [{"options": list(options)}] * len(prompts), _floats(likelihoods), started)
+        return likelihoods
+
+    def __getattr__(self, name):
+        # Optional methods exist only if the wrapped backend has them,
+        # so the LLM's fallbacks keep working
+        backend = self.__dict__.get("backend")
+        if backend is None or not hasattr(backend, name):
+            raise AttributeError(name)
+        if name == "generate_shared":
+            def generate_shared(contexts, prompts, temperatures, max_new_tokens, seed=None, stops=None):
+                started = time.perf_counter()
+                texts = backend.generate_shared(contexts, prompts, temperatures, max_new_tokens, seed=seed, stops=stops)
+                self._write("generate", contexts, prompts, _generation_params(temperatures, max_new_tokens, seed),
+                            texts, started)
+                return texts
+            return generate_shared
+        if name == "score_shared":
+            def score_shared(contexts, prompts, options):
+                started = time.perf_counter()
+                likelihoods = backend.score_shared(contexts, prompts, options)
+                self._write("score", contexts, prompts, [{"options": list(options)}] * len(prompts),
+                            _floats(likelihoods), started)
+                return likelihoods
+            return score_shared
+        if name == "embed":
+            def embed(texts):
+                started = time.perf_counter()
+                vectors = backend.embed(texts)
+                self._write("embed", None, texts, [{}] * len(texts), [_pack(v) for v in vectors], started)
+                return vectors
+            return embed
+        return getattr(backend, name)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+    def _write(self, kind, contexts, prompts, params, responses, started):
+        latency = (time.perf_counter() - started) / max(len(prompts), 1)
+        # Rows queued through a scheduler keep the site they were submitted from
+        sites = profiler.row_sites(contexts, prompts)
+        lines = []
+        for i, (prompt, row_params, response) in enumerate(zip(prompts, params, responses)):
+            row = {"site": sites[i], "kind": kind, "prompt": prompt}
+            if contexts is not None:
+                row["context"] = contexts[i]
+            row.update(params=row_params, response=response, latency=round(latency, 6))
+            lines.append(json.dumps(row, separators=(",", ":")) + "\n")
+        with self._lock:
+            self._file.write("".join(lines))
+            self._file.flush()
+
+class ReplayBackend:
+    """Serves the responses of a recorded trace instead of running a model.
+
+    A row is looked up by its kind, prompt, shared context and parameters;
+    shared rows also match a row recorded with the context joined to the
+    prompt. Identical rows recorded several times (e.g. sampled
+    generations) are served in recorded order, the last one repeating once
+    they run out. With `latency` above 0 each call sleeps for its rows'
+    recorded latency times that factor. Rows missing from the trace go to `fallback` (e.g. a
+    `StubBackend`) if one is given, else raise `KeyError`. `stats` counts
+    hits and misses. Token counts are not recorded; `count_tokens` counts
+    whitespace-separated words.
+    """
+    def __init__(self, path: str, latency: float = 0.0, fallback=None, model_name: str = "replay"):
+        self.path = path
+        self.model_name = model_name
+        self.latency = latency
+        self.fallback = fallback
+        self.stats = {"hits": 0, "misses": 0}
+        self._rows: Dict[tuple, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        for row in read_trace(path):
+            self._rows[_key(row["kind"], row.get("context"), row["prompt"], row["params"])].append(row)
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return [len(prompt.split()) for prompt in prompts]
+
+    def generate(self, prompts, temperatures, max_new_tokens, seed=None, stops=None) -> List[str]:
+        return self._serve("generate", None, prompts, _generation_params(temperatures, max_new_tokens, seed),
+                           lambda rows: self.fallback.generate(
+                               [prompts[i] for i in rows], [temperatures[i] for i in rows],
+                               [max_new_tokens[i] for i in rows], seed=seed
+                           ))
+
+    def generate_shared(self, contexts, prompts, temperatures, max_new_tokens, seed=None, stops=None) -> List[str]:
+        return self._serve("generate", contexts, prompts, _generation_params(temperatures, max_new_tokens, seed),
+                           lambda rows: self.fallback.generate(
+                               [f"{contexts[i]}\n\n{prompts[i]}" for i in rows], [temperatures[i] for i in rows],
+                               [max_new_tokens[i] for i in rows], seed=seed
+                           ))
+
+    def score(self, prompts, options) -> List[List[float]]:
+        return self._serve("score", None, prompts, [{"options": list(options)}] * len(prompts),
+                           lambda rows: self.fallback.score([prompts[i] for i in rows], options))
+
+    def score_shared(self, contexts, prompts, options) -> List[List[float]]:
+        return self._serve("score", contexts, prompts, [{"options": list(options)}] * len(prompts),
+                           lambda rows: self.fallback.score([f"{contexts[i]}\n\n{prompts[i]}" for i in rows], options))
+
+    def embed(self, texts) -> List[List[float]]:
+        vectors = self._serve("embed", None, texts, [{}] * len(texts),
+                              lambda rows: [_pack(v) for v in self.fallback.embed([texts[i] for i in rows])])
+        return [_unpack(v) for v in vectors]
+
+    def _serve(self, kind, contexts, prompts, params, fallback) -> list:
+        responses = [None] * len(prompts)
+        delay = 0.0
+        missing = []
+        with self._lock:
+            for i, (prompt, row_params) in enumerate(zip(prompts, params)):
+                recorded = self._rows.get(_key(kind, contexts[i] if contexts is not None else None, prompt, row_params))
+                if not recorded and contexts is not None:
+                    # Recorded from a backend without shared calls: the LLM joined the context in
+                    recorded = self._rows.get(_key(kind, None, f"{contexts[i]}\n\n{prompt}", row_params))
+                if not recorded:
+                    missing.append(i)
+                    continue
+                row = recorded.popleft() if len(recorded) > 1 else recorded[0]
+                responses[i] = row["response"]
+                delay += row["latency"]
+            self.stats["hits"] += len(prompts) - len(missing)
+            self.stats["misses"] += len(missing)
+        if missing:
+            if self.fallback is None:
+                raise KeyError(f"No recorded {kind} response for: {prompts[missing[0]][:80]!r}")
+            for i, response in zip(missing, fallback(missing)):
+                responses[i] = response
+        if self.latency > 0 and delay > 0:
+            time.sleep(delay * self.latency)
+        return responses
+
+def read_trace(path: str) -> List[dict]:
+    """Every row of a trace file, in recorded order"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _generation_params(temperatures, max_new_tokens, seed) -> List[dict]:
+    return [
+        {"temperature": float(temperature), "max_new_tokens": int(budget), "seed": seed}
+        for temperature, budget in zip(temperatures, max_new_tokens)
+    ]
+
+def _key(kind, context, prompt, params) -> tuple:
+    return kind, context, prompt, json.dumps(params, sort_keys=True)
+
+def _floats(rows) -> List[List[float]]:
+    return [[float(value) for value in row] for row in rows]
+
+def _pack(vector) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+def _unpack(packed: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(packed), dtype=np.float32).tolist()
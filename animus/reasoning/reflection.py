@@ -0,0 +1,164 @@
+# reflection.py
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from ..core.profiling import profiler
+
+__all__ = ['ReflectionScheduler']
+
+class ReflectionScheduler:
+    """Stores experiences and reflects on them off the agents' decision path.
+
+    An agent given a scheduler hands each step's experience to `record` and
+    moves on. A background worker stores it as an "experience" memory; the
+    people involved are extracted for every experience waiting at that point
+    in one batch. Reflection is not run every step. Each experience adds a
+    cheap importance estimate (see `importance`) to its agent's running
+    total, and when the total reaches `threshold`, or `max_batch`
+    experiences are waiting, one reflection covers all of them. It is
+    stored as a "reflection" memory and appended to the agent's `long_term`.
+
+    One scheduler (and its single worker thread) can serve many agents. The
+    worker embeds and rates each memory first (`MemorySystem.prepare_memory`)
+    and holds an agent's `memory_lock` only to insert it, so a decision waits
+    at most for an insert, never for a model call.
+    `flush()` blocks until the queued work is done. `flush(reflect=True)`
+    also reflects on whatever is still below the threshold.
+    """
+    def __init__(self, threshold: float = 1.5, max_batch: int = 8):
+        self.threshold = threshold
+        self.max_batch = max_batch
+        self.stats = {"experiences": 0, "stored": 0, "reflections": 0, "reflected": 0}
+        self._waiting: Dict[object, List[dict]] = {}   # agent -> experiences since its last reflection
+        self._totals: Dict[object, float] = {}
+        self._jobs = deque()                            # (agent, experience or None, batch to reflect on or None)
+        self._busy = False
+        self._worker: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+
+    def importance(self, thought_path, result, score) -> float:
+        """How much an experience calls for reflection, without a model call.
+
+        The further the outcome's score is from the path's confidence, and
+        the larger the change in social standing, the more there is to learn.
+        """
+        surprise = abs(score - thought_path.confidence)
+        standing = abs(result["actual_impact"].get("social_standing", 0.0))
+        return min(surprise + standing, 1.0)
+
+    def record(self, agent, situation, thought_path, result, score):
+        """Queue one experience of `agent`, and a reflection if one is due"""
+        experience = {
+            "situation": situation,
+            "action": thought_path,
+            "result": result,
+            "score": score,
+            "location": agent.location,
+            "scope": profiler.current_scope()
+        }
+        with self._condition:
+            self.stats["experiences"] += 1
+            waiting = self._waiting.setdefault(agent, [])
+            waiting.append(experience)
+            self._totals[agent] = self._totals.get(agent, 0.0) + self.importance(thought_path, result, score)
+            batch = None
+            if self._totals[agent] >= self.threshold or len(waiting) >= self.max_batch:
+                batch = self._take(agent)
+            self._jobs.append((agent, experience, batch))
+            self._start()
+
+    @property
+    def pending(self) -> int:
+        """Queued jobs, including one being processed"""
+        with self._condition:
+            return len(self._jobs) + self._busy
+
+    def flush(self, timeout: Optional[float] = None, reflect: bool = False) -> bool:
+        """Block until the queued work is done; False on timeout"""
+        with self._condition:
+            if reflect:
+                for agent in list(self._waiting):
+                    if self._waiting[agent]:
+                        self._jobs.append((agent, None, self._take(agent)))
+                self._start()
+            return self._condition.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    def _take(self, agent) -> List[dict]:
+        batch = self._waiting.pop(agent)
+        self._totals[agent] = 0.0
+        return batch
+
+    def _start(self):
+        if self._worker is None and self._jobs:
+            self._worker = threading.Thread(target=self._run, name="reflection", daemon=True)
+            self._worker.start()
+        self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._jobs:
+                    self._worker = None
+                    self._condition.notify_all()
+                    return
+                # Everything queued so far is handled together, agent by agent
+                jobs = list(self._jobs)
+                self._jobs.clear()
+                self._busy = True
+
+            by_agent: Dict[object, tuple] = {}
+            for agent, experience, batch in jobs:
+                stored, batches = by_agent.setdefault(agent, ([], []))
+                if experience is not None:
+                    stored.append(experience)
+                if batch is not None:
+                    batches.append(batch)
+            for agent, (stored, batches) in by_agent.items():
+                try:
+                    self._process(agent, stored, batches)
+                except Exception as e:
+                    print(f"Error reflecting for {agent.name}: {str(e)}")
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    def _process(self, agent, stored: List[dict], batches: List[List[dict]]):
+        if stored:
+            agent_name, tick = stored[-1]["scope"]
+            with profiler.scope(agent=agent_name, tick=tick):
+                people = agent._extract_people([experience["situation"] for experience in stored])
+            memories = []
+            for experience, names in zip(stored, people):
+                experience["people"] = names
+                memories.append(agent.memory.prepare_memory(
+                    content=f"Action: {experience['action'].action}\nOutcome: {experience['result']['outcome']}",
+                    memory_type="experience",
+                    location=experience["location"],
+                    people_involved=names
+                ))
+            with agent.memory_lock:
+                for memory in memories:
+                    agent.memory.insert_memory(memory)
+            agent.memory.maybe_consolidate()
+            self.stats["stored"] += len(stored)
+
+        for batch in batches:
+            agent_name, tick = batch[-1]["scope"]
+            with profiler.scope(agent=agent_name, tick=tick):
+                reflection = agent.reflection.reflect(batch, agent.traits, batch[-1]["location"])
+            memory = agent.memory.prepare_memory(
+                content=f"Reflection: {reflection['reflection']}",
+                memory_type="reflection",
+                location=batch[-1]["location"],
+                people_involved=sorted({name for e in batch for name in e.get("people", [])}),
+                emotional_impact=reflection["emotional_impact"].get("confidence_change", 0.0)
+            )
+            with agent.memory_lock:
+                agent.long_term.append(reflection)
+                if len(agent.long_term) > 50:
+                    agent.long_term = agent.long_term[-50:]
+                agent.memory.insert_memory(memory)
+            agent.memory.maybe_consolidate()
+            self.stats["reflections"] += 1
+            self.stats["reflected"] += len(batch)
@@ -0,0 +1,184 @@
+# tot.py
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from ..core.models import ThoughtPath
+from ..core.profiles import REASONING, SHORT_LIST
+from ..core.scoring import UNIT_SCALE
+
+__all__ = ['SearchBudget', 'TreeOfThoughts']
+
+# Model rows needed to finish one path (see ActorModel.complete_paths)
+COMPLETION_CALLS = 5
+
+@dataclass(frozen=True)
+class SearchBudget:
+    """Hard limits for one decision; None means no limit.
+
+    `calls` counts model rows: one per generated response or score.
+    `tokens` counts prompt plus generated tokens. A stage is only sent if
+    its prompts and the full token allowance of its generations still fit.
+    """
+    calls: Optional[int] = 16
+    tokens: Optional[int] = None
+
+@dataclass
+class _Branch:
+    reasoning: str
+    value: float = 0.0
+    action: Optional[str] = None
+
+class TreeOfThoughts:
+    """Beam search over partial thought paths under a per-decision budget.
+
+    A path is built in two steps: a reasoning, then an action. The search
+    samples `branching` reasonings and rates each with a single forward pass
+    (a likelihood score, no generation). Branches rated below `min_value`
+    are pruned and the best `beam_width` are kept, or only the best one if
+    it already reaches `threshold`. Kept branches are then expanded best
+    first into `branching` actions each. The actions are rated the same way,
+    and the search stops as soon as one reaches `threshold`. Only the winning
+    (reasoning, action) pair is completed into a `ThoughtPath` with next
+    steps, confidence and social impact. The model never fleshes out or
+    evaluates candidates that were already ruled out.
+
+    The completion and one action are reserved from the budget up front.
+    Every expansion is shrunk to what the rest of the budget affords, and
+    the search never does less than one reasoning and one action.
+    `last_search` describes what the latest search spent.
+    """
+    def __init__(self,
+                 branching: int = 3,
+                 beam_width: int = 2,
+                 threshold: float = 0.8,
+                 min_value: float = 0.3,
+                 budget: SearchBudget = SearchBudget()):
+        minimum = 2 + COMPLETION_CALLS
+        if budget.calls is not None and budget.calls < minimum:
+            raise ValueError(f"A search needs a budget of at least {minimum} calls, got {budget.calls}")
+        self.branching = branching
+        self.beam_width = beam_width
+        self.threshold = threshold
+        self.min_value = min_value
+        self.budget = budget
+        self.last_search: dict = {}
+
+    def search(self, actor, situation, context, traits, location) -> ThoughtPath:
+        meter = _Meter(actor.llm, self.budget)
+        stats = {"reasonings": 0, "actions": 0, "rated": 0, "pruned": 0, "stopped_early": False}
+
+        reasoning_prompt = actor._initial_reasoning_prompt(situation, traits, context)
+        prompt_tokens = meter.count([reasoning_prompt])
+        value_tokens = meter.count([self._value_prompt(situation, traits, "")]) + 2 * REASONING.max_new_tokens
+        action_tokens = prompt_tokens + 2 * REASONING.max_new_tokens
+        # Completion prompts carry the situation, context, reasoning and action
+        completion_tokens = COMPLETION_CALLS * (prompt_tokens + 2 * REASONING.max_new_tokens) + 3 * SHORT_LIST.max_new_tokens
+        meter.reserve(1 + COMPLETION_CALLS, action_tokens + completion_tokens)
+
+        # Reasonings: a lone branch needs no rating
+        n = meter.affordable(self.branching, 2, prompt_tokens + REASONING.max_new_tokens + value_tokens)
+        n = max(n, 1)
+        reasonings = actor.reason(situation, context, traits, n)
+        meter.charge(n, [reasoning_prompt] * n, reasonings)
+        stats["reasonings"] = n
+        branches = [_Branch(reasoning) for reasoning in reasonings]
+        if n > 1:
+            values = self._rate(actor.llm, meter, [self._value_prompt(situation, traits, b.reasoning) for b in branches])
+            stats["rated"] += n
+            for branch, value in zip(branches, values):
+                branch.value = value
+            branches.sort(key=lambda b: b.value, reverse=True)
+            if branches[0].value >= self.threshold:
+                stats["stopped_early"] = True
+                kept = branches[:1]
+            else:
+                kept = [b for b in branches[:self.beam_width] if b.value >= self.min_value] or branches[:1]
+            stats["pruned"] += n - len(kept)
+            branches = kept
+
+        # Actions, best branch first, until one is good enough or the budget runs out
+        meter.release(1, action_tokens)
+        best: Optional[_Branch] = None
+        for i, branch in enumerate(branches):
+            action_prompt = actor._action_prompt(branch.reasoning, location)
+            cost = meter.count([action_prompt]) + REASONING.max_new_tokens
+            m = meter.affordable(self.branching, 2, cost + value_tokens)
+            rate = m > 0
+            if m == 0:
+                if i > 0:
+                    break
+                m = 1
+            actions = actor.act([branch.reasoning] * m, location)
+            meter.charge(m, [action_prompt] * m, actions)
+            stats["actions"] += m
+            candidates = [_Branch(branch.reasoning, branch.value, action) for action in actions]
+            if rate and (m > 1 or len(branches) > 1):
+                values = self._rate(
+                    actor.llm, meter, [self._value_prompt(situation, traits, c.reasoning, c.action) for c in candidates]
+                )
+                stats["rated"] += m
+                for candidate, value in zip(candidates, values):
+                    candidate.value = value
+            for candidate in candidates:
+                if best is None or candidate.value > best.value:
+                    best = candidate
+            if best.value >= self.threshold:
+                stats["stopped_early"] = True
+                break
+
+        path = actor.complete_paths(situation, context, traits, [best.reasoning], [best.action])[0]
+        meter.release(COMPLETION_CALLS, completion_tokens)
+        meter.charge(COMPLETION_CALLS, tokens=completion_tokens)
+        self.last_search = dict(stats, calls=meter.calls, tokens=meter.tokens, value=best.value)
+        return path
+
+    def _rate(self, llm, meter, prompts: List[str]) -> List[float]:
+        values = llm.score_batch(prompts, scales=UNIT_SCALE, verbose=False)
+        meter.charge(len(prompts), prompts)
+        return values
+
+    def _value_prompt(self, situation, traits, reasoning, action=None):
+        plan = f"Reasoning: {reasoning}"
+        if action is not None:
+            plan += f"\n        Planned action: {action}"
+        return f"""Situation: {situation}
+        Personality traits: {traits}
+        {plan}
+
+        How promising is this line of thought for handling the situation well?
+        Return ONLY a number between 0.0 and 1.0:"""
+
+class _Meter:
+    """Calls and tokens spent (and set aside) against a SearchBudget"""
+    def __init__(self, llm, budget: SearchBudget):
+        self.budget = budget
+        self.calls = 0
+        self.tokens = 0
+        self._reserved_calls = 0
+        self._reserved_tokens = 0
+        # A scheduler wraps the LLM that owns the backend
+        owner = getattr(llm, "llm", llm)
+        self._count = owner.backend.count_tokens if budget.tokens is not None else None
+
+    def count(self, texts: Sequence[str]) -> int:
+        return sum(self._count(list(texts))) if self._count is not None and texts else 0
+
+    def reserve(self, calls: int, tokens: int):
+        self._reserved_calls += calls
+        self._reserved_tokens += tokens
+
+    def release(self, calls: int, tokens: int):
+        self._reserved_calls -= calls
+        self._reserved_tokens -= tokens
+
+    def affordable(self, n: int, calls_each: int, tokens_each: int) -> int:
+        """How many of `n` items costing `calls_each` and `tokens_each` still fit"""
+        fits = n
+        if self.budget.calls is not None:
+            fits = min(fits, (self.budget.calls - self._reserved_calls - self.calls) // calls_each)
+        if self.budget.tokens is not None and tokens_each > 0:
+            fits = min(fits, (self.budget.tokens - self._reserved_tokens - self.tokens) // tokens_each)
+        return max(fits, 0)
+
+    def charge(self, calls: int, prompts: Sequence[str] = (), responses: Sequence[str] = (), tokens: int = 0):
+        self.calls += calls
+        self.tokens += self.count(prompts) + self.count(responses) + tokens
@@ -0,0 +1,122 @@
+# animus/tests/conftest.py
+import os
+import threading
+
+# Run the suite against the deterministic stub backend unless a real one is requested,
+# e.g. ANIMUS_LLM_BACKEND=hf-seq2seq pytest animus/tests
+os.environ.setdefault("ANIMUS_LLM_BACKEND", "stub")
+
+import pytest
+
+from ..core.llm import LLM
+
+# Words the tiny test checkpoints know; anything else maps to <unk>
+TINY_WORDS = (
+    "the a of to and is was in on at it you your this that with for as be are what how who "
+    "situation action reasoning context question answer sam alex market cafe friend waves help "
+    "success failure yes no good bad risk one two three four five six seven eight nine ten "
+    "0 1 2 3 4 5 6 7 8 9 : , . ? ! ' - ( )"
+).split()
+
+def _tiny_checkpoint(path, kind):
+    """Save a randomly initialised two-layer model with a word-level tokenizer to `path`"""
+    torch = pytest.importorskip("torch")
+    tokenizers = pytest.importorskip("tokenizers")
+    transformers = pytest.importorskip("transformers")
+
+    specials = ["<pad>", "</s>", "<unk>"]
+    vocab = {token: i for i, token in enumerate(specials + TINY_WORDS)}
+    backend = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend, pad_token="<pad>", eos_token="</s>", unk_token="<unk>"
+    )
+    tokenizer.save_pretrained(path)
+
+    torch.manual_seed(0)
+    if kind == "seq2seq":
+        model = transformers.T5ForConditionalGeneration(transformers.T5Config(
+            vocab_size=len(vocab), d_model=32, d_ff=64, d_kv=8, num_layers=2, num_heads=4,
+            decoder_start_token_id=0, pad_token_id=0, eos_token_id=1
+        ))
+        # Keep greedy decoding off the special tokens so responses are not empty
+        with torch.no_grad():
+            model.lm_head.weight[:len(specials)] = 0.0
+    else:
+        model = transformers.GPT2LMHeadModel(transformers.GPT2Config(
+            vocab_size=len(vocab), n_embd=32, n_layer=2, n_head=4, n_positions=512,
+            bos_token_id=1, eos_token_id=1, pad_token_id=0
+        ))
+    model.save_pretrained(path)
+    return str(path)
+
+@pytest.fixture(scope="session")
+def tiny_seq2seq(tmp_path_factory):
+    return _tiny_checkpoint(tmp_path_factory.mktemp("tiny-t5"), "seq2seq")
+
+@pytest.fixture(scope="session")
+def tiny_causal(tmp_path_factory):
+    return _tiny_checkpoint(tmp_path_factory.mktemp("tiny-gpt2"), "causal")
+
+class CountingLLM(LLM):
+    """Stub LLM that records every model call it makes.
+
+    `calls` lists a (kind, rows) pair per call, kind being "generate",
+    "score" or "embed", and `prompts` every prompt or text sent. Optionally:
+    `respond(prompt, response)` rewrites generated responses; a call for
+    which `block(kind, texts)` is true sets `blocked` and waits until
+    `release` is set; and the first `overlap` calls must run concurrently to
+    get past a barrier.
+    """
+    def __init__(self, respond=None, block=None, overlap=0):
+        super().__init__(backend="stub")
+        self.calls = []
+        self.prompts = []
+        self.respond = respond
+        self.block = block
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+        self.overlap = overlap
+        self._barrier = threading.Barrier(overlap) if overlap else None
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        """Rows generated or scored"""
+        return sum(rows for kind, rows in self.calls if kind != "embed")
+
+    @property
+    def round_trips(self) -> int:
+        """Generation and scoring calls"""
+        return sum(kind != "embed" for kind, _ in self.calls)
+
+    def sizes(self, kind):
+        """The number of rows in each call of one kind"""
+        return [rows for k, rows in self.calls if k == kind]
+
+    def _generate(self, prompts, *args):
+        self._record("generate", prompts)
+        responses = super()._generate(prompts, *args)
+        if self.respond is not None:
+            responses = [self.respond(prompt, response) for prompt, response in zip(prompts, responses)]
+        return responses
+
+    def _score(self, prompts, *args):
+        self._record("score", prompts)
+        return super()._score(prompts, *args)
+
+    def embed(self, texts, *args, **kwargs):
+        self._record("embed", texts)
+        return super().embed(texts, *args, **kwargs)
+
+    def _record(self, kind, texts):
+        texts = list(texts)
+        with self._lock:
+            self.calls.append((kind, len(texts)))
+            self.prompts.extend(texts)
+            first = len(self.calls) <= self.overlap
+        if first:
+            self._barrier.wait(timeout=5)
+        if self.block is not None and self.block(kind, texts):
+            self.blocked.set()
+            assert self.release.wait(5)
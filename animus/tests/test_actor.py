@@ -1,7 +1,11 @@
 # animus/tests/test_actor.py
 
+import pytest
+
 from ..core.models import ActorModel, ThoughtPath
-from ..core.llm import llm
+from ..core.llm import LLM, llm
+from ..core.scheduler import LLMScheduler
+from .conftest import CountingLLM
 
 def test_basic_social_scenario():
     actor = ActorModel()
@@ -163,6 +167,57 @@ def test_complex_social_scenario():
     for effect in result['actual_impact']['unexpected_effects']:
         print(f"            - {effect}")
 
+PREDICTED = ThoughtPath(
+    reasoning="Sam seems friendly",
+    action="Wave back and walk over to Sam",
+    next_steps=["Greet Sam", "Chat", "Say goodbye"],
+    confidence=0.7,
+    social_impact={"relationship_effects": {"Sam": 0.5}, "social_standing": 0.2, "potential_risks": []}
+)
+
+def make_staged(delta=None):
+    """Stub LLM whose first two model calls must overlap; `delta` answers the delta prompt"""
+    def respond(prompt, response):
+        return delta if delta is not None and "change the predicted impact" in prompt else response
+    return CountingLLM(respond=respond, overlap=2)
+
+def test_delta_execution_takes_two_round_trips():
+    staged = make_staged()
+    result = ActorModel(llm=staged, execution="delta").execute(PREDICTED)
+    # Success alongside outcome + effects, then one delta generation
+    assert sorted(staged.calls[:2]) == [("generate", 2), ("score", 1)]
+    assert staged.calls[2:] == [("generate", 1)]
+    assert result["outcome"] and len(result["actual_impact"]["unexpected_effects"]) == 2
+    assert -1.0 <= result["actual_impact"]["social_standing"] <= 1.0
+    assert "Sam" in result["actual_impact"]["relationship_effects"]
+
+def test_delta_execution_adjusts_the_prediction():
+    staged = make_staged(delta="RELATIONSHIPS:\nSam: -0.2\nJo: 0.1\nSOCIAL_STANDING: 0.9\n")
+    impact = ActorModel(llm=staged, execution="delta").execute(PREDICTED)["actual_impact"]
+    assert impact["relationship_effects"] == pytest.approx({"Sam": 0.3, "Jo": 0.1})
+    assert impact["social_standing"] == 1.0
+
+    staged = make_staged(delta="No idea.")
+    impact = ActorModel(llm=staged, execution="delta").execute(PREDICTED)["actual_impact"]
+    assert impact["relationship_effects"] == {"Sam": 0.5}
+    assert impact["social_standing"] == 0.2
+
+def test_complete_paths_takes_two_round_trips():
+    # Calls made together land in one scheduler batch, so batches count round-trips
+    with LLMScheduler(llm=LLM(backend="stub"), max_wait=0.2) as scheduler:
+        paths = ActorModel(llm=scheduler).complete_paths(
+            "Sam waves", "None", {"open": 0.7}, ["Be friendly", "Stay polite"], ["Wave back", "Nod"]
+        )
+        stats = scheduler.stats()
+    # Next steps, then confidence, relationships, risks and standing together
+    assert stats["batches"] == 2
+    assert stats["requests"] == 2 * 5
+    assert all(path.next_steps and path.social_impact["potential_risks"] for path in paths)
+
+def test_unknown_execution_is_rejected():
+    with pytest.raises(ValueError):
+        ActorModel(llm=LLM(backend="stub"), execution="replay")
+
 if __name__ == "__main__":
     print("Testing basic social scenario...")
     test_basic_social_scenario()
@@ -0,0 +1,15 @@
+# animus/tests/test_agent.py
+
+from ..core.agent import SocialAgent
+from .conftest import CountingLLM
+
+def round_trips_for(k):
+    llm = CountingLLM()
+    agent = SocialAgent("Ada", {"curious": 0.8}, location="market", llm=llm)
+    agent.memory.async_importance = False
+    result = agent.think_and_act("Sam waves from across the market", k=k)
+    assert "outcome" in result
+    return llm.round_trips
+
+def test_paths_are_built_and_evaluated_in_batches():
+    assert round_trips_for(3) == round_trips_for(1)
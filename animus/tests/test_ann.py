@@ -0,0 +1,47 @@
+# animus/tests/test_ann.py
+
+import numpy as np
+
+from ..core.ann import IVFPQIndex, exact_search, recall_benchmark
+from ..core.llm import LLM
+from ..core.memory import MemorySystem
+
+def unit_vectors(n, dim, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_recall_against_exact_search():
+    rows = recall_benchmark(n=4000, dim=32, n_queries=50, n_probes=(2, 16), n_lists=32, n_subquantizers=8)
+    assert rows[-1]["refined_recall"] >= 0.9
+    assert rows[0]["refined_recall"] <= rows[-1]["refined_recall"]
+
+def test_incremental_inserts_deletes_and_rebuild():
+    vectors = unit_vectors(600, 16)
+    index = IVFPQIndex(dim=16, n_lists=8, n_subquantizers=4, train_size=200, n_probe=8)
+
+    index.add(np.arange(100), vectors[:100])
+    assert not index.trained
+    assert exact_search(vectors[:100], vectors[7], 1)[0][0] == index.search(vectors[7], 1)[0][0] == 7
+
+    for start in range(100, 600, 100):
+        index.add(np.arange(start, start + 100), vectors[start:start + 100])
+    assert index.trained and len(index) == 600
+
+    index.remove(range(0, 300))
+    assert len(index) == 300
+    assert index.needs_rebuild
+    assert all(i >= 300 for i in index.search(vectors[10], 20)[0])
+
+    index.rebuild(np.arange(300, 600), vectors[300:])
+    assert not index.needs_rebuild and len(index) == 300
+
+def test_memory_system_retrieves_through_index():
+    index = IVFPQIndex(dim=256, n_lists=4, n_subquantizers=32, train_size=16)
+    memory = MemorySystem(llm=LLM(backend="stub"), index=index, shortlist=8)
+    memory.add_memory("Sam lent me a blue umbrella in the rain", "interaction", location="market")
+    for i in range(30):
+        memory.add_memory(f"Filler event number {i} at the docks", "observation", location="docks")
+
+    assert memory.index.trained
+    top = memory.get_relevant_memories("Sam lent me a blue umbrella in the rain", k=1)
+    assert top[0].content.startswith("Sam lent me")
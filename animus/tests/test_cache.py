@@ -0,0 +1,44 @@
+# animus/tests/test_cache.py
+
+from ..core.cache import ResponseCache
+
+def test_lru_eviction_respects_byte_budget():
+    keys = [ResponseCache.make_key("model", f"prompt {i}", 0.3, 8, "unseeded") for i in range(3)]
+    # Room for two entries only
+    cache = ResponseCache(max_bytes=2 * (len(keys[0]) + 3))
+
+    cache.put(keys[0], "0.1")
+    cache.put(keys[1], "0.2")
+    assert cache.get(keys[0]) == "0.1"   # keys[1] is now least recently used
+    cache.put(keys[2], "0.3")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "0.1"
+    assert cache.get(keys[2]) == "0.3"
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    key = ResponseCache.make_key("model", "Return ONLY a number:", 0.3, 8, "seed:1")
+
+    cache = ResponseCache(path=path)
+    cache.put(key, "0.8")
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert reopened.get(key) == "0.8"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get(key) == "0.8"
+    assert reopened.stats()["disk_hits"] == 1
+
+def test_key_covers_sampling_parameters():
+    base = ResponseCache.make_key("model", "prompt", 0.3, 8, "unseeded")
+    assert base != ResponseCache.make_key("model", "prompt", 0.7, 8, "unseeded")
+    assert base != ResponseCache.make_key("model", "prompt", 0.3, 16, "unseeded")
+    assert base != ResponseCache.make_key("model", "prompt", 0.3, 8, "seed:0")
+    assert base != ResponseCache.make_key("other", "prompt", 0.3, 8, "unseeded")
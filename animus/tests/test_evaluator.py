@@ -0,0 +1,33 @@
+# animus/tests/test_evaluator.py
+
+from ..core.models import EvaluatorModel, ThoughtPath
+from .conftest import CountingLLM
+
+PATHS = [
+    ThoughtPath("Sam seems friendly", f"Wave back {i}", ["Greet", "Talk", "Leave"], 0.7)
+    for i in range(3)
+]
+
+def test_path_evaluations_only_score_up_front():
+    llm = CountingLLM()
+    evaluations = EvaluatorModel(llm=llm).evaluate_thought_paths(PATHS, "Sam waves", {"open": 0.7})
+    assert llm.rows == 3
+    assert all(0.0 <= evaluation["score"] <= 1.0 for evaluation in evaluations)
+    assert evaluations[0].pending == ["reasoning", "risks", "opportunities"]
+
+    risks = evaluations[0]["risks"]
+    assert len(risks) == 3 and llm.rows == 4
+    assert evaluations[0]["risks"] == risks and llm.rows == 4
+    assert evaluations[0].pending == ["reasoning", "opportunities"]
+
+def test_explanations_can_be_batched_or_left_unmemoized():
+    llm = CountingLLM()
+    evaluator = EvaluatorModel(llm=llm, memoize=False)
+    evaluations = evaluator.evaluate_thought_paths(PATHS, "Sam waves", {"open": 0.7})
+    explained = evaluator.explain(evaluations[:2], ["reasoning", "opportunities"])
+    assert llm.rows == 3 + 4
+    assert set(explained[0]) == {"reasoning", "opportunities"}
+    assert evaluations[0].pending == ["reasoning", "risks", "opportunities"]
+    evaluations[0]["reasoning"]
+    evaluations[0]["reasoning"]
+    assert llm.rows == 3 + 4 + 2
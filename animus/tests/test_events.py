@@ -0,0 +1,32 @@
+# animus/tests/test_events.py
+
+from ..core.llm import LLM
+from ..core.events import EventStore
+from ..core.memory import MemorySystem
+from .conftest import CountingLLM
+
+def test_witnesses_share_one_event():
+    llm = CountingLLM()
+    events = EventStore(llm=llm)
+    witnesses = [MemorySystem(llm=llm, async_importance=False, events=events) for _ in range(5)]
+    for i, memory in enumerate(witnesses):
+        memory.add_memory("The bell tower collapsed", "observation", location="square", emotional_impact=0.1 * i)
+
+    assert len(events) == 1
+    assert llm.sizes("embed") == [1]
+    assert llm.sizes("score") == [1]
+    assert len({id(memory.store.contents[0]) for memory in witnesses}) == 1
+    assert [round(m.memories[0].emotional_impact, 1) for m in witnesses] == [0.0, 0.1, 0.2, 0.3, 0.4]
+
+    top = witnesses[2].get_relevant_memories("the bell tower fell down", k=1)
+    assert top[0].content == "The bell tower collapsed"
+    assert witnesses[2].memories[0].access_count == 1
+    assert witnesses[3].memories[0].access_count == 0
+
+def test_released_events_are_forgotten():
+    events = EventStore(llm=LLM(backend="stub"))
+    ids = events.record(["A fox ran by", "A fox ran by", "Rain began"])
+    assert ids[0] == ids[1] != ids[2]
+    events.release(ids[:2])
+    assert len(events) == 1
+    assert events.record(["Snow fell"])[0] == ids[0]
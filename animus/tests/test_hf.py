@@ -0,0 +1,134 @@
+# animus/tests/test_hf.py
+
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from ..core.backends import create_backend
+from ..core.hf import HFCausalBackend, HFSeq2SeqBackend
+from ..core.llm import LLM
+
+@pytest.fixture(params=["seq2seq", "causal"])
+def make_backend(request, tiny_seq2seq, tiny_causal):
+    cls, path = {
+        "seq2seq": (HFSeq2SeqBackend, tiny_seq2seq),
+        "causal": (HFCausalBackend, tiny_causal),
+    }[request.param]
+    return lambda **options: cls(path, device="cpu", **options)
+
+def test_concurrent_shared_calls_with_a_small_prefix_cache(make_backend):
+    backend = make_backend(prefix_cache_size=2)
+    contexts = [f"the market {' '.join(['one'] * i)}" for i in range(10)]
+    expected = {
+        context: backend.score_shared([context] * 2, ["sam waves", "help"], ["yes", "no"])
+        for context in contexts
+    }
+    errors, mismatches = [], []
+
+    def run(offset):
+        for i in range(30):
+            context = contexts[(offset + i) % len(contexts)]
+            try:
+                scores = backend.score_shared([context] * 2, ["sam waves", "help"], ["yes", "no"])
+                texts = backend.generate_shared([context], ["sam waves"], [0.0], [4])
+                if not np.allclose(scores, expected[context], atol=1e-4) or not texts[0]:
+                    mismatches.append(context)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(offset,)) for offset in range(8)]
+    # Switch threads often so lookups and evictions interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == [] and mismatches == []
+    assert len(backend._prefixes) <= 2
+
+PROMPTS = ["what is the situation at the market ?", "sam waves", "how is your friend alex at the cafe this morning ?"]
+OPTIONS = ["yes", "no", "good", "bad"]
+
+@pytest.mark.parametrize("name", ["hf-seq2seq", "hf-causal"])
+def test_registry_loads_hf_backends_lazily(name, tiny_seq2seq, tiny_causal):
+    path = tiny_seq2seq if name == "hf-seq2seq" else tiny_causal
+    llm = LLM(backend=name, model_name=path, device="cpu")
+    assert not llm.loaded
+    expected = create_backend(name, model_name=path, device="cpu").generate(PROMPTS, [0.0] * 3, [6] * 3)
+    assert llm.generate_batch(PROMPTS, temperatures=0.0, max_new_tokens=6, verbose=False) == expected
+    assert llm.loaded
+
+def test_batch_generation_matches_single_rows(make_backend):
+    backend = make_backend()
+    budgets = [6, 3, 6]
+    batch = backend.generate(PROMPTS, [0.0] * 3, budgets)
+    assert batch == [backend.generate([prompt], [0.0], [budget])[0] for prompt, budget in zip(PROMPTS, budgets)]
+    assert all(batch)
+    # A row's budget caps its own output only
+    assert all(len(backend.tokenizer(text, add_special_tokens=False)["input_ids"]) <= budget
+               for text, budget in zip(batch, budgets))
+
+def test_batch_scores_match_single_rows(make_backend):
+    backend = make_backend()
+    batch = backend.score(PROMPTS, OPTIONS)
+    single = [backend.score([prompt], OPTIONS)[0] for prompt in PROMPTS]
+    assert np.allclose(batch, single, atol=1e-4)
+    assert all(len(row) == len(OPTIONS) for row in batch)
+
+def test_causal_shared_calls_match_the_joined_prompt(tiny_causal):
+    backend = HFCausalBackend(tiny_causal, device="cpu")
+    contexts = ["the market is busy .", "the market is busy .", "alex is at the cafe ."]
+    joined = [f"{context} {prompt}" for context, prompt in zip(contexts, PROMPTS)]
+    assert np.allclose(backend.score_shared(contexts, PROMPTS, OPTIONS), backend.score(joined, OPTIONS), atol=1e-4)
+    assert backend.generate_shared(contexts, PROMPTS, [0.0] * 3, [5] * 3) == \
+        [backend.generate([row], [0.0], [5])[0] for row in joined]
+
+def test_seq2seq_shared_calls_match_per_row_and_cold_cache(tiny_seq2seq):
+    backend = HFSeq2SeqBackend(tiny_seq2seq, device="cpu")
+    contexts = ["the market is busy .", "the market is busy .", "alex is at the cafe ."]
+    # Fusion-in-decoder rows are independent of their batch and of the prefix cache
+    scores = backend.score_shared(contexts, PROMPTS, OPTIONS)
+    texts = backend.generate_shared(contexts, PROMPTS, [0.0] * 3, [5] * 3)
+    per_row = [backend.score_shared([c], [p], OPTIONS)[0] for c, p in zip(contexts, PROMPTS)]
+    assert np.allclose(scores, per_row, atol=1e-4)
+    assert texts == [backend.generate_shared([c], [p], [0.0], [5])[0] for c, p in zip(contexts, PROMPTS)]
+
+    cold = HFSeq2SeqBackend(tiny_seq2seq, device="cpu", prefix_cache_size=0)
+    assert np.allclose(cold.score_shared(contexts, PROMPTS, OPTIONS), scores, atol=1e-4)
+    assert cold.generate_shared(contexts, PROMPTS, [0.0] * 3, [5] * 3) == texts
+    assert len(cold._prefixes) == 0
+
+def test_prefix_lru_evicts_the_least_recently_used(make_backend):
+    backend = make_backend(prefix_cache_size=2)
+    shared = lambda context: backend.score_shared([context], ["sam waves"], OPTIONS)
+    shared("the market")
+    shared("the cafe")
+    shared("the market")
+    shared("alex")
+    assert list(backend._prefixes) == ["the market", "alex"]
+    shared("the cafe")
+    assert list(backend._prefixes) == ["alex", "the cafe"]
+
+def test_seeded_rows_and_calls_draw_different_samples(make_backend):
+    torch = pytest.importorskip("torch")
+    backend = make_backend()
+    # Repeated rows of one seeded call are separate samples, and the call is reproducible
+    texts = backend.generate_shared(["the market"] * 6, ["sam waves"] * 6, [1.5] * 6, [8] * 6, seed=3)
+    assert len(set(texts)) > 1
+    assert backend.generate_shared(["the market"] * 6, ["sam waves"] * 6, [1.5] * 6, [8] * 6, seed=3) == texts
+
+    # Calls about different rows are not reseeded to the same state
+    seeds = []
+    for prompt in PROMPTS:
+        backend.generate([prompt], [1.0], [2], seed=3)
+        seeds.append(torch.initial_seed())
+    assert len(set(seeds)) == len(PROMPTS)
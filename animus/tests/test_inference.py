@@ -0,0 +1,37 @@
+# animus/tests/test_inference.py
+
+import pytest
+from ..core.inference import FP32, INT8, SANITY_PROMPTS, check_accuracy, get_inference_mode
+
+def test_modes_resolve_by_name_and_environment(monkeypatch):
+    assert get_inference_mode("int8") is INT8
+    custom = INT8.derive(name="int8-4t", intra_op_threads=4)
+    assert get_inference_mode(custom) is custom
+
+    monkeypatch.setenv("ANIMUS_LLM_INFERENCE", "bf16")
+    assert get_inference_mode().dtype == "bf16"
+
+    with pytest.raises(ValueError):
+        get_inference_mode("fp8")
+
+@pytest.mark.parametrize("mode", ["int8", "bf16"])
+@pytest.mark.parametrize("backend", ["hf-seq2seq", "hf-causal"])
+def test_accuracy_check_reports_against_fp32(mode, backend, tiny_seq2seq, tiny_causal):
+    path = tiny_seq2seq if backend == "hf-seq2seq" else tiny_causal
+    report = check_accuracy(mode, backend=backend, model_name=path, max_new_tokens=8)
+
+    assert report["mode"] == mode
+    # The converted model really scores differently, just not by much
+    assert 0.0 < report["score_error"] <= 0.05
+    assert report["agreement"] == 1.0
+    assert report["passed"]
+    if mode == "int8" and backend == "hf-seq2seq":
+        # GPT-2's Conv1D projections are not quantized, so only T5 shrinks
+        assert report["model_bytes"] < report["baseline_model_bytes"]
+
+def test_compiled_forward_matches_fp32(tiny_causal):
+    compiled = FP32.derive(name="compiled", compile=True)
+    report = check_accuracy(compiled, backend="hf-causal", model_name=tiny_causal,
+                            prompts=SANITY_PROMPTS[:1], max_new_tokens=2)
+    assert report["mode"] == "compiled"
+    assert report["passed"] and report["agreement"] == 1.0
@@ -0,0 +1,46 @@
+# animus/tests/test_llm.py
+
+from ..core.llm import LLM
+from ..core.backends import available_backends
+from ..core.cache import ResponseCache
+
+def test_construction_does_not_load_backend():
+    llm = LLM(backend="hf-seq2seq")
+    assert llm.model_name == "google/flan-t5-xl"
+    assert not llm.loaded
+
+def test_registry_lists_builtin_backends():
+    assert {"hf-seq2seq", "hf-causal", "stub"} <= set(available_backends())
+
+def test_stub_backend_is_deterministic():
+    llm = LLM(backend="stub")
+    prompt = """Rate this approach (0.0 to 1.0):
+        Return ONLY a number:"""
+
+    first = llm.generate_batch([prompt, "Describe your action."], verbose=False)
+    second = llm.generate_batch([prompt, "Describe your action."], verbose=False)
+
+    assert llm.loaded
+    assert first == second
+    assert 0.0 <= float(first[0]) <= 1.0
+
+def test_cache_serves_marked_rows_only():
+    llm = LLM(backend="stub")
+    llm.cache = ResponseCache()
+
+    llm.generate_batch(["a", "b"], temperatures=0.3, cache=[True, False], verbose=False)
+    llm.generate_batch(["a", "b"], temperatures=0.3, cache=[True, False], verbose=False)
+
+    stats = llm.cache.stats()
+    assert stats["hits"] == 1
+    assert stats["entries"] == 1
+
+def test_shared_context_falls_back_to_joined_prompts():
+    llm = LLM(backend="stub")
+    context = "Situation: a quiet morning at the market"
+    questions = ["List risks. Format with 'RISK: ' prefix", "Describe your action."]
+
+    shared = llm.generate_shared([context] * 2, questions, verbose=False)
+    joined = llm.generate_batch([f"{context}\n\n{q}" for q in questions], verbose=False)
+
+    assert shared == joined
@@ -0,0 +1,131 @@
+# animus/tests/test_memory.py
+
+import asyncio
+
+from ..core.llm import LLM
+from ..core.consolidation import ConsolidationPolicy
+from ..core.memory import MemorySystem
+from .conftest import CountingLLM
+
+def make_memory(**kwargs):
+    memory = MemorySystem(llm=LLM(backend="stub"), **kwargs)
+    for i in range(20):
+        memory.add_memory(f"Filler event number {i} at the docks", "observation", location="docks")
+    memory.add_memory("Sam lent me a blue umbrella in the rain", "interaction", location="market", people_involved=["Sam"])
+    memory.add_memory("Alex argued about the price of apples", "interaction", location="market", people_involved=["Alex"])
+    return memory
+
+def test_retrieval_finds_similar_memories_without_llm_calls():
+    memory = make_memory()
+    assert len(memory.memories) == 22
+
+    top = memory.get_relevant_memories("It is raining and Sam has an umbrella", k=1)
+    assert top[0].content.startswith("Sam lent me a blue umbrella")
+
+    top = memory.get_relevant_memories("haggling over apples and their price", k=2, current_location="market")
+    assert top[0].content.startswith("Alex argued")
+
+def test_modifiers_rank_memories_unrelated_to_the_query():
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False)
+    for i in range(6):
+        memory.add_memory(f"Filler event number {i}", "observation", location="market" if i == 3 else "docks")
+    memory.store.importance[:] = 0.5
+    # No shared words: every similarity is 0, so location must decide
+    top = memory.get_relevant_memories("quiet harbour evening", k=1, current_location="market")
+    assert top[0].content == "Filler event number 3"
+
+    # Recency breaks the tie between equally located memories
+    memory.store.timestamps[memory.store.slots()] -= 48 * 3600
+    memory.store.timestamps[memory.store.slots()[4]] += 48 * 3600
+    top = memory.get_relevant_memories("quiet harbour evening", k=1)
+    assert top[0].content == "Filler event number 4"
+
+def test_rerank_returns_k_from_shortlist():
+    memory = make_memory(rerank=5)
+    top = memory.get_relevant_memories("Sam and the umbrella", k=2)
+    assert len(top) == 2
+    assert len({m.content for m in top}) == 2
+
+def test_empty_memory_returns_nothing():
+    assert MemorySystem(llm=LLM(backend="stub")).get_relevant_memories("anything") == []
+
+def test_importance_is_scored_in_background_batches():
+    llm = CountingLLM()
+    memory = MemorySystem(llm=llm, importance_wait=0.2)
+    for i in range(10):
+        memory.add_memory(f"Event {i}", "observation", location="market")
+    assert all(m.importance == 0.5 for m in memory.memories)
+    assert memory.pending_importance > 0
+
+    assert memory.flush(timeout=5)
+    assert memory.pending_importance == 0
+    assert len(llm.sizes("score")) < 10
+
+    expected = MemorySystem(llm=LLM(backend="stub"), async_importance=False)
+    for i in range(10):
+        expected.add_memory(f"Event {i}", "observation", location="market")
+    assert [m.importance for m in memory.memories] == [m.importance for m in expected.memories]
+
+def test_aflush_waits_for_scores():
+    memory = MemorySystem(llm=LLM(backend="stub"))
+    memory.add_memory("Sam waved", "observation", location="market")
+    assert asyncio.run(memory.aflush(timeout=5))
+    assert memory.memories[0].importance != 0.5
+
+def test_consolidation_keeps_store_within_budget():
+    policy = ConsolidationPolicy(budget=20, slack=0.1, target=0.8, min_age_hours=0, cluster_size=4)
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False, consolidation=policy)
+    for i in range(40):
+        memory.add_memory(f"Event {i} at the {'docks' if i % 2 else 'market'}", "observation", location="market")
+
+    assert len(memory.memories) <= 22
+    stats = memory.consolidation_stats
+    assert stats["runs"] >= 1
+    assert stats["summaries_created"] > 0
+    assert stats["memories_summarized"] + stats["memories_evicted"] > 0
+
+    summaries = [m for m in memory.memories if m.memory_type == "summary"]
+    assert summaries and all(m.level >= 1 for m in summaries)
+    ids = [m.id for m in memory.memories]
+    assert len(set(ids)) == len(ids)
+    # Every summary links back to the memories it replaced, which stay reachable but are not retrieved
+    for summary in summaries:
+        assert summary.sources
+        assert [m.id for m in memory.resolve(summary.sources)] == summary.sources
+        assert not set(summary.sources) & set(ids)
+    assert len(memory.archive) == stats["memories_summarized"]
+    assert memory.get_relevant_memories("Event at the docks", k=3)
+
+def test_consolidation_is_off_by_default_and_spares_young_memories():
+    memory = MemorySystem(llm=LLM(backend="stub"))
+    assert memory.consolidation is None
+
+    policy = ConsolidationPolicy(budget=10, slack=0.1, target=0.8, min_age_hours=24, cluster_size=4)
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False, consolidation=policy)
+    for i in range(20):
+        memory.add_memory(f"Event {i} at the market", "observation", location="market")
+    assert len(memory.memories) == 20
+    assert memory.consolidation_stats["memories_evicted"] == 0
+
+    # Age half of them: only those may be summarized or evicted
+    slots = memory.store.slots()
+    memory.store.timestamps[slots[:10]] -= 48 * 3600
+    young = {m.id for m in memory.memories[10:]}
+    memory.consolidate()
+    assert young <= {m.id for m in memory.memories}
+    assert len(memory.memories) < 20
+
+def test_summaries_are_cached_and_updated_incrementally():
+    memory = make_memory(async_importance=False, summary_staleness=1)
+    e, a, b, c, d = memory.memories[-5:]
+
+    first = memory.summarize_memories([a, b, c])
+    assert memory.summarize_memories([c, b, a]) == first
+    memory.summarize_memories([a, b, d])
+    # One change from the stale update, two from the fresh summary
+    memory.summarize_memories([e, b, d])
+    assert memory.summary_stats == {"hits": 1, "incremental": 1, "full": 2}
+
+    d.version += 1
+    memory.summarize_memories([a, b, d])
+    assert memory.summary_stats["hits"] == 1
@@ -0,0 +1,43 @@
+# animus/tests/test_memory_store.py
+
+from datetime import datetime
+
+import numpy as np
+
+from ..core.llm import LLM
+from ..core.memory import MemorySystem
+from ..core.memory_store import Memory, MemoryStore
+
+def make_record(content, location="market", people=(), importance=0.5):
+    now = datetime.now()
+    return Memory(content=content, timestamp=now, memory_type="observation", location=location,
+                  people_involved=list(people), emotional_impact=0.1, importance=importance, last_accessed=now)
+
+def test_store_round_trips_and_reuses_slots():
+    store = MemoryStore()
+    vector = np.ones(4, dtype=np.float32)
+    first = store.add(make_record("Sam waved", people=["Sam"]), vector)
+    second = store.add(make_record("Alex ran", location="docks", people=["Alex", "Sam"]), vector)
+
+    memory = store.get(second)
+    assert memory.content == "Alex ran"
+    assert memory.location == "docks"
+    assert memory.people_involved == ["Alex", "Sam"]
+    assert store.slots_about("Sam").tolist() == [first, second]
+    assert store.slots_at("docks").tolist() == [second]
+
+    store.remove([first])
+    assert len(store) == 1
+    assert store.slots_about("Sam").tolist() == [second]
+    assert store.add(make_record("Kim sang", people=["Kim"]), vector) == first
+    assert store.slots().tolist() == [first, second]
+
+def test_memories_about_person_use_the_index():
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False)
+    memory.add_memory("Sam lent me an umbrella", "interaction", location="market", people_involved=["Sam"])
+    memory.add_memory("Alex argued about apples", "interaction", location="market", people_involved=["Alex"])
+    memory.add_memory("Sam and Alex shared lunch", "interaction", location="docks", people_involved=["Sam", "Alex"])
+
+    about_sam = memory.get_memories_about_person("Sam", k=5)
+    assert sorted(m.content for m in about_sam) == ["Sam and Alex shared lunch", "Sam lent me an umbrella"]
+    assert memory.get_memories_about_person("Nobody") == []
@@ -0,0 +1,53 @@
+# animus/tests/test_persistence.py
+
+from ..core.consolidation import ConsolidationPolicy
+from ..core.llm import LLM
+from ..core.memory import MemorySystem
+from ..core.persistence import MemoryDatabase
+
+def test_memories_survive_a_restart(tmp_path):
+    path = str(tmp_path / "memories.db")
+    database = MemoryDatabase(path)
+    memory = MemorySystem(llm=LLM(backend="stub"), database=database, owner="ada")
+    memory.add_memory("Sam lent me a blue umbrella", "interaction", location="market", people_involved=["Sam"])
+    memory.add_memory("Alex argued about apples", "interaction", location="market", people_involved=["Alex"])
+    memory.flush()
+    database.close()
+
+    database = MemoryDatabase(path)
+    database.preload()
+    restored = MemorySystem(llm=LLM(backend="stub"), database=database, owner="ada")
+    assert [m.content for m in restored.memories] == [m.content for m in memory.memories]
+    assert [m.importance for m in restored.memories] == [m.importance for m in memory.memories]
+    assert restored.get_memories_about_person("Sam")[0].content == "Sam lent me a blue umbrella"
+    assert len(MemorySystem(llm=LLM(backend="stub"), database=database, owner="someone else")) == 0
+
+    restored.add_memory("Kim sang by the docks", "observation", location="docks")
+    assert restored.memories[-1].id == 2
+
+def test_snapshot_restores_a_point_in_time(tmp_path):
+    database = MemoryDatabase(str(tmp_path / "live.db"))
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False, database=database, owner="ada")
+    memory.add_memory("Before the snapshot", "observation", location="market")
+    database.snapshot(str(tmp_path / "snapshot.db"))
+    memory.add_memory("After the snapshot", "observation", location="market")
+    database.close()
+
+    database = MemoryDatabase.restore(str(tmp_path / "snapshot.db"), str(tmp_path / "restored.db"))
+    restored = MemorySystem(llm=LLM(backend="stub"), database=database, owner="ada")
+    assert [m.content for m in restored.memories] == ["Before the snapshot"]
+
+def test_consolidation_is_written_back(tmp_path):
+    database = MemoryDatabase(str(tmp_path / "memories.db"))
+    policy = ConsolidationPolicy(budget=10, slack=0.1, target=0.8, min_age_hours=0, cluster_size=4)
+    memory = MemorySystem(llm=LLM(backend="stub"), async_importance=False, consolidation=policy,
+                          database=database, owner="ada")
+    for i in range(20):
+        memory.add_memory(f"Event {i} at the market", "observation", location="market")
+
+    restored = MemorySystem(llm=LLM(backend="stub"), database=database, owner="ada")
+    assert sorted(m.id for m in restored.memories) == sorted(m.id for m in memory.memories)
+    # Memories replaced by summaries are archived, not lost
+    assert restored.archive.keys() == memory.archive.keys() and restored.archive
+    summaries = [m for m in restored.memories if m.memory_type == "summary"]
+    assert summaries and all(len(restored.resolve(m.sources)) == len(m.sources) > 1 for m in summaries)
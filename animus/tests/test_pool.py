@@ -0,0 +1,37 @@
+# animus/tests/test_pool.py
+
+import pytest
+
+from ..core.llm import LLM
+from ..core.pool import PoolBackend, _core_sets
+from ..core.profiles import prefixed_list
+
+def test_core_sets_split_cores_between_workers():
+    assert _core_sets(2, cores=[0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    assert _core_sets(3, cores=[0, 1]) == [[0], [1], [0]]
+
+def test_pool_matches_single_process_backend():
+    prompts = [f"Situation {i}. Format with 'RISK: ' prefix" for i in range(5)]
+    single = LLM(backend="stub")
+    pooled = LLM(backend="stub", workers=2)
+    try:
+        assert isinstance(pooled.backend, PoolBackend)
+        profile = prefixed_list('RISK: ', 3)
+        assert pooled.generate_batch(prompts, profiles=profile, verbose=False) == \
+            single.generate_batch(prompts, profiles=profile, verbose=False)
+        assert pooled.score_batch(prompts, verbose=False) == single.score_batch(prompts, verbose=False)
+    finally:
+        pooled.configure("stub")
+
+def test_pooled_hf_backend_matches_in_process(tiny_causal):
+    np = pytest.importorskip("numpy")
+    from ..core.hf import HFCausalBackend
+    backend = HFCausalBackend(tiny_causal, device="cpu")
+    texts = ["the market is busy", "sam has an umbrella", "rain"]
+    expected = backend.embed(texts)
+    pooled = PoolBackend(backend, 2)
+    try:
+        assert np.allclose(pooled.embed(texts), expected, atol=1e-5)
+        assert np.allclose(pooled.score(texts, ["yes", "no"]), backend.score(texts, ["yes", "no"]), atol=1e-4)
+    finally:
+        pooled.close()
@@ -0,0 +1,28 @@
+# animus/tests/test_profiles.py
+
+from ..core.llm import LLM
+from ..core.profiles import SCALAR_SCORE, LABEL, prefixed_list, stop_after_number
+
+def test_number_stop_waits_for_the_number_to_end():
+    assert stop_after_number("0.", False) is None
+    assert stop_after_number("0.75", False) is None
+    assert stop_after_number("0.75 because", False) == 4
+    assert stop_after_number("0.75", True) == 4
+
+def test_truncate_keeps_only_the_requested_shape():
+    assert SCALAR_SCORE.truncate("Score: 0.8, since it is polite") == "Score: 0.8"
+    assert LABEL.truncate("SUCCESS\nThe action worked") == "SUCCESS"
+
+    risks = prefixed_list('RISK: ', 2)
+    text = "Some preamble\nRISK: one\nRISK: two\nRISK: three"
+    assert risks.truncate(text) == "Some preamble\nRISK: one\nRISK: two"
+
+def test_profile_supplies_defaults_and_explicit_values_win():
+    llm = LLM(backend="stub")
+    prompt = "Rate this (0.0 to 1.0). Return ONLY a number:"
+
+    scored = llm.generate(prompt, profile="score", verbose=False)
+    assert 0.0 <= float(scored) <= 1.0
+
+    clipped = llm.generate("Describe your action.", profile="reasoning", max_length=1, verbose=False)
+    assert clipped == "Stub"
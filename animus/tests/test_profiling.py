@@ -0,0 +1,84 @@
+# animus/tests/test_profiling.py
+
+import csv
+import json
+
+import pytest
+
+from ..core.agent import SocialAgent
+from ..core.cache import ResponseCache
+from ..core.llm import LLM
+from ..core.models import ActorModel, EvaluatorModel
+from ..core.profiling import profiler
+from ..core.scheduler import LLMScheduler
+
+@pytest.fixture
+def profiling():
+    profiler.reset()
+    profiler.enable()
+    yield profiler
+    profiler.disable()
+    profiler.reset()
+
+def test_disabled_profiler_records_nothing():
+    profiler.reset()
+    LLM(backend="stub").generate_batch(["a", "b"], verbose=False)
+    assert profiler.records == []
+
+def test_rows_are_attributed_to_call_site_agent_and_tick(profiling):
+    agent = SocialAgent("Alex", {"openness": 0.8}, location="market", llm=LLM(backend="stub"))
+    with profiling.scope(tick=3):
+        agent.think_and_act("Sam waves from across the market.", k=2)
+
+    report = profiling.report()
+    sites = {row["site"].split(" ")[0] for row in report}
+    assert {"ActorModel.reason", "ActorModel.complete_paths", "EvaluatorModel.evaluate_thought_paths", "ReflectionModel.reflect"} <= sites
+    assert all(record.agent == "Alex" and record.tick == 3 for record in profiling.records)
+    assert any(row["parse_rate"] is not None for row in report)
+
+    by_agent = profiling.report(group_by=("agent", "tick"))
+    assert by_agent[0]["rows"] == len(profiling.records)
+
+def test_fused_mode_reports_model_call_sites(profiling):
+    llm = LLM(backend="stub")
+    paths = ActorModel(llm=llm, mode="fused").generate_paths("Sam waves", "None", {"open": 0.7}, "market", k=2)
+    EvaluatorModel(llm=llm, mode="fused").evaluate_thought_paths(paths, "Sam waves", {"open": 0.7})
+
+    sites = {row["site"].split(" ")[0] for row in profiling.report()}
+    assert any(site.startswith("ActorModel.") for site in sites)
+    assert any(site.startswith("EvaluatorModel.") for site in sites)
+    assert not any(site.startswith("ask_structured") for site in sites)
+
+def test_a_failed_row_marks_only_its_own_record(profiling):
+    responses = LLM(backend="stub").generate_batch(["first", "second", "third"], verbose=False)
+    for i, response in enumerate(responses):
+        profiling.note_parse(i != 1, row=i)
+    # A later success for the same row does not clear a failure
+    profiling.note_parse(True, row=1)
+
+    assert [record.parsed for record in profiling.records] == [True, False, True]
+    assert profiling.report()[0]["parse_rate"] == pytest.approx(2 / 3)
+
+def test_cache_hits_and_queue_waits_are_recorded(profiling):
+    llm = LLM(backend="stub")
+    llm.cache = ResponseCache()
+    llm.generate_batch(["same"] * 2, temperatures=0.3, cache=True, verbose=False)
+    llm.generate_batch(["same"], temperatures=0.3, cache=True, verbose=False)
+    assert [record.cache_hit for record in profiling.records][-1]
+
+    with LLMScheduler(llm=llm, max_wait=0.01) as scheduler:
+        scheduler.generate_batch(["queued one", "queued two"])
+    queued = profiling.records[-2:]
+    assert all(record.queue_wait > 0.0 for record in queued)
+    assert all(record.site.startswith("test_cache_hits_and_queue_waits_are_recorded") for record in queued)
+
+def test_export_json_and_csv(profiling, tmp_path):
+    LLM(backend="stub").score_batch(["Return ONLY a number:"] * 3, verbose=False)
+
+    profiling.export(str(tmp_path / "report.json"))
+    profiling.export(str(tmp_path / "records.csv"), raw=True)
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report[0]["rows"] == 3
+    with open(tmp_path / "records.csv") as f:
+        assert len(list(csv.DictReader(f))) == 3
@@ -0,0 +1,72 @@
+# animus/tests/test_reflection.py
+
+from ..core.agent import SocialAgent
+from ..reasoning.reflection import ReflectionScheduler
+from .conftest import CountingLLM
+
+def reflecting(kind, texts):
+    return kind == "generate" and any(text.startswith("Reflect on") for text in texts)
+
+def embedding_experiences(kind, texts):
+    return kind == "embed" and any(text.startswith("Action:") for text in texts)
+
+def reflection_prompts(llm):
+    return [prompt for prompt in llm.prompts if prompt.startswith("Reflect on")]
+
+def make_agent(llm, scheduler):
+    agent = SocialAgent("Ada", {"curious": 0.8}, location="market", llm=llm, reflections=scheduler)
+    agent.memory.async_importance = False
+    return agent
+
+def test_decisions_do_not_wait_for_reflection():
+    llm = CountingLLM(block=reflecting)
+    scheduler = ReflectionScheduler(threshold=0.0)
+    agent = make_agent(llm, scheduler)
+    # The first step's reflection blocks the worker; the next steps still run
+    for _ in range(3):
+        assert "outcome" in agent.think_and_act("Sam waves from across the market", k=1)
+    assert scheduler.pending > 0
+    assert agent.long_term == []
+
+    llm.release.set()
+    assert scheduler.flush(timeout=5)
+    assert scheduler.stats["stored"] == 3
+    assert scheduler.stats["reflections"] == len(agent.long_term) >= 1
+    types = [memory.memory_type for memory in agent.memory.memories]
+    assert types.count("experience") == 3 and types.count("reflection") == len(agent.long_term)
+
+def test_experiences_are_batched_into_one_reflection():
+    llm = CountingLLM(block=reflecting)
+    llm.release.set()
+    scheduler = ReflectionScheduler(threshold=100.0, max_batch=3)
+    agent = make_agent(llm, scheduler)
+    for situation in ["Sam waves", "Sam asks for help", "Sam leaves"]:
+        agent.think_and_act(situation, k=1)
+    assert scheduler.flush(timeout=5)
+    assert scheduler.stats == {"experiences": 3, "stored": 3, "reflections": 1, "reflected": 3}
+    assert len(reflection_prompts(llm)) == 1
+    assert "Reflect on these interactions" in reflection_prompts(llm)[0]
+    assert all(situation in reflection_prompts(llm)[0] for situation in ["Sam waves", "Sam asks", "Sam leaves"])
+
+    # Below the threshold nothing is reflected on until asked
+    agent.think_and_act("Sam returns", k=1)
+    assert scheduler.flush(timeout=5)
+    assert scheduler.stats["reflections"] == 1
+    assert scheduler.flush(timeout=5, reflect=True)
+    assert scheduler.stats["reflections"] == 2
+    assert reflection_prompts(llm)[-1].startswith("Reflect on this interaction")
+
+def test_memory_lock_is_free_while_a_memory_is_embedded():
+    llm = CountingLLM(block=embedding_experiences)
+    scheduler = ReflectionScheduler(threshold=100.0)
+    agent = make_agent(llm, scheduler)
+    agent.think_and_act("Sam waves from across the market", k=1)
+    assert llm.blocked.wait(5)
+    # The worker is inside the model call; the agent can still read its memory
+    assert agent.memory_lock.acquire(timeout=1)
+    agent.memory_lock.release()
+    assert "outcome" in agent.think_and_act("Sam asks for help", k=1)
+
+    llm.release.set()
+    assert scheduler.flush(timeout=5)
+    assert scheduler.stats["stored"] == 2
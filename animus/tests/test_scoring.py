@@ -0,0 +1,30 @@
+# animus/tests/test_scoring.py
+
+from ..core.cache import ResponseCache
+from ..core.llm import LLM
+from ..core.scoring import ScoreScale, UNIT_SCALE, SIGNED_SCALE, SUCCESS_SCALE
+
+def test_linear_scale_options():
+    assert UNIT_SCALE.options[0] == "0.0"
+    assert UNIT_SCALE.options[-1] == "1.0"
+    assert len(SIGNED_SCALE.options) == 21
+    assert SIGNED_SCALE.midpoint == 0.0
+
+def test_expected_value_weights_options_by_likelihood():
+    scale = ScoreScale.labels({"low": 0.0, "high": 1.0})
+    assert scale.expected_value([0.0, 0.0]) == 0.5
+    assert scale.expected_value([-50.0, 0.0]) > 0.99
+    assert SUCCESS_SCALE.expected_value([0.0, -50.0]) > 0.99
+
+def test_score_batch_is_deterministic_and_cached():
+    llm = LLM(backend="stub")
+    llm.cache = ResponseCache()
+    prompts = ["Rate importance of memory A", "Rate standing impact of action B"]
+
+    first = llm.score_batch(prompts, scales=[UNIT_SCALE, SIGNED_SCALE], verbose=False)
+    second = llm.score_batch(prompts, scales=[UNIT_SCALE, SIGNED_SCALE], verbose=False)
+
+    assert first == second
+    assert 0.0 <= first[0] <= 1.0
+    assert -1.0 <= first[1] <= 1.0
+    assert llm.cache.stats()["hits"] == 2
@@ -0,0 +1,44 @@
+# animus/tests/test_tot.py
+
+import pytest
+
+from ..core.agent import SocialAgent
+from ..core.llm import LLM
+from ..core.models import ActorModel
+from ..reasoning.tot import SearchBudget, TreeOfThoughts
+from .conftest import CountingLLM
+
+def run_search(**kwargs):
+    llm = CountingLLM()
+    search = TreeOfThoughts(**kwargs)
+    path = search.search(ActorModel(llm=llm), "Sam waves from across the market", "No relevant memories.",
+                         {"curious": 0.8}, "market")
+    return path, search.last_search, llm.rows
+
+@pytest.mark.parametrize("calls", [7, 12, 20])
+def test_search_stays_within_its_call_budget(calls):
+    path, stats, rows = run_search(threshold=1.1, budget=SearchBudget(calls=calls))
+    assert path.action
+    assert rows == stats["calls"] <= calls
+
+def test_search_stops_once_a_branch_is_good_enough():
+    _, stats, rows = run_search(threshold=0.0, budget=SearchBudget(calls=40))
+    assert stats["stopped_early"]
+    assert stats["actions"] == 3
+    assert rows < 40
+
+def test_token_budget_limits_expansion():
+    _, generous, _ = run_search(threshold=1.1, budget=SearchBudget(calls=None, tokens=100_000))
+    _, tight, _ = run_search(threshold=1.1, budget=SearchBudget(calls=None, tokens=4_000))
+    assert tight["reasonings"] + tight["actions"] < generous["reasonings"] + generous["actions"]
+    assert tight["tokens"] <= 4_000
+
+def test_budget_must_cover_one_path():
+    with pytest.raises(ValueError):
+        TreeOfThoughts(budget=SearchBudget(calls=6))
+
+def test_agent_can_decide_by_search():
+    agent = SocialAgent("Ada", {"curious": 0.8}, location="market", llm=LLM(backend="stub"),
+                        search=TreeOfThoughts(budget=SearchBudget(calls=10)))
+    assert "outcome" in agent.think_and_act("Sam waves from across the market")
+    assert agent.search.last_search["calls"] <= 10
@@ -0,0 +1,73 @@
+# animus/tests/test_trace.py
+
+import threading
+import time
+
+import pytest
+
+from ..core.agent import SocialAgent
+from ..core.backends import StubBackend
+from ..core.llm import LLM
+from ..core.scheduler import LLMScheduler
+from ..core.trace import ReplayBackend, read_trace
+
+def run_agent(llm):
+    agent = SocialAgent("Ada", {"curious": 0.8}, location="market", llm=llm)
+    agent.memory.async_importance = False
+    results = [agent.think_and_act(situation, k=2) for situation in ["Sam waves", "Sam asks for directions"]]
+    return results, [memory.content for memory in agent.memory.memories]
+
+@pytest.mark.parametrize("name", ["run.jsonl", "run.jsonl.gz"])
+def test_replay_reproduces_a_recorded_run(tmp_path, name):
+    path = str(tmp_path / name)
+    recording = LLM(backend="stub", trace=path)
+    recorded = run_agent(recording)
+    recording.backend.close()
+
+    rows = read_trace(path)
+    assert {row["kind"] for row in rows} == {"generate", "score", "embed"}
+    assert all(row["site"] and row["latency"] >= 0.0 for row in rows)
+    assert any(row["site"].startswith("ActorModel.reason") for row in rows)
+
+    replay = LLM(backend="replay", trace=path)
+    assert run_agent(replay) == recorded
+    assert replay.backend.stats == {"hits": len(rows), "misses": 0}
+
+def test_replay_serves_repeated_rows_in_order_and_reports_misses(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text(
+        '{"site":"s","kind":"generate","prompt":"p","params":{"temperature":0.7,"max_new_tokens":8,"seed":null},'
+        '"response":"first","latency":0.05}\n'
+        '{"site":"s","kind":"generate","prompt":"p","params":{"temperature":0.7,"max_new_tokens":8,"seed":null},'
+        '"response":"second","latency":0.05}\n'
+    )
+    replay = ReplayBackend(str(path), latency=1.0)
+    started = time.perf_counter()
+    assert replay.generate(["p", "p", "p"], [0.7] * 3, [8] * 3) == ["first", "second", "second"]
+    assert time.perf_counter() - started >= 0.15
+
+    with pytest.raises(KeyError):
+        replay.generate(["unseen"], [0.7], [8])
+    fallback = ReplayBackend(str(path), fallback=StubBackend())
+    assert fallback.generate(["unseen"], [0.7], [8]) == StubBackend().generate(["unseen"], [0.7], [8])
+    assert fallback.stats == {"hits": 0, "misses": 1}
+
+def ask_around(scheduler, i):
+    scheduler.generate(f"Where is the market? {i}")
+    scheduler.score(f"How sure are you? {i}")
+    scheduler.generate_shared(["The market is busy."], [f"Who is there? {i}"])
+
+def test_rows_recorded_through_a_scheduler_keep_their_call_sites(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    llm = LLM(backend="stub", trace=path)
+    with LLMScheduler(llm=llm, max_wait=0.05) as scheduler:
+        threads = [threading.Thread(target=ask_around, args=(scheduler, i)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    llm.backend.close()
+
+    rows = read_trace(path)
+    assert len(rows) == 12
+    assert all(row["site"].startswith("ask_around (test_trace.py:") for row in rows), {row["site"] for row in rows}
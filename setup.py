@@ -8,6 +8,7 @@ setup(
     install_requires=[
         "torch",
         "transformers",
+        "numpy",
         # Add other dependencies
     ],
     author="Your Name",